@@ -0,0 +1,199 @@
+import json
+import time
+from typing import Any
+import asyncio
+from pathlib import Path
+from datetime import datetime
+from collections.abc import Iterator
+
+import logfire
+from pydantic import Field, BaseModel, PrivateAttr
+from pydantic_settings import CliApp
+
+from src.core.exporter import MediaKind, ExportFilter, iter_export_messages
+from src.core.processor import TelegramDownloader
+from src.utils.progress import ProgressLog
+
+
+class ChannelArchiver(BaseModel):
+    """Archive a whole channel through ``tdl chat export`` and chunked ``tdl download --file``.
+
+    The channel's message list is exported to JSON once, stream-parsed and filtered,
+    then split into small export files that are downloaded with bounded concurrency.
+    The ids of downloaded messages are recorded in a state file, so re-running the
+    command resumes instead of starting over, even after a fresh export with new posts
+    or with other filters.
+
+    Examples:
+        ```bash
+        python ./archive_channel.py --chat my_channel --media-types '["photo","video"]'
+        python ./archive_channel.py --chat my_channel --since 2024-01-01 --concurrency 3
+        ```
+    """
+
+    chat: str = Field(..., description="Chat id, username or link of the channel to archive")
+    output_folder: Path | None = Field(
+        default=None, description="Download directory; defaults to ./data/{chat}"
+    )
+    export_file: Path | None = Field(
+        default=None, description="Exported JSON path; defaults to {output_folder}/export.json"
+    )
+    refresh: bool = Field(
+        default=False, description="Re-run `tdl chat export` even if the export file exists"
+    )
+    chunk_size: int = Field(default=100, description="Messages per `tdl download --file` run")
+    concurrency: int = Field(default=2, description="Max tdl download processes at once")
+    media_types: list[MediaKind] | None = Field(
+        default=None, description="Only download these media kinds"
+    )
+    since: datetime | None = Field(default=None, description="Only messages sent after")
+    until: datetime | None = Field(default=None, description="Only messages sent before")
+    min_id: int | None = Field(default=None, description="Smallest message id to download")
+    max_id: int | None = Field(default=None, description="Largest message id to download")
+
+    _completed: int = PrivateAttr(default=0)
+    _failed: int = PrivateAttr(default=0)
+    _skipped: int = PrivateAttr(default=0)
+    _started_at: float = PrivateAttr(default_factory=time.monotonic)
+
+    @property
+    def folder(self) -> Path:
+        """The folder receiving downloads, chunk files and progress state."""
+        return self.output_folder or Path(f"./data/{self.chat.strip('@').replace('/', '_')}")
+
+    @property
+    def export_path(self) -> Path:
+        """The JSON file produced by ``tdl chat export``."""
+        return self.export_file or self.folder / "export.json"
+
+    @property
+    def export_filter(self) -> ExportFilter:
+        """The message filter built from the CLI options."""
+        return ExportFilter(
+            media_types=self.media_types,
+            since=self.since,
+            until=self.until,
+            min_id=self.min_id,
+            max_id=self.max_id,
+        )
+
+    async def _export(self, downloader: TelegramDownloader) -> None:
+        """Export the channel's message list, pushing id/time bounds down to tdl."""
+        export_type, input_range = None, None
+        if self.min_id is not None or self.max_id is not None:
+            export_type, input_range = "id", [self.min_id or 0, self.max_id or 2**31 - 1]
+        elif self.since is not None or self.until is not None:
+            since = int(self.since.timestamp()) if self.since else 0
+            until = int(self.until.timestamp()) if self.until else int(time.time())
+            export_type, input_range = "time", [since, until]
+
+        logfire.info("Exporting chat", chat=self.chat, output=self.export_path.as_posix())
+        result = await downloader.chat_export(
+            chat=self.chat,
+            output=self.export_path.as_posix(),
+            export_type=export_type,
+            input_range=input_range,
+        )
+        if not result.success:
+            raise RuntimeError(f"tdl chat export failed: {result.stderr.strip()}")
+
+    def _iter_chunks(self, done: set[int]) -> Iterator[tuple[list[int], Path]]:
+        """Stream the export and write filtered messages not done yet into chunk files.
+
+        Args:
+            done (set[int]): Ids of messages downloaded by previous runs
+
+        Yields:
+            tuple[list[int], Path]: The chunk's message ids and its JSON file
+        """
+        chunks_dir = self.folder / "chunks"
+        chunks_dir.mkdir(parents=True, exist_ok=True)
+        export_filter = self.export_filter
+        chat_id: int | str = self.chat
+        batch: list[dict[str, Any]] = []
+
+        def flush() -> tuple[list[int], Path]:
+            chunk_path = chunks_dir / f"chunk_{batch[0]['id']}_{batch[-1]['id']}.json"
+            chunk_path.write_text(json.dumps({"id": chat_id, "messages": batch}), "utf-8")
+            return [message["id"] for message in batch], chunk_path
+
+        for export_chat_id, message in iter_export_messages(self.export_path):
+            if export_chat_id is not None:
+                chat_id = export_chat_id
+            if not export_filter.matches(message):
+                continue
+            if message["id"] in done:
+                self._skipped += 1
+                continue
+            batch.append(message)
+            if len(batch) >= self.chunk_size:
+                yield flush()
+                batch = []
+        if batch:
+            yield flush()
+
+    async def _worker(
+        self,
+        queue: asyncio.Queue[tuple[list[int], Path] | None],
+        downloader: TelegramDownloader,
+        progress: ProgressLog,
+    ) -> None:
+        while (item := await queue.get()) is not None:
+            message_ids, chunk_path = item
+            result = await downloader.download(urls=[], files=[chunk_path.as_posix()])
+            if result.success:
+                progress.mark([str(message_id) for message_id in message_ids])
+                self._completed += 1
+            else:
+                self._failed += 1
+                logfire.error(
+                    "Chunk download failed", chunk=chunk_path.name, error=result.stderr.strip()
+                )
+            logfire.info(
+                "Archive progress",
+                completed=self._completed,
+                failed=self._failed,
+                skipped=self._skipped,
+                elapsed_seconds=round(time.monotonic() - self._started_at, 1),
+            )
+
+    async def run(self) -> None:
+        """Export (if needed) and download the channel chunk by chunk."""
+        downloader = TelegramDownloader(output_folder=self.folder)
+        progress = ProgressLog(path=self.folder / "archive.done")
+        done = {int(key) for key in progress.load() if key.isdigit()}
+
+        if self.refresh or not self.export_path.exists():
+            await self._export(downloader)
+
+        # Bounded queue: parsing never runs more than `concurrency` chunks ahead
+        queue: asyncio.Queue[tuple[list[int], Path] | None] = asyncio.Queue(
+            maxsize=self.concurrency
+        )
+        workers = [
+            asyncio.create_task(self._worker(queue, downloader, progress))
+            for _ in range(self.concurrency)
+        ]
+
+        chunks = self._iter_chunks(done)
+        while item := await asyncio.to_thread(next, chunks, None):
+            await queue.put(item)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+
+        logfire.info(
+            "Archive finished",
+            chat=self.chat,
+            completed=self._completed,
+            failed=self._failed,
+            skipped=self._skipped,
+        )
+
+    def cli_cmd(self) -> None:
+        """Entry point used by ``CliApp.run``."""
+        asyncio.run(self.run())
+
+
+if __name__ == "__main__":
+    CliApp.run(ChannelArchiver)
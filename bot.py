@@ -1,19 +1,62 @@
 import re
+import sys
+import time
+import shutil
+from typing import TYPE_CHECKING, Any
 import asyncio
+import logging
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
+import itertools
 from collections import deque, defaultdict
 from dataclasses import field, dataclass
+from collections.abc import Callable, Awaitable
 
 import logfire
 from pydantic import Field, BaseModel
-from telegram import Update, Message
-from telegram.ext import Application, CommandHandler, MessageHandler, CallbackContext, filters
+from telegram import Bot, Update, Message
 
+from src.core.ipc import ExecutorReply, ExecutorClient, ExecutorChannel, ExecutorCommand
+from src.utils.log import Lazy
+from src.core.stats import DownloadStats, StatsSnapshot, files_written_since
+from src.core.tuning import Tunables, TuningFile
+from src.core.proxies import ProxyPool
 from src.utils.config import Config
-from src.core.processor import TelegramDownloader
-
-logfire.configure(send_to_logfire=False)
+from src.utils.render import (
+    MERGED_DONE,
+    SUCCESS_BATCH,
+    SUCCESS_SINGLE,
+    ALL_GROUPS_DONE,
+    ALL_BATCHES_DONE,
+    REMAINING_GROUPS,
+    render,
+    truncate,
+    fit_lines,
+    split_message,
+    escape_markdown,
+)
+from src.core.accounts import AccountPool
+from src.core.backends import TDLBackend, DownloadBackend, TelethonBackend
+from src.core.admission import Decision, EtaEstimator, AdmissionPolicy
+from src.core.processor import TDLResult, TelegramDownloader
+from src.core.task_queue import SQLiteTaskQueue, TaskQueueBackend
+
+if TYPE_CHECKING:
+    # telegram.ext (the Application/updater stack) is imported by main() only
+    from telegram.ext import CallbackContext
+
+    # Optional features, imported by configure() only when their settings enable them
+    from src.core.catalog import CatalogEntry, DownloadCatalog
+    from src.core.placement import VolumePlacer
+    from src.core.introspect import Introspector
+    from src.core.dc_affinity import BatchPlanner
+    from src.core.postprocess import PostProcessor
+
+# Hot-path records go through the level-gated, sampled and queued loggers of src.utils.log
+log = logging.getLogger("tdl.bot")
+TELEGRAM_URL_PATTERN = re.compile(r"https://t\.me/[^\s]+")
+# Reply to /pause and /resume when worker processes download from the shared queue
+_QUEUE_MODE_UNSUPPORTED = "⚠️ 下載由共享隊列的 worker 執行，此命令在此模式下無效"
 
 
 class MessageInfo(BaseModel):
@@ -32,62 +75,343 @@ class MessageInfo(BaseModel):
     file_url: str = Field(..., description="The URL to download from")
 
 
-@dataclass
+@dataclass(slots=True)
 class DownloadTask:
-    """A download task containing message info and Telegram context."""
+    """A compact download task: the URL, its folder and the status message to edit.
+
+    Only ids and strings are kept (no telegram objects or pydantic models), so large
+    queues stay small and tasks can be published to a shared queue or another process.
+    Album (media group) tasks carry the remaining posts of the album in
+    ``media_group_urls`` so the whole album is downloaded as one task; tasks without a
+    ``chat_id`` (e.g. from the bulk importer) get no Telegram replies.
+    """
 
-    message_info: MessageInfo
-    update: Update
+    url: str
+    folder: str
+    chat_id: int | None = None
     processing_msg_id: int | None = None
-    added_at: datetime = field(default_factory=datetime.now)
+    user_id: int | None = None
+    added_at: float = field(default_factory=time.monotonic)
+    media_group_urls: tuple[str, ...] = ()
+    # Set by /cancel while the task waits in a batch; its group then skips it
+    cancelled: bool = False
+
+    @classmethod
+    def from_message_info(
+        cls, message_info: MessageInfo, **kwargs: int | tuple[str, ...] | None
+    ) -> "DownloadTask":
+        """Build a task from parsed message information.
+
+        Args:
+            message_info (MessageInfo): The parsed message
+            **kwargs (int | tuple[str, ...] | None): Other task fields
+
+        Returns:
+            DownloadTask: The task
+        """
+        # Folder names repeat across tasks of the same chat; intern them to share one copy
+        return cls(
+            url=message_info.file_url, folder=sys.intern(message_info.post_chatname), **kwargs
+        )
+
+    @property
+    def urls(self) -> list[str]:
+        """All URLs covered by this task."""
+        return [self.url, *self.media_group_urls]
+
+    @property
+    def sender(self) -> str:
+        """The channel or user name in the task's URL."""
+        return self.url.removeprefix("https://t.me/").split("/", 1)[0]
+
+    @property
+    def age(self) -> float:
+        """Seconds since the task was created."""
+        return time.monotonic() - self.added_at
+
+    def to_payload(self) -> dict[str, Any]:
+        """Serialize the task for a shared task queue.
+
+        Returns:
+            dict[str, Any]: A JSON-compatible representation of the task
+        """
+        return {
+            "url": self.url,
+            "folder": self.folder,
+            "chat_id": self.chat_id,
+            "processing_msg_id": self.processing_msg_id,
+            "user_id": self.user_id,
+            # Monotonic clocks aren't comparable across hosts, so ship the age instead
+            "age": self.age,
+            "media_group_urls": list(self.media_group_urls),
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "DownloadTask":
+        """Rebuild a task serialized with ``to_payload``.
+
+        Args:
+            payload (dict[str, Any]): The serialized task
+
+        Returns:
+            DownloadTask: The task
+        """
+        return cls(
+            url=payload["url"],
+            folder=sys.intern(payload["folder"]),
+            chat_id=payload.get("chat_id"),
+            processing_msg_id=payload.get("processing_msg_id"),
+            user_id=payload.get("user_id"),
+            added_at=time.monotonic() - payload.get("age", 0.0),
+            media_group_urls=tuple(payload.get("media_group_urls", ())),
+        )
+
+
+class QueueSnapshot(BaseModel):
+    """Point-in-time view of the download queue, shown by /status."""
+
+    queue_size: int = Field(..., description="Tasks waiting to be downloaded")
+    processing: bool = Field(..., description="Whether a batch loop is running")
+    paused: bool = Field(..., description="Whether scheduling is paused")
+    batch_size: int = Field(..., description="Max tasks collected into one batch")
+    batch_timeout: float = Field(..., description="Seconds spent collecting one batch")
+    deferred: int = Field(default=0, description="Tasks held back until the queue drains")
+    recent: list[tuple[str, float]] = Field(
+        default_factory=list, description="Sender and age in seconds of the oldest queued tasks"
+    )
+
+
+def build_backend(config: Config, account_pool: AccountPool) -> DownloadBackend:
+    """Create the download backend selected by ``DOWNLOAD_BACKEND``.
+
+    Args:
+        config (Config): The loaded settings
+        account_pool (AccountPool): tdl accounts, used by the tdl backend
+
+    Returns:
+        DownloadBackend: The backend
+    """
+    if config.download_backend == "telethon":
+        return TelethonBackend(
+            api_id=config.api_id,
+            api_hash=config.api_hash,
+            session_path=config.telethon_session_path,
+            connections=config.telethon_connections,
+        )
+    return TDLBackend(
+        account_pool=account_pool,
+        proxy_pool=ProxyPool.from_urls(config.proxies, per_account=config.proxy_per_account),
+    )
+
+
+def build_dc_prober(config: Config, backend: DownloadBackend) -> TelethonBackend | None:
+    """Pick what looks up the datacenter of chats for the batch planner.
+
+    tdl can't tell where a chat lives; the telethon backend can, and so can its login
+    when the tdl backend is used and the login exists.
+
+    Args:
+        config (Config): The loaded settings
+        backend (DownloadBackend): The download backend
+
+    Returns:
+        TelethonBackend | None: The prober, or None when chats are only clustered by name
+    """
+    if isinstance(backend, TelethonBackend):
+        return backend
+    if not config.telethon_session_path.is_file():
+        return None
+    return TelethonBackend(
+        api_id=config.api_id, api_hash=config.api_hash, session_path=config.telethon_session_path
+    )
 
 
 class BatchDownloadManager:
     """Manages batch downloads for improved efficiency."""
 
-    def __init__(self):
-        """Initialize batch download manager with fixed settings."""
-        self.batch_size = 20  # Fixed batch size
-        self.batch_timeout = 3.0  # Fixed timeout in seconds
+    def __init__(
+        self, on_group_done: Callable[[list[DownloadTask], bool], Awaitable[None]] | None = None
+    ):
+        """Initialize batch download manager with default settings.
+
+        Args:
+            on_group_done (Callable | None): Optional callback awaited after each download
+                group finishes, with the group's tasks and whether it succeeded
+        """
+        # Batch size and timeout (seconds); tunable live with /tune or the tuning file
+        self.batch_size = 20
+        self.batch_timeout = 3.0
+        self.on_group_done = on_group_done
+        # Bot used to edit status messages; set by main() or a queue worker
+        self.bot: Bot | None = None
+        # When set, tasks are published to this shared queue for worker processes
+        self.task_queue: TaskQueueBackend | None = None
+        # When set, tasks and commands are forwarded to a download executor process
+        self.executor: ExecutorClient | None = None
+        # tdl accounts the downloads are sharded over; main() configures TDL_NAMESPACES
+        self.account_pool = AccountPool.from_namespaces("default")
+        # Runs each group's download; DOWNLOAD_BACKEND selects tdl or the in-process Telethon one
+        self.backend: DownloadBackend = TDLBackend(account_pool=self.account_pool)
+        # Rolling download statistics for /stats
+        self.stats = DownloadStats()
+        # Optional steps (hashing, probing, ...) run on files as tdl finishes them
+        self.postprocessor: PostProcessor | None = None
+        # Index of finished downloads; known URLs are answered without running tdl
+        self.catalog: DownloadCatalog | None = None
+        # Spreads download folders over the DATA_ROOTS volumes; unset keeps them in ./data
+        self.placer: VolumePlacer | None = None
+        # Merges a batch's folders on the same datacenter into one tdl process
+        self.planner: BatchPlanner | None = None
+        self.dc_prober: TelethonBackend | None = None
+        # Task ages, loop lag, memory and CPU views for the admin /debug command
+        self.introspector: Introspector | None = None
+        # Scheduler and tdl parameters in effect, reloaded when the tuning file changes
+        self.tunables = Tunables()
+        # Queue limits and the download rate behind the ETA of the first reply
+        self.admission = AdmissionPolicy()
+        self.eta = EtaEstimator()
+        self.tuning_file: TuningFile | None = None
+        self._tuning_watch: asyncio.Task | None = None  # type: ignore[annotation-unchecked]
         self.download_queue: deque[DownloadTask] = deque()  # type: ignore[annotation-unchecked]
+        # Tasks of heavy users past the soft limit, moved to the queue once it drains
+        self._deferred: deque[DownloadTask] = deque()  # type: ignore[annotation-unchecked]
         self.processing = False
         self._batch_task: asyncio.Task | None = None  # type: ignore[annotation-unchecked]
         self._new_task_event = asyncio.Event()
+        # Set while running; cleared by /pause so no new batch or group is started
+        self._resume_event = asyncio.Event()
+        self._resume_event.set()
+        # In-flight tdl downloads and, for the ones we stopped on purpose, the cancelled tasks
+        self._active_downloads: dict[asyncio.Task, list[DownloadTask]] = {}  # type: ignore[annotation-unchecked]
+        self._stopped_downloads: dict[asyncio.Task, list[DownloadTask]] = {}  # type: ignore[annotation-unchecked]
+        # Tasks of the current batch not in a running download (group not started yet, or
+        # stopped), by id; the ones left when the batch ends go back to the queue in order
+        self._waiting: dict[int, DownloadTask] = {}  # type: ignore[annotation-unchecked]
+
+    def configure(self, config: Config) -> None:
+        """Apply the download settings from the environment.
+
+        Args:
+            config (Config): The loaded settings
+        """
+        self.account_pool = AccountPool.from_namespaces(config.tdl_namespaces)
+        self.backend = build_backend(config, self.account_pool)
+        self.tuning_file = TuningFile(
+            path=config.tuning_path,
+            defaults=Tunables.model_validate(
+                config.model_dump(include=set(Tunables.model_fields))
+            ),
+        )
+        try:
+            tunables = self.tuning_file.load()
+        except ValueError as e:
+            logfire.warning("Ignoring invalid tuning file", error=str(e))
+            tunables = self.tuning_file.defaults
+        self.apply_tuning(tunables, source="startup")
+        # Optional features are imported here, only when enabled, to keep startup fast
+        if config.postprocess_steps.strip():
+            from src.core.postprocess import PostProcessor
+
+            self.postprocessor = PostProcessor.from_names(
+                config.postprocess_steps, max_workers=config.postprocess_workers
+            )
+        if config.catalog_path is not None:
+            from src.core.catalog import DownloadCatalog
+
+            self.catalog = DownloadCatalog(path=config.catalog_path)
+        if config.data_roots.strip():
+            from src.core.placement import VolumePlacer
 
-    def _escape_markdown(self, text: str) -> str:
-        """Escape Markdown special characters in text.
+            self.placer = VolumePlacer.from_roots(config.data_roots, config.placement_path)
+        if config.admin_ids.strip():
+            from src.core.introspect import Introspector
+
+            self.introspector = Introspector()
+        if config.dc_map_path is not None:
+            from src.core.dc_affinity import DCMap, BatchPlanner
+
+            self.dc_prober = build_dc_prober(config, self.backend)
+            self.planner = BatchPlanner(
+                dc_map=DCMap(path=config.dc_map_path),
+                probe=self.dc_prober.datacenters if self.dc_prober is not None else None,
+            )
+
+    def apply_tuning(self, tunables: Tunables, source: str) -> None:
+        """Switch to new scheduler and tdl parameters, logging every change.
+
+        Batches and tdl processes started from now on use the new values.
+
+        Args:
+            tunables (Tunables): The new values
+            source (str): What made the change, for the log
+        """
+        for name, (old, new) in self.tunables.changes(tunables).items():
+            logfire.info("Tuning changed", parameter=name, old=old, new=new, source=source)
+        self.tunables = tunables
+        self.batch_size = tunables.batch_size
+        self.batch_timeout = tunables.batch_timeout
+        self.admission = tunables.admission()
+        pool = self.account_pool
+        pool.base_config = tunables.tdl_config(pool.base_config)
+
+    def start_monitoring(self) -> None:
+        """Start the /debug introspection, when enabled, and the tuning file watch."""
+        if self.introspector is not None:
+            self.introspector.start()
+        self.watch_tuning()
+
+    def watch_tuning(self) -> None:
+        """Start applying changes of the tuning file as they happen (needs a running loop)."""
+        if self.tuning_file is None or self._tuning_watch is not None:
+            return
+        self._tuning_watch = asyncio.create_task(
+            self.tuning_file.watch(lambda tunables: self.apply_tuning(tunables, source="file"))
+        )
+
+    async def tune(self, values: dict[str, str]) -> Tunables:
+        """Change tuning parameters for /tune, persisting them to the tuning file.
 
         Args:
-            text (str): Text to escape
+            values (dict[str, str]): Parameter names and new values; empty only reads
 
         Returns:
-            str: Escaped text safe for Markdown
-        """
-        # Escape Telegram Markdown special characters
-        special_chars = [
-            "_",
-            "*",
-            "[",
-            "]",
-            "(",
-            ")",
-            "~",
-            "`",
-            ">",
-            "#",
-            "+",
-            "-",
-            "=",
-            "|",
-            "{",
-            "}",
-            ".",
-            "!",
-        ]
-        escaped_text = text
-        for char in special_chars:
-            escaped_text = escaped_text.replace(char, f"\\{char}")
-        return escaped_text
+            Tunables: The values in effect afterwards
+
+        Raises:
+            ValueError: If a parameter is unknown or a value is invalid
+        """
+        if self.executor is not None:
+            return Tunables.model_validate(await self.executor.call("tune", values=values))
+        if values and self.tuning_file is not None:
+            tunables = await asyncio.to_thread(self.tuning_file.save, values)
+            self.apply_tuning(tunables, source="/tune")
+        return self.tunables
+
+    async def close(self) -> None:
+        """Release resources: the executor process, the backends and the post-processing pool."""
+        if self.executor is not None:
+            await self.executor.stop()
+        await self.backend.close()
+        if self.dc_prober is not None and self.dc_prober is not self.backend:
+            await self.dc_prober.close()
+        if self.postprocessor is not None:
+            await self.postprocessor.close()
+        if self.introspector is not None:
+            await self.introspector.close()
+        if self._tuning_watch is not None:
+            self._tuning_watch.cancel()
+
+    async def add_download_tasks(self, tasks: list[DownloadTask]) -> None:
+        """Add the tasks of one request, e.g. every link of a message, to the batch queue.
+
+        Args:
+            tasks (List[DownloadTask]): The download tasks to add
+        """
+        if self.task_queue is not None:
+            await self._publish_tasks(tasks)
+            return
+        for task in tasks:
+            await self.add_download_task(task)
 
     async def add_download_task(self, task: DownloadTask) -> None:
         """Add a download task to the batch queue.
@@ -95,31 +419,148 @@ class BatchDownloadManager:
         Args:
             task (DownloadTask): The download task to add
         """
-        self.download_queue.append(task)
+        if self.task_queue is not None:
+            await self._publish_tasks([task])
+            return
+        if self.executor is not None:
+            # Blocks while the executor's buffer is full, which throttles update handling
+            await self.executor.submit(task.to_payload())
+            return
+
+        decision = self._admit(task)
+        if decision == "reject":
+            await self._reject_tasks([task], len(self.download_queue) + len(self._deferred))
+            return
+        lane = self._deferred if decision == "defer" else self.download_queue
+        lane.append(task)
         self._new_task_event.set()  # Signal that a new task was added
-        logfire.info(
+        log.info(
             "Added download task to queue",
-            url=task.message_info.file_url,
-            queue_size=len(self.download_queue),
+            extra={
+                "url": task.url,
+                "queue_size": len(self.download_queue),
+                "deferred": len(self._deferred),
+            },
         )
 
         # Check if this is the first task with this message ID
-        same_message_tasks = [
-            t for t in self.download_queue if t.processing_msg_id == task.processing_msg_id
-        ]
+        same_message_tasks = [t for t in lane if t.processing_msg_id == task.processing_msg_id]
 
         # Only update the message for the first task with this message ID
         if len(same_message_tasks) == 1:
             await self._update_task_message(
-                task,
-                f"⏳ 已加入下載隊列... (隊列中: {len(self.download_queue)} 個任務)",
-                use_markdown=False,
+                task, self._queued_message(task, deferred=decision == "defer"), use_markdown=False
             )
 
         # Start batch processing if not already running
         if not self.processing:
             await self._start_batch_processing()
 
+    def _admit(self, task: DownloadTask) -> Decision:
+        """Decide whether a new task is queued, deferred or rejected.
+
+        Args:
+            task (DownloadTask): The new task
+
+        Returns:
+            Decision: ``accept``, ``defer`` or ``reject``
+        """
+        queued, deferred = len(self.download_queue), len(self._deferred)
+        # Bulk callers pace themselves and have nobody to tell about a rejection
+        if task.chat_id is None or (queued < self.admission.soft_limit and not deferred):
+            return "accept"
+        return self.admission.decide(
+            queued,
+            deferred,
+            user_queued=sum(t.user_id == task.user_id for t in self.download_queue),
+            user_deferred=sum(t.user_id == task.user_id for t in self._deferred),
+        )
+
+    def _admit_deferred(self) -> None:
+        """Move deferred tasks to the queue while it is under the soft limit."""
+        while self._deferred and len(self.download_queue) < self.admission.soft_limit:
+            self.download_queue.append(self._deferred.popleft())
+
+    def _queued_message(self, task: DownloadTask, deferred: bool) -> str:
+        """Create the first reply to a queued task, with its predicted start and finish.
+
+        Args:
+            task (DownloadTask): The task, last in its lane
+            deferred (bool): Whether it went to the deferred lane
+
+        Returns:
+            str: Plain text message
+        """
+        ahead = sum(len(t.urls) for t in self.download_queue)
+        if deferred:
+            ahead += sum(len(t.urls) for t in self._deferred)
+        ahead -= len(task.urls)
+        # Downloads in flight are halfway done on average
+        ahead += sum(len(t.urls) for ts in self._active_downloads.values() for t in ts) / 2
+        ahead += sum(len(t.urls) for t in self._waiting.values())
+        start, finish = self.eta.estimate(ahead, len(task.urls), self.backend.capacity)
+        queued = len(self.download_queue) + (len(self._deferred) if deferred else 0)
+        head = (
+            f"⏳ 隊列繁忙，已延後排入... (隊列中: {queued} 個任務)"
+            if deferred
+            else f"⏳ 已加入下載隊列... (隊列中: {queued} 個任務)"
+        )
+        return f"{head}\n🕒 預計開始: {_format_eta(start)}\n🏁 預計完成: {_format_eta(finish)}"
+
+    async def _reject_tasks(self, tasks: list[DownloadTask], backlog: int) -> None:
+        """Turn tasks away because the backlog is at the hard limit.
+
+        Args:
+            tasks (List[DownloadTask]): The rejected tasks
+            backlog (int): Tasks waiting ahead of them
+        """
+        logfire.warning(
+            "Rejected download tasks, queue full", urls=[t.url for t in tasks], backlog=backlog
+        )
+        wait, _ = self.eta.estimate(backlog - self.admission.soft_limit, 0, self.backend.capacity)
+        # Tasks of one request share a status message, which is edited once
+        for task in {task.processing_msg_id: task for task in tasks}.values():
+            await self._update_task_message(
+                task,
+                f"🚫 下載隊列已滿 (隊列中: {backlog} 個任務)，請於 {_format_eta(wait)} 再試",
+                use_markdown=False,
+            )
+        await self._notify_group_done(tasks, success=False)
+
+    async def _publish_tasks(self, tasks: list[DownloadTask]) -> None:
+        """Hand tasks to the shared queue, where worker processes will claim them.
+
+        Args:
+            tasks (List[DownloadTask]): The download tasks to publish
+        """
+        backlog = await self.task_queue.pending_count()
+        if backlog >= self.admission.hard_limit:
+            # Tasks without a chat (bulk imports) pace themselves and are never turned away
+            rejected = [task for task in tasks if task.chat_id is not None]
+            if rejected:
+                await self._reject_tasks(rejected, backlog)
+            tasks = [task for task in tasks if task.chat_id is None]
+        if not tasks:
+            return
+        await self.task_queue.publish([task.to_payload() for task in tasks])
+        pending = backlog + len(tasks)
+        log.info(
+            "Published download tasks",
+            extra={"urls": [task.url for task in tasks], "pending": pending},
+        )
+        for task in {task.processing_msg_id: task for task in tasks}.values():
+            await self._update_task_message(
+                task, f"⏳ 已加入下載隊列... (隊列中: {pending} 個任務)", use_markdown=False
+            )
+
+    async def process_batch(self, batch: list[DownloadTask]) -> None:
+        """Download a batch right away, bypassing the local queue (used by queue workers).
+
+        Args:
+            batch (List[DownloadTask]): List of download tasks to process
+        """
+        await self._process_batch(batch)
+
     async def _start_batch_processing(self) -> None:
         """Start the batch processing task."""
         if self._batch_task is None or self._batch_task.done():
@@ -130,7 +571,9 @@ class BatchDownloadManager:
         self.processing = True
 
         try:
-            while self.download_queue:
+            while self.download_queue or self._deferred:
+                await self._resume_event.wait()
+                self._admit_deferred()
                 batch_start_time = datetime.now()
                 current_batch: list[DownloadTask] = []
 
@@ -163,6 +606,171 @@ class BatchDownloadManager:
         finally:
             self.processing = False
 
+    @property
+    def paused(self) -> bool:
+        """Whether the scheduler is paused."""
+        return not self._resume_event.is_set()
+
+    def _stop_download(self, download: asyncio.Task, cancelled: list[DownloadTask]) -> None:
+        """Stop an in-flight download; its tasks not in ``cancelled`` are requeued.
+
+        Args:
+            download (asyncio.Task): The running download
+            cancelled (List[DownloadTask]): Tasks of the group that are dropped for good
+        """
+        self._stopped_downloads.setdefault(download, []).extend(cancelled)
+        download.cancel()
+
+    async def cancel(self, url: str | None = None, chat_id: int | None = None) -> int:
+        """Cancel queued and in-flight tasks.
+
+        Queued tasks are removed from the queue and tasks of the current batch are
+        skipped when their group starts; in-flight tdl processes are stopped and the
+        other tasks sharing the same process are put back at the front of the queue.
+
+        Args:
+            url (str | None): Only cancel tasks covering this URL; None cancels everything
+            chat_id (int | None): Only cancel tasks requested from this chat
+
+        Returns:
+            int: Number of cancelled tasks
+        """
+        if self.executor is not None:
+            return await self.executor.call("cancel", url=url, chat_id=chat_id)
+        if self.task_queue is not None:
+            return await self._cancel_published(url, chat_id)
+
+        def matches(task: DownloadTask) -> bool:
+            if chat_id is not None and task.chat_id != chat_id:
+                return False
+            return url is None or url in task.urls
+
+        cancelled = [
+            task
+            for task in itertools.chain(
+                self.download_queue, self._deferred, self._waiting.values()
+            )
+            if matches(task)
+        ]
+        if cancelled:
+            for task in cancelled:
+                task.cancelled = True
+                self._waiting.pop(id(task), None)
+            self.download_queue = deque(t for t in self.download_queue if not matches(t))
+            self._deferred = deque(t for t in self._deferred if not matches(t))
+            for task in cancelled:
+                await self._update_task_message(task, "🛑 已取消下載", use_markdown=False)
+            await self._notify_group_done(cancelled, success=False)
+
+        for download, tasks in list(self._active_downloads.items()):
+            stopped = [task for task in tasks if matches(task)]
+            if stopped:
+                self._stop_download(download, stopped)
+                cancelled.extend(stopped)
+
+        logfire.info("Cancelled download tasks", url=url, chat_id=chat_id, count=len(cancelled))
+        return len(cancelled)
+
+    async def _cancel_published(self, url: str | None, chat_id: int | None) -> int:
+        """Cancel tasks in the shared queue that no worker has claimed yet.
+
+        Args:
+            url (str | None): Only cancel tasks covering this URL; None cancels everything
+            chat_id (int | None): Only cancel tasks requested from this chat
+
+        Returns:
+            int: Number of cancelled tasks
+        """
+        cancelled = [
+            DownloadTask.from_payload(payload)
+            for payload in await self.task_queue.cancel(url, chat_id)
+        ]
+        for task in {task.processing_msg_id: task for task in cancelled}.values():
+            await self._update_task_message(task, "🛑 已取消下載", use_markdown=False)
+        if cancelled:
+            await self._notify_group_done(cancelled, success=False)
+        logfire.info("Cancelled queued jobs", url=url, chat_id=chat_id, count=len(cancelled))
+        return len(cancelled)
+
+    async def pause(self) -> int:
+        """Pause scheduling and stop in-flight downloads, requeueing their tasks.
+
+        Returns:
+            int: Number of in-flight downloads that were stopped
+        """
+        if self.executor is not None:
+            return await self.executor.call("pause")
+        self._resume_event.clear()
+        for download in list(self._active_downloads):
+            self._stop_download(download, cancelled=[])
+        logfire.info("Paused downloads", stopped=len(self._active_downloads))
+        return len(self._active_downloads)
+
+    async def resume(self) -> int:
+        """Resume scheduling after a pause.
+
+        Returns:
+            int: Number of queued tasks
+        """
+        if self.executor is not None:
+            return await self.executor.call("resume")
+        self._resume_event.set()
+        logfire.info("Resumed downloads", queue_size=len(self.download_queue))
+        if self.download_queue and not self.processing:
+            await self._start_batch_processing()
+        return len(self.download_queue)
+
+    async def snapshot(self, limit: int = 3) -> QueueSnapshot:
+        """Describe the queue for /status.
+
+        Args:
+            limit (int): Number of queued tasks to include
+
+        Returns:
+            QueueSnapshot: The current queue state
+        """
+        if self.executor is not None:
+            return QueueSnapshot.model_validate(await self.executor.call("snapshot", limit=limit))
+        if self.task_queue is not None:
+            # Workers download from the shared queue; this process only publishes
+            pending = await self.task_queue.pending_count()
+            return QueueSnapshot(
+                queue_size=pending,
+                processing=pending > 0,
+                paused=False,
+                batch_size=self.batch_size,
+                batch_timeout=self.batch_timeout,
+            )
+        return QueueSnapshot(
+            queue_size=len(self.download_queue),
+            processing=self.processing,
+            paused=self.paused,
+            batch_size=self.batch_size,
+            batch_timeout=self.batch_timeout,
+            deferred=len(self._deferred),
+            recent=[
+                (task.sender, task.age) for task in itertools.islice(self.download_queue, limit)
+            ],
+        )
+
+    async def statistics(self) -> StatsSnapshot:
+        """Read the rolling download statistics for /stats.
+
+        Returns:
+            StatsSnapshot: Lifetime counters and rolling windows
+        """
+        if self.executor is not None:
+            return StatsSnapshot.model_validate(await self.executor.call("statistics"))
+        return self.stats.snapshot()
+
+    async def wait_until_idle(self) -> None:
+        """Wait until the queue is empty and no batch is being processed."""
+        while self.download_queue or self._deferred or self.processing:
+            if self._batch_task is not None and not self._batch_task.done():
+                await asyncio.wait({self._batch_task}, timeout=1.0)
+            else:
+                await asyncio.sleep(0.1)
+
     async def _wait_for_new_tasks(self) -> None:
         """Wait for new tasks to be added to the queue using asyncio.Event."""
         self._new_task_event.clear()
@@ -174,28 +782,205 @@ class BatchDownloadManager:
         Args:
             batch (List[DownloadTask]): List of download tasks to process
         """
+        batch = await self._answer_known(batch)
+        if not batch:
+            return
+        self._waiting = {id(task): task for task in batch}
+        try:
+            await self._download_batch(batch)
+        finally:
+            # Stopped and not yet started tasks go back in their original order, all at once
+            unfinished = [t for t in batch if id(t) in self._waiting and not t.cancelled]
+            self._waiting = {}
+            self.download_queue.extendleft(reversed(unfinished))
+
+    async def _download_batch(self, batch: list[DownloadTask]) -> None:
+        """Group a batch by output directory and download the groups.
+
+        Args:
+            batch (List[DownloadTask]): Tasks still to download
+        """
         # Group tasks by output directory for efficient downloading
         grouped_tasks: dict[str, list[DownloadTask]] = defaultdict(list)
 
+        output_dirs = await self.output_dirs([task.folder for task in batch])
         for task in batch:
-            output_dir = f"./data/{task.message_info.post_chatname}"
-            grouped_tasks[output_dir].append(task)
+            grouped_tasks[output_dirs[task.folder]].append(task)
+
+        # Groups on the same datacenter share a tdl process, keeping its connections warm.
+        # A merged download is staged next to its folders, so only one volume's folders merge
+        capacity = self.backend.capacity
+        if self.planner is not None:
+            by_root: dict[Path, dict[str, list[str]]] = defaultdict(dict)
+            for output_dir, tasks in grouped_tasks.items():
+                by_root[Path(output_dir).parent][output_dir] = [u for t in tasks for u in t.urls]
+            plan = [
+                merged
+                for groups in by_root.values()
+                for merged in await self.planner.plan(groups, capacity)
+            ]
+        else:
+            plan = [[output_dir] for output_dir in grouped_tasks]
 
-        logfire.info("Processing batch", batch_size=len(batch), groups=len(grouped_tasks))
+        log.info(
+            "Processing batch",
+            extra={"batch_size": len(batch), "groups": len(grouped_tasks), "processes": len(plan)},
+        )
 
-        # Process each group and track the last processed task for final update
+        # Processes run concurrently, up to the backend's capacity (one per account slot)
         total_groups = len(grouped_tasks)
-        last_processed_task = None
+        semaphore = asyncio.Semaphore(capacity)
+        started = 0
+
+        async def run_groups(output_dirs: list[str]) -> bool:
+            nonlocal started
+            async with semaphore:
+                if self.paused:
+                    # The tasks stay waiting and are requeued for after /resume
+                    return False
+                groups = self._start_groups({d: grouped_tasks[d] for d in output_dirs})
+                if not groups:
+                    return True
+                started += len(groups)
+                if len(groups) == 1:
+                    [(output_dir, tasks)] = groups.items()
+                    await self._download_group(output_dir, tasks, total_groups - started)
+                else:
+                    await self._download_merged(groups, total_groups - started)
+                return True
 
-        for i, (output_dir, tasks) in enumerate(grouped_tasks.items(), 1):
-            remaining_groups = total_groups - i
-            await self._download_group(output_dir, tasks, remaining_groups)
-            last_processed_task = tasks[0]  # Remember the primary task
+        results = await asyncio.gather(*(run_groups(output_dirs) for output_dirs in plan))
 
         # After all groups are processed, update the final message to show completion
-        if last_processed_task and total_groups > 1:
+        if total_groups > 1 and all(results):
+            last_processed_task = list(grouped_tasks.values())[-1][0]
             await self._update_final_completion_message(last_processed_task)
 
+    def _start_groups(
+        self, groups: dict[str, list[DownloadTask]]
+    ) -> dict[str, list[DownloadTask]]:
+        """Take the tasks of groups about to start out of the waiting tasks.
+
+        Args:
+            groups (Dict[str, List[DownloadTask]]): Output directories and their tasks
+
+        Returns:
+            Dict[str, List[DownloadTask]]: The groups without cancelled tasks, empty ones dropped
+        """
+        started: dict[str, list[DownloadTask]] = {}
+        for output_dir, tasks in groups.items():
+            live = [task for task in tasks if not task.cancelled]
+            for task in live:
+                self._waiting.pop(id(task), None)
+            if live:
+                started[output_dir] = live
+        return started
+
+    async def output_dirs(self, folders: list[str]) -> dict[str, str]:
+        """Find the output directory of each folder, on its volume when there are several.
+
+        Args:
+            folders (List[str]): Folder names, as in ``DownloadTask.folder``
+
+        Returns:
+            Dict[str, str]: Each folder's output directory
+        """
+        if self.placer is None:
+            return {folder: f"./data/{folder}" for folder in folders}
+        placed = await self.placer.place(folders)
+        return {folder: path.as_posix() for folder, path in placed.items()}
+
+    async def _answer_known(self, batch: list[DownloadTask]) -> list[DownloadTask]:
+        """Answer tasks whose URLs are all in the catalog, without running tdl.
+
+        Args:
+            batch (List[DownloadTask]): Tasks about to be downloaded
+
+        Returns:
+            List[DownloadTask]: The tasks that still need downloading
+        """
+        if self.catalog is None:
+            return batch
+        try:
+            known = await self.catalog.lookup([url for task in batch for url in task.urls])
+        except Exception as e:
+            logfire.warning("Catalog lookup failed", error=str(e))
+            return batch
+
+        remaining = []
+        for task in batch:
+            if not all(url in known for url in task.urls):
+                remaining.append(task)
+                continue
+            entry = known[task.url]
+            await self._update_task_message(
+                task, self._create_known_message(task, entry), use_markdown=False
+            )
+            await self._notify_group_done([task], success=True)
+        if len(remaining) < len(batch):
+            logfire.info("Skipped known downloads", skipped=len(batch) - len(remaining))
+        return remaining
+
+    def _create_known_message(self, task: DownloadTask, entry: "CatalogEntry") -> str:
+        """Create the reply for a task that was already downloaded.
+
+        Args:
+            task (DownloadTask): The task
+            entry (CatalogEntry): The catalog entry of its URL
+
+        Returns:
+            str: Plain text message
+        """
+        return (
+            f"✅ 已下載過，略過\n\n"
+            f"📁 資料夾: {entry.folder}\n"
+            f"📄 檔案: {len(entry.files)} 個\n"
+            f"🕒 完成於: {entry.completed_at:%Y-%m-%d %H:%M}\n\n"
+            f"🔗 來源: {task.url}"
+        )
+
+    async def find(self, query: str, limit: int = 10) -> list["CatalogEntry"]:
+        """Search the download catalog for /find.
+
+        Args:
+            query (str): Substring of a URL, folder or file name
+            limit (int): Max number of entries
+
+        Returns:
+            List[CatalogEntry]: Matching downloads, most recent first
+        """
+        if self.executor is not None:
+            from src.core.catalog import CatalogEntry
+
+            entries = await self.executor.call("find", query=query, limit=limit)
+            return [CatalogEntry.model_validate(entry) for entry in entries]
+        if self.catalog is None:
+            return []
+        return await self.catalog.find(query, limit)
+
+    async def introspect(self, section: str, seconds: float = 5.0, top: int = 15) -> str:
+        """Build an introspection report for /debug.
+
+        With an executor process, the report covers both processes, sampled at once.
+
+        Args:
+            section (str): One of ``tasks``, ``lag``, ``memory``, ``cpu`` or ``procs``
+            seconds (float): Sampling time of the CPU profile
+            top (int): Number of lines in ranked reports
+
+        Returns:
+            str: The report
+        """
+        if self.introspector is None:
+            raise RuntimeError("Introspection is off, set ADMIN_IDS to enable /debug")
+        local = self.introspector.report(section, seconds, top)
+        if self.executor is None:
+            return await local
+        own, remote = await asyncio.gather(
+            local, self.executor.call("introspect", section=section, seconds=seconds, top=top)
+        )
+        return f"[bot]\n{own}\n\n[executor]\n{remote}"
+
     async def _update_final_completion_message(self, task: DownloadTask) -> None:
         """Update the final message to show all downloads are completed.
 
@@ -203,14 +988,12 @@ class BatchDownloadManager:
             task (DownloadTask): The task to update
         """
         try:
-            if task.processing_msg_id and task.update.message:
+            if self._can_notify(task):
                 # Get the current message text and update the status part
-                final_msg = "🎉 *全部批次處理完成\\!*\n\n✅ 所有下載任務已完成"
-
-                await task.update.get_bot().edit_message_text(
-                    chat_id=task.update.effective_chat.id,
+                await self.bot.edit_message_text(
+                    chat_id=task.chat_id,
                     message_id=task.processing_msg_id,
-                    text=final_msg,
+                    text=ALL_BATCHES_DONE,
                     parse_mode="MarkdownV2",
                 )
         except Exception as e:
@@ -226,7 +1009,7 @@ class BatchDownloadManager:
             tasks (List[DownloadTask]): Tasks to download
             remaining_groups (int): Number of remaining groups to process
         """
-        urls = [task.message_info.file_url for task in tasks]
+        urls = [url for task in tasks for url in task.urls]
 
         try:
             primary_task = tasks[-1]  # Use the last (most recent) task
@@ -238,13 +1021,192 @@ class BatchDownloadManager:
             await self._update_primary_task_progress(primary_task, urls, remaining_groups)
 
             # Perform the actual download
-            await self._execute_download(output_dir, urls)
-
-            # Update completion messages
-            await self._update_completion_messages(tasks, urls, output_dir, remaining_groups)
+            started_at = time.time()
+            download_done = asyncio.Event()
+            if self.postprocessor is not None:
+                # Files are post-processed as tdl finishes them, off the event loop
+                self.postprocessor.start_stream(Path(output_dir), started_at, download_done)
+            try:
+                result = await self._run_download(output_dir, urls, tasks)
+            finally:
+                download_done.set()
+            if result is None:
+                return
+            if not result.success:
+                raise RuntimeError(
+                    result.stderr.strip() or f"tdl exited with {result.return_code}"
+                )
+            await self._finish_group(output_dir, tasks, started_at, remaining_groups)
 
         except Exception as e:
+            self.stats.record_failure(len(urls))
             await self._handle_download_error(tasks, urls, e)
+            await self._notify_group_done(tasks, success=False)
+            return
+
+        await self._notify_group_done(tasks, success=True)
+
+    async def _download_merged(
+        self, groups: dict[str, list[DownloadTask]], remaining_groups: int = 0
+    ) -> None:
+        """Download several groups with one process, then move each post to its folder.
+
+        The process writes into a staging folder; its files are moved to the groups'
+        folders as soon as it exits, whatever the outcome, like a group download
+        leaves its files in place.
+
+        Args:
+            groups (Dict[str, List[DownloadTask]]): Output directories and their tasks
+            remaining_groups (int): Number of remaining groups to process
+        """
+        # Only planned batches merge groups, so the planner's module is already loaded
+        from src.core.dc_affinity import distribute, make_staging
+
+        all_tasks = [task for tasks in groups.values() for task in tasks]
+        urls = [url for task in all_tasks for url in task.urls]
+        group_urls = {
+            output_dir: [url for task in tasks for url in task.urls]
+            for output_dir, tasks in groups.items()
+        }
+
+        try:
+            for output_dir, tasks in groups.items():
+                await self._update_merged_tasks(tasks[:-1])
+                await self._update_primary_task_progress(
+                    tasks[-1], group_urls[output_dir], remaining_groups
+                )
+
+            started_at = time.time()
+            download_done = asyncio.Event()
+            if self.postprocessor is not None:
+                for output_dir in groups:
+                    self.postprocessor.start_stream(Path(output_dir), started_at, download_done)
+            staging = await asyncio.to_thread(make_staging, Path(next(iter(groups))).parent)
+            try:
+                result = await self._run_download(staging.as_posix(), urls, all_tasks)
+            finally:
+                try:
+                    await asyncio.to_thread(distribute, staging, group_urls)
+                except Exception as e:
+                    # The download's own outcome is what the users are told about
+                    logfire.error(
+                        "Failed to distribute merged download",
+                        staging=staging.as_posix(),
+                        error=str(e),
+                    )
+                finally:
+                    await asyncio.to_thread(shutil.rmtree, staging, ignore_errors=True)
+                    download_done.set()
+            if result is None:
+                return
+            if not result.success:
+                raise RuntimeError(
+                    result.stderr.strip() or f"tdl exited with {result.return_code}"
+                )
+            for output_dir, tasks in groups.items():
+                await self._finish_group(output_dir, tasks, started_at, remaining_groups)
+
+        except Exception as e:
+            self.stats.record_failure(len(urls))
+            await self._handle_download_error(all_tasks, urls, e)
+            await self._notify_group_done(all_tasks, success=False)
+            return
+
+        for tasks in groups.values():
+            await self._notify_group_done(tasks, success=True)
+
+    async def _finish_group(
+        self, output_dir: str, tasks: list[DownloadTask], started_at: float, remaining_groups: int
+    ) -> None:
+        """Record a downloaded group in the stats and catalog, and report it.
+
+        Args:
+            output_dir (str): The output directory path
+            tasks (List[DownloadTask]): Tasks of the group
+            started_at (float): ``time.time()`` when the download started
+            remaining_groups (int): Number of remaining groups to process
+        """
+        urls = [url for task in tasks for url in task.urls]
+        files = await asyncio.to_thread(files_written_since, Path(output_dir), started_at)
+        self.stats.record_success(
+            [task.age for task in tasks for _ in task.urls], sum(files.values())
+        )
+        if self.catalog is not None:
+            from src.core.catalog import files_of_post
+
+            await self.catalog.record(output_dir, {url: files_of_post(url, files) for url in urls})
+
+        # Update completion messages
+        await self._update_completion_messages(tasks, urls, output_dir, remaining_groups)
+
+    async def _run_download(
+        self, output_dir: str, urls: list[str], tasks: list[DownloadTask]
+    ) -> TDLResult | None:
+        """Run the download as a cancellable task tracked for /cancel and /pause.
+
+        Args:
+            output_dir (str): Directory to download files to
+            urls (List[str]): URLs to download
+            tasks (List[DownloadTask]): Tasks covered by this download
+
+        Returns:
+            TDLResult | None: The tdl result, or None if the download was stopped
+        """
+        download = asyncio.create_task(self._execute_download(output_dir, urls))
+        self._active_downloads[download] = tasks
+        try:
+            return await download
+        except asyncio.CancelledError:
+            if download not in self._stopped_downloads:
+                raise
+            cancelled = self._stopped_downloads.pop(download)
+            await self._handle_stopped_group(tasks, cancelled)
+            return None
+        finally:
+            self._active_downloads.pop(download, None)
+
+    async def _handle_stopped_group(
+        self, tasks: list[DownloadTask], cancelled: list[DownloadTask]
+    ) -> None:
+        """Report cancelled tasks and mark the rest of a stopped group for requeueing.
+
+        Args:
+            tasks (List[DownloadTask]): All tasks of the stopped group
+            cancelled (List[DownloadTask]): Tasks that were cancelled
+        """
+        requeue = [task for task in tasks if task not in cancelled]
+        # Requeued with the rest of the batch when it ends, keeping the original order
+        self._waiting.update((id(task), task) for task in requeue)
+        for task in cancelled:
+            await self._update_task_message(task, "🛑 已取消下載", use_markdown=False)
+        for task in requeue:
+            await self._update_task_message(
+                task, "⏸️ 下載已中斷，已重新加入隊列", use_markdown=False
+            )
+        if cancelled:
+            await self._notify_group_done(cancelled, success=False)
+
+    def _can_notify(self, task: DownloadTask) -> bool:
+        """Whether the task has a status message the bot can edit.
+
+        Args:
+            task (DownloadTask): The task to check
+        """
+        return self.bot is not None and task.chat_id is not None and bool(task.processing_msg_id)
+
+    async def _notify_group_done(self, tasks: list[DownloadTask], success: bool) -> None:
+        """Invoke the group completion callback, if any.
+
+        Args:
+            tasks (List[DownloadTask]): Tasks of the finished group
+            success (bool): Whether the group downloaded successfully
+        """
+        if self.on_group_done is None:
+            return
+        try:
+            await self.on_group_done(tasks, success)
+        except Exception as e:
+            logfire.warning("Group completion callback failed", error=str(e))
 
     async def _update_merged_tasks(self, tasks: list[DownloadTask]) -> None:
         """Update non-primary tasks to show they're merged.
@@ -253,10 +1215,10 @@ class BatchDownloadManager:
             tasks (List[DownloadTask]): Tasks to update as merged
         """
         for task in tasks:
-            if task.processing_msg_id and task.update.message:
+            if self._can_notify(task):
                 try:
-                    await task.update.get_bot().edit_message_text(
-                        chat_id=task.update.effective_chat.id,
+                    await self.bot.edit_message_text(
+                        chat_id=task.chat_id,
                         message_id=task.processing_msg_id,
                         text="🔄 已合併到批量下載中...",
                     )
@@ -273,7 +1235,7 @@ class BatchDownloadManager:
             urls (List[str]): List of URLs being downloaded
             remaining_groups (int): Number of remaining groups
         """
-        if primary_task.processing_msg_id and primary_task.update.message:
+        if self._can_notify(primary_task):
             try:
                 if len(urls) == 1:
                     progress_text = "⏳ 開始下載... (1 個檔案)"
@@ -283,26 +1245,45 @@ class BatchDownloadManager:
                 if remaining_groups > 0:
                     progress_text += f"\n📋 剩餘批次: {remaining_groups} 組"
 
-                await primary_task.update.get_bot().edit_message_text(
-                    chat_id=primary_task.update.effective_chat.id,
+                await self.bot.edit_message_text(
+                    chat_id=primary_task.chat_id,
                     message_id=primary_task.processing_msg_id,
                     text=progress_text,
                 )
             except Exception as e:
                 logfire.warning("Failed to update processing message", error=str(e))
 
-    async def _execute_download(self, output_dir: str, urls: list[str]) -> None:
+    async def _execute_download(self, output_dir: str, urls: list[str]) -> TDLResult:
         """Execute the actual download operation.
 
         Args:
             output_dir (str): Directory to download files to
             urls (List[str]): URLs to download
+
+        Returns:
+            TDLResult: The result of the backend
         """
         output_folder = Path(output_dir)
-        logfire.info("Starting batch download", urls=urls, output_folder=output_folder.as_posix())
+        log.info(
+            "Starting batch download",
+            extra={"urls": len(urls), "output_folder": Lazy(output_folder.as_posix)},
+        )
+        # The full list only at debug level, where it is formatted in the sink thread
+        log.debug("Batch download URLs: %s", urls)
 
-        td = TelegramDownloader(output_folder=output_folder)
-        await td.download(urls=urls)
+        self.stats.process_started()
+        started_at = time.monotonic()
+        try:
+            if self.placer is None:
+                result = await self.backend.download(output_folder, urls)
+            else:
+                with self.placer.writing(output_folder):
+                    result = await self.backend.download(output_folder, urls)
+        finally:
+            self.stats.process_finished()
+        if result.success:
+            self.eta.record(len(urls), time.monotonic() - started_at)
+        return result
 
     async def _update_completion_messages(
         self, tasks: list[DownloadTask], urls: list[str], output_dir: str, remaining_groups: int
@@ -326,49 +1307,43 @@ class BatchDownloadManager:
 
         # Update other merged messages to show completion
         for task in tasks[:-1]:
-            if task.processing_msg_id and task.update.message:
+            if self._can_notify(task):
                 try:
-                    merged_msg = f"✅ 已合併完成\n🔗 來源: {self._escape_markdown(task.message_info.file_url)}"
-                    await self._update_task_message(task, merged_msg)
+                    await self._update_task_message(task, render(MERGED_DONE, url=task.url))
                 except Exception as e:
                     logfire.warning("Failed to update merged completion message", error=str(e))
 
-        logfire.info("Batch download completed successfully", batch_size=len(urls))
+        log.info("Batch download completed successfully", extra={"batch_size": len(urls)})
 
     def _create_success_message(
         self, urls: list[str], output_folder: Path, remaining_groups: int
     ) -> str:
         """Create a formatted success message.
 
+        The URL list is cut to fit Telegram's message limit, so the edit never fails
+        for being too long.
+
         Args:
             urls (List[str]): URLs that were downloaded
             output_folder (Path): Path where files were downloaded
             remaining_groups (int): Number of remaining groups
 
         Returns:
-            str: Formatted success message
+            str: Formatted MarkdownV2 success message
         """
-        if len(urls) == 1:
-            escaped_path = self._escape_markdown(output_folder.as_posix())
-            escaped_url = self._escape_markdown(urls[0])
-            success_msg = (
-                f"✅ *下載完成\\!*\n\n📁 *資料夾*: `{escaped_path}`\n\n🔗 *來源*: {escaped_url}"
-            )
-        else:
-            escaped_path = self._escape_markdown(output_folder.as_posix())
-            url_list = "\n".join([f"• {self._escape_markdown(url)}" for url in urls])
-            success_msg = (
-                f"✅ *批量下載完成\\!*\n\n"
-                f"📁 *資料夾*: `{escaped_path}`\n\n"
-                f"🔗 *來源* \\({len(urls)} 個檔案\\):\n{url_list}"
-            )
-
+        folder = output_folder.as_posix()
         if remaining_groups > 0:
-            success_msg += f"\n\n📋 *剩餘批次*: {remaining_groups} 組待處理"
+            footer = render(REMAINING_GROUPS, remaining=remaining_groups)
         else:
-            success_msg += "\n\n🎉 *狀態*: 全部下載完成"
+            footer = ALL_GROUPS_DONE
 
-        return success_msg
+        if len(urls) == 1:
+            return render(SUCCESS_SINGLE, folder=folder, url=urls[0]) + footer
+        return fit_lines(
+            render(SUCCESS_BATCH, folder=folder, count=len(urls)),
+            (f"• {escape_markdown(url)}" for url in urls),
+            footer,
+        )
 
     async def _handle_download_error(
         self, tasks: list[DownloadTask], urls: list[str], error: Exception
@@ -388,7 +1363,7 @@ class BatchDownloadManager:
 
         # Update other merged messages with error
         for task in tasks[:-1]:
-            if task.processing_msg_id and task.update.message:
+            if self._can_notify(task):
                 try:
                     await self._update_task_message(task, "❌ 批量下載失敗", use_markdown=False)
                 except Exception as e:
@@ -406,15 +1381,20 @@ class BatchDownloadManager:
         """
         try:
             parse_mode = "MarkdownV2" if use_markdown else None
-            if task.processing_msg_id and task.update.message:
-                await task.update.get_bot().edit_message_text(
-                    chat_id=task.update.effective_chat.id,
+            if not use_markdown:
+                # e.g. error messages quoting tdl output
+                message = truncate(message)
+            if self._can_notify(task):
+                await self.bot.edit_message_text(
+                    chat_id=task.chat_id,
                     message_id=task.processing_msg_id,
                     text=message,
                     parse_mode=parse_mode,
                 )
-            elif task.update.message:
-                await task.update.message.reply_text(message, parse_mode=parse_mode)
+            elif self.bot is not None and task.chat_id is not None:
+                await self.bot.send_message(
+                    chat_id=task.chat_id, text=message, parse_mode=parse_mode
+                )
         except Exception as e:
             logfire.error("Failed to update task message", error=str(e))
             # Fallback: try without markdown
@@ -432,6 +1412,10 @@ class TelegramBot:
         # More flexible URL pattern to handle various Telegram URL formats
         self.url_pattern = re.compile(r"https://t\.me/([^/\s]+)/(\d+)(?:\S*)?")
         self.batch_manager = BatchDownloadManager()
+        # Albums arrive as separate updates sharing a media_group_id; buffer them briefly
+        self.media_group_window = 1.0
+        self._media_groups: dict[str, list[Update]] = {}
+        self._media_group_tasks: dict[str, asyncio.Task] = {}  # type: ignore[annotation-unchecked]
 
     def extract_url_info(self, url: str) -> MessageInfo | None:
         """Extract information from a Telegram URL.
@@ -491,22 +1475,95 @@ class TelegramBot:
             return None
 
     async def download_media_batch(
-        self, message_info: MessageInfo, update: Update, reply_msg_id: int
+        self, message_infos: list[MessageInfo], update: Update, reply_msg_id: int
     ) -> None:
-        """Add media download to batch queue for efficient processing.
+        """Add media downloads to batch queue for efficient processing.
 
         Args:
-            message_info (MessageInfo): The message information
+            message_infos (List[MessageInfo]): The message information, one per link
             update (Update): The Telegram update object
             reply_msg_id (int): The ID of the reply message to edit
         """
-        # Create download task with existing message ID
-        task = DownloadTask(
-            message_info=message_info, update=update, processing_msg_id=reply_msg_id
-        )
+        # Create download tasks with existing message ID
+        tasks = [
+            DownloadTask.from_message_info(
+                message_info,
+                chat_id=update.effective_chat.id if update.effective_chat else None,
+                processing_msg_id=reply_msg_id,
+                user_id=update.effective_user.id if update.effective_user else None,
+            )
+            for message_info in message_infos
+        ]
+
+        # Add to batch queue together, so the reply is edited once for all of them
+        await self.batch_manager.add_download_tasks(tasks)
+
+    def buffer_media_group(self, update: Update) -> None:
+        """Buffer an album update until the whole media group has arrived.
+
+        Args:
+            update (Update): The Telegram update carrying one item of the album
+        """
+        if not update.message or not update.message.media_group_id:
+            return
+
+        group_id = update.message.media_group_id
+        self._media_groups.setdefault(group_id, []).append(update)
+
+        # The first update of a group schedules the flush for the whole album
+        if group_id not in self._media_group_tasks:
+            self._media_group_tasks[group_id] = asyncio.create_task(
+                self._flush_media_group(group_id)
+            )
+
+    async def _flush_media_group(self, group_id: str) -> None:
+        """Send one reply and enqueue one task for a buffered album.
+
+        Args:
+            group_id (str): The media_group_id of the album
+        """
+        await asyncio.sleep(self.media_group_window)
+        updates = self._media_groups.pop(group_id, [])
+        self._media_group_tasks.pop(group_id, None)
+        if not updates:
+            return
+
+        first_update = updates[0]
+        message = first_update.message
+        if not message:
+            return
+
+        # Keep album order and drop duplicate posts
+        message_infos: dict[str, MessageInfo] = {}
+        for update in sorted(updates, key=lambda u: u.message.message_id if u.message else 0):
+            if not update.message:
+                continue
+            message_info = self.extract_forwarded_info(update.message)
+            if message_info and message_info.file_url not in message_infos:
+                message_infos[message_info.file_url] = message_info
+
+        logfire.info("Processing media group", media_group_id=group_id, items=len(updates))
+
+        if not message_infos:
+            await message.reply_text("❌ 無法解析相簿內容，請確認格式是否正確")
+            return
 
-        # Add to batch queue
-        await self.batch_manager.add_download_task(task)
+        try:
+            infos = list(message_infos.values())
+            processing_msg = await message.reply_text(
+                f"⏳ 正在處理相簿下載請求... ({len(infos)} 個媒體)"
+            )
+            task = DownloadTask.from_message_info(
+                infos[0],
+                chat_id=message.chat_id,
+                processing_msg_id=processing_msg.message_id,
+                user_id=message.from_user.id if message.from_user else None,
+                media_group_urls=tuple(info.file_url for info in infos[1:]),
+            )
+            await self.batch_manager.add_download_task(task)
+        except Exception as e:
+            logfire.error("Error in media group handling", error=str(e), _exc_info=True)
+            await message.reply_text(f"❌ 處理訊息時發生錯誤: {e!s}")
 
     async def download_media(self, message_info: MessageInfo) -> tuple[bool, str]:
         """Download media using TDL Manager (legacy single download method).
@@ -518,7 +1575,9 @@ class TelegramBot:
             Tuple[bool, str]: Success status and message
         """
         try:
-            output_folder = Path(f"./data/{message_info.post_chatname}")
+            folder = message_info.post_chatname
+            output_dirs = await self.batch_manager.output_dirs([folder])
+            output_folder = Path(output_dirs[folder])
             logfire.info(
                 "Starting download",
                 post_id=message_info.post_id,
@@ -545,10 +1604,22 @@ class TelegramBot:
 
 
 # Global bot instance
-bot_instance = TelegramBot()
+_bot_instance: TelegramBot | None = None
+
 
+def get_bot_instance() -> TelegramBot:
+    """Return the process-wide bot, created on first use rather than at import.
 
-async def handle_message(update: Update, context: CallbackContext) -> None:
+    Returns:
+        TelegramBot: The bot instance
+    """
+    global _bot_instance
+    if _bot_instance is None:
+        _bot_instance = TelegramBot()
+    return _bot_instance
+
+
+async def handle_message(update: Update, context: "CallbackContext") -> None:
     """Handle incoming messages and process downloads.
 
     Args:
@@ -560,6 +1631,12 @@ async def handle_message(update: Update, context: CallbackContext) -> None:
         return
 
     message = update.message
+
+    # Albums are aggregated into a single task once all items have arrived
+    if message.media_group_id and (message.photo or message.video):
+        get_bot_instance().buffer_media_group(update)
+        return
+
     message_infos = await _extract_message_infos(message)
 
     # Process message infos if we have any
@@ -583,20 +1660,19 @@ async def _extract_message_infos(message: Message) -> list[MessageInfo]:
     # Handle direct URL messages (check for multiple URLs in text)
     if message.text:
         # Extract all Telegram URLs from the text
-        url_pattern = re.compile(r"https://t\.me/[^\s]+")
-        found_urls = url_pattern.findall(message.text)
+        found_urls = TELEGRAM_URL_PATTERN.findall(message.text)
 
         if found_urls:
             logfire.info("Processing URL message(s)", urls=found_urls)
             for url in found_urls:
-                message_info = bot_instance.extract_url_info(url)
+                message_info = get_bot_instance().extract_url_info(url)
                 if message_info:
                     message_infos.append(message_info)
 
     # Handle forwarded media messages
     elif message.photo or message.video:
         logfire.info("Processing forwarded media message")
-        message_info = bot_instance.extract_forwarded_info(message)
+        message_info = get_bot_instance().extract_forwarded_info(message)
         if message_info:
             message_infos.append(message_info)
 
@@ -643,17 +1719,16 @@ async def _process_download_requests(
             )
 
         # Add all tasks to batch queue using the same reply message
-        for message_info in message_infos:
-            await bot_instance.download_media_batch(
-                message_info, update, processing_msg.message_id
-            )
+        await get_bot_instance().download_media_batch(
+            message_infos, update, processing_msg.message_id
+        )
 
     except Exception as e:
         logfire.error("Error in message handling", error=str(e), _exc_info=True)
         await message.reply_text(f"❌ 處理訊息時發生錯誤: {e!s}")
 
 
-async def start(update: Update, context: CallbackContext) -> None:
+async def start(update: Update, context: "CallbackContext") -> None:
     """Handle the /start command.
 
     Args:
@@ -675,14 +1750,17 @@ async def start(update: Update, context: CallbackContext) -> None:
         "• 相同來源的媒體會合併下載，速度更快!\n\n"
         "🔧 **可用命令:**\n"
         "• /start - 顯示此幫助訊息\n"
-        "• /status - 查看下載隊列狀態"
+        "• /status - 查看下載隊列狀態\n"
+        "• /stats - 查看最近 1/15/60 分鐘的下載統計\n"
+        "• /find <關鍵字> - 搜尋已下載的貼文\n"
+        "• /cancel <連結|all> - 取消下載任務"
     )
 
     if update.message:
         await update.message.reply_text(welcome_message, parse_mode="Markdown")
 
 
-async def status(update: Update, context: CallbackContext) -> None:
+async def status(update: Update, context: "CallbackContext") -> None:
     """Handle the /status command to show download queue status.
 
     Args:
@@ -692,32 +1770,238 @@ async def status(update: Update, context: CallbackContext) -> None:
     if not update.message:
         return
 
-    queue_size = len(bot_instance.batch_manager.download_queue)
-    is_processing = bot_instance.batch_manager.processing
+    snapshot = await get_bot_instance().batch_manager.snapshot()
+    queue_size = snapshot.queue_size
+    state = "⏸️ 已暫停" if snapshot.paused else "🟢 處理中" if snapshot.processing else "🔴 空閒"
 
     status_message = (
         f"📊 **下載隊列狀態**\n\n"
         f"• 隊列中任務數量: {queue_size}\n"
-        f"• 處理狀態: {'🟢 處理中' if is_processing else '🔴 空閒'}\n"
-        f"• 批量大小: 20 個文件\n"
-        f"• 批量超時: 3 秒"
+        f"• 處理狀態: {state}\n"
+        f"• 批量大小: {snapshot.batch_size} 個文件\n"
+        f"• 批量超時: {snapshot.batch_timeout:g} 秒"
     )
+    if snapshot.deferred:
+        status_message += f"\n• 延後中任務數量: {snapshot.deferred}"
 
     if queue_size > 0:
         # Show some details about queued tasks
-        recent_tasks = list(bot_instance.batch_manager.download_queue)[:3]
         status_message += "\n\n📋 **最近任務:**\n"
-        for i, task in enumerate(recent_tasks, 1):
-            time_ago = (datetime.now() - task.added_at).total_seconds()
-            status_message += f"{i}. {task.message_info.post_sender} ({time_ago:.0f}s ago)\n"
+        for i, (sender, time_ago) in enumerate(snapshot.recent, 1):
+            status_message += f"{i}. {sender} ({time_ago:.0f}s ago)\n"
 
-        if queue_size > 3:
-            status_message += f"... 及其他 {queue_size - 3} 個任務"
+        if queue_size > len(snapshot.recent):
+            status_message += f"... 及其他 {queue_size - len(snapshot.recent)} 個任務"
 
     await update.message.reply_text(status_message, parse_mode="Markdown")
 
 
-async def error_handler(update: object, context: CallbackContext) -> None:
+def _format_eta(seconds: float) -> str:
+    """Format a predicted delay as a clock time and a rough duration."""
+    minutes = round(seconds / 60)
+    if minutes < 1:
+        rough = "1 分鐘內"
+    elif minutes < 60:
+        rough = f"約 {minutes} 分鐘後"
+    else:
+        rough = f"約 {minutes // 60} 小時 {minutes % 60} 分鐘後"
+    return f"{datetime.now() + timedelta(seconds=seconds):%H:%M} ({rough})"
+
+
+def _format_bytes(size: float) -> str:
+    """Format a byte count with a binary unit, e.g. ``12.3 MiB``."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+async def stats(update: Update, context: "CallbackContext") -> None:
+    """Handle the /stats command to show download throughput over rolling windows.
+
+    Args:
+        update (Update): The Telegram update object
+        context (CallbackContext): The callback context
+    """
+    if not update.message:
+        return
+
+    snapshot = await get_bot_instance().batch_manager.statistics()
+    lines = [
+        "📈 下載統計",
+        "",
+        f"• 運行時間: {snapshot.uptime / 60:.0f} 分鐘",
+        f"• 進行中的 tdl 程序: {snapshot.active_processes}",
+        f"• 累計: {snapshot.total_completed} 完成 / {snapshot.total_failed} 失敗 / "
+        f"{_format_bytes(snapshot.total_bytes)}",
+    ]
+    for window in snapshot.windows:
+        p50 = f"≤{window.p50_latency:g}s" if window.p50_latency is not None else "-"
+        p95 = f"≤{window.p95_latency:g}s" if window.p95_latency is not None else "-"
+        lines.extend([
+            "",
+            f"⏱️ 最近 {window.minutes} 分鐘",
+            f"• 完成: {window.completed} ({window.urls_per_minute:.1f} 個/分鐘)",
+            f"• 失敗率: {window.failure_rate:.1%} ({window.failed} 個失敗)",
+            f"• 流量: {_format_bytes(window.bytes)} ({_format_bytes(window.bytes_per_second)}/s)",
+            f"• 延遲 p50/p95: {p50} / {p95}",
+        ])
+    # Plain text: the numbers contain Markdown special characters
+    await update.message.reply_text("\n".join(lines))
+
+
+async def find(update: Update, context: "CallbackContext") -> None:
+    """Handle the /find command to search already downloaded posts.
+
+    Args:
+        update (Update): The Telegram update object
+        context (CallbackContext): The callback context, with the search text in args
+    """
+    if not update.message:
+        return
+
+    query = " ".join(context.args or []).strip()
+    if not query:
+        await update.message.reply_text("用法: /find <連結、頻道或檔名>")
+        return
+
+    entries = await get_bot_instance().batch_manager.find(query)
+    if not entries:
+        await update.message.reply_text("🔍 找不到符合的下載紀錄")
+        return
+
+    lines = [f"🔍 找到 {len(entries)} 筆下載紀錄:"]
+    for entry in entries:
+        lines.extend([
+            "",
+            f"🔗 {entry.url}",
+            f"📁 {entry.folder} ({len(entry.files)} 個檔案, {_format_bytes(entry.size)})",
+            f"🕒 {entry.completed_at:%Y-%m-%d %H:%M}",
+        ])
+    await update.message.reply_text("\n".join(lines))
+
+
+async def debug(update: Update, context: "CallbackContext") -> None:
+    """Handle the admin-only /debug command to inspect the running process.
+
+    Args:
+        update (Update): The Telegram update object
+        context (CallbackContext): The callback context, with `<section> [seconds]` in args
+    """
+    if not update.message:
+        return
+
+    from src.core.introspect import SECTIONS
+
+    args = context.args or []
+    if not args or args[0] not in SECTIONS:
+        await update.message.reply_text(f"用法: /debug <{'|'.join(SECTIONS)}> [cpu 取樣秒數]")
+        return
+
+    seconds = min(float(args[1]), 20.0) if len(args) > 1 and args[1].isdigit() else 5.0
+    if args[0] == "cpu":
+        await update.message.reply_text(f"⏱️ 取樣 {seconds:g} 秒...")
+    try:
+        report = await get_bot_instance().batch_manager.introspect(args[0], seconds=seconds)
+    except Exception as e:
+        await update.message.reply_text(f"❌ 無法取得資料: {e}")
+        return
+    # Plain text, split at line breaks to fit Telegram's message limit
+    for part in split_message(report):
+        await update.message.reply_text(part)
+
+
+async def tune(update: Update, context: "CallbackContext") -> None:
+    """Handle the admin-only /tune command to show or change tuning parameters live.
+
+    Args:
+        update (Update): The Telegram update object
+        context (CallbackContext): The callback context, with `name=value` pairs in args
+    """
+    if not update.message:
+        return
+
+    args = context.args or []
+    if not all("=" in arg for arg in args):
+        await update.message.reply_text("用法: /tune [參數=值 ...]，例如 /tune batch_size=30")
+        return
+
+    values = dict(arg.split("=", 1) for arg in args)
+    try:
+        tunables = await get_bot_instance().batch_manager.tune(values)
+    except Exception as e:
+        await update.message.reply_text(f"❌ 無法套用: {e}")
+        return
+    title = "✅ 已套用，下一批次生效:" if values else "🎛️ 目前參數:"
+    lines = [title, *(f"• {name} = {value}" for name, value in tunables.model_dump().items())]
+    await update.message.reply_text("\n".join(lines))
+
+
+async def cancel(update: Update, context: "CallbackContext") -> None:
+    """Handle the /cancel command to cancel this chat's queued or running downloads.
+
+    Args:
+        update (Update): The Telegram update object
+        context (CallbackContext): The callback context, with `<url|all>` in args
+    """
+    if not update.message or not update.effective_chat:
+        return
+
+    target = context.args[0] if context.args else None
+    if not target:
+        await update.message.reply_text("用法: /cancel <連結|all>")
+        return
+
+    url = None if target.lower() == "all" else target.strip().rstrip(".,;!?")
+    count = await get_bot_instance().batch_manager.cancel(
+        url=url, chat_id=update.effective_chat.id
+    )
+    if count:
+        await update.message.reply_text(f"🛑 已取消 {count} 個下載任務")
+    else:
+        await update.message.reply_text("🔍 找不到符合的下載任務")
+
+
+async def pause(update: Update, context: "CallbackContext") -> None:
+    """Handle the admin-only /pause command to stop scheduling and in-flight downloads.
+
+    Args:
+        update (Update): The Telegram update object
+        context (CallbackContext): The callback context
+    """
+    if not update.message:
+        return
+
+    manager = get_bot_instance().batch_manager
+    if manager.task_queue is not None:
+        await update.message.reply_text(_QUEUE_MODE_UNSUPPORTED)
+        return
+    stopped = await manager.pause()
+    await update.message.reply_text(
+        f"⏸️ 已暫停下載 (中斷 {stopped} 個進行中的下載，將在 /resume 後重新開始)"
+    )
+
+
+async def resume(update: Update, context: "CallbackContext") -> None:
+    """Handle the admin-only /resume command to continue downloading after /pause.
+
+    Args:
+        update (Update): The Telegram update object
+        context (CallbackContext): The callback context
+    """
+    if not update.message:
+        return
+
+    manager = get_bot_instance().batch_manager
+    if manager.task_queue is not None:
+        await update.message.reply_text(_QUEUE_MODE_UNSUPPORTED)
+        return
+    queue_size = await manager.resume()
+    await update.message.reply_text(f"▶️ 已恢復下載 (隊列中: {queue_size} 個任務)")
+
+
+async def error_handler(update: object, context: "CallbackContext") -> None:
     """Handle errors that occur during bot operation.
 
     Args:
@@ -731,25 +2015,207 @@ async def error_handler(update: object, context: CallbackContext) -> None:
         await update.message.reply_text("❌ 系統發生錯誤，請稍後再試或聯繫管理員")
 
 
+async def _run_executor_command(
+    channel: ExecutorChannel, manager: BatchDownloadManager, command: ExecutorCommand
+) -> None:
+    """Run one forwarded command on the executor's manager and send back the result.
+
+    Args:
+        channel (ExecutorChannel): The channel to reply on
+        manager (BatchDownloadManager): The executor's download manager
+        command (ExecutorCommand): The command from the ingest process
+    """
+    operations: dict[str, Callable[..., Awaitable[Any]]] = {
+        "cancel": manager.cancel,
+        "pause": manager.pause,
+        "resume": manager.resume,
+        "snapshot": manager.snapshot,
+        "statistics": manager.statistics,
+        "find": manager.find,
+        "introspect": manager.introspect,
+        "tune": manager.tune,
+    }
+    try:
+        result = await operations[command.name](**command.kwargs)
+    except Exception as e:
+        logfire.error("Executor command failed", command=command.name, error=str(e))
+        channel.reply(ExecutorReply(request_id=command.request_id, error=str(e)))
+        return
+    # Models defined in this script don't unpickle by reference in the other process
+    if isinstance(result, BaseModel):
+        result = result.model_dump()
+    elif isinstance(result, list):
+        result = [item.model_dump() if isinstance(item, BaseModel) else item for item in result]
+    channel.reply(ExecutorReply(request_id=command.request_id, result=result))
+
+
+async def _pump_executor_tasks(
+    channel: ExecutorChannel, manager: BatchDownloadManager, stopping: asyncio.Event
+) -> None:
+    """Move submitted tasks into the executor's queue, holding back while it is full.
+
+    Args:
+        channel (ExecutorChannel): The channel tasks arrive on
+        manager (BatchDownloadManager): The executor's download manager
+        stopping (asyncio.Event): Set to end the pump after the task it is moving
+    """
+    high_water = manager.batch_size * 2
+    while not stopping.is_set():
+        if len(manager.download_queue) >= high_water:
+            # Leave tasks in the bounded channel so the ingest process feels the backpressure
+            await asyncio.sleep(channel.poll_interval)
+            continue
+        payload = await channel.next_task()
+        if payload is not None:
+            await manager.add_download_task(DownloadTask.from_payload(payload))
+
+
+async def _serve_executor(channel: ExecutorChannel) -> None:
+    """Download executor loop: run tasks and commands sent by the ingest process.
+
+    Args:
+        channel (ExecutorChannel): The channel shared with the ingest process
+    """
+    config = Config()
+    manager = BatchDownloadManager()
+    manager.configure(config)
+    async with Bot(config.token) as bot:
+        manager.bot = bot
+        manager.start_monitoring()
+        stopping = asyncio.Event()
+        pump = asyncio.create_task(_pump_executor_tasks(channel, manager, stopping))
+        logfire.info("Download executor ready", max_pending=channel.max_pending)
+        try:
+            while (command := await channel.next_command()) is None or command.name != "stop":
+                if command is not None:
+                    await _run_executor_command(channel, manager, command)
+            # Let the pump finish its current get instead of cancelling it, which could
+            # lose a task the queue already handed over, then download the rest
+            stopping.set()
+            await pump
+            while (payload := await channel.next_task()) is not None:
+                await manager.add_download_task(DownloadTask.from_payload(payload))
+            if not manager.paused:
+                # A paused executor would wait forever; its queue is dropped, as logged below
+                logfire.info("Download executor draining", queue_size=len(manager.download_queue))
+                await manager.wait_until_idle()
+        finally:
+            pump.cancel()
+            await manager.close()
+    logfire.info("Download executor exiting", queue_size=len(manager.download_queue))
+
+
+def run_executor(channel: ExecutorChannel) -> None:
+    """Entry point of the download executor process started by ``ExecutorClient``.
+
+    The executor loads the same settings as the bot from the environment and ``.env``.
+
+    Args:
+        channel (ExecutorChannel): The channel shared with the ingest process
+    """
+    asyncio.run(_serve_executor(channel))
+
+
+def check() -> int:
+    """Readiness probe: verify the configuration and the download backend without starting.
+
+    Returns:
+        int: Process exit code, 0 when the bot is ready to download
+    """
+    config = Config()
+    account_pool = AccountPool.from_namespaces(config.tdl_namespaces)
+    problems = build_backend(config, account_pool).readiness_problems()
+    for problem in problems:
+        logfire.error("Readiness check failed", problem=problem)
+    return 1 if problems else 0
+
+
 def main() -> None:
     """Main function to run the bot."""
-    global bot_instance
+    # Imports are CPU bound, so CPU time at entry approximates the import cost
+    import_seconds = time.process_time()
+    started_at = time.perf_counter()
+    timings: dict[str, float] = {}
+
+    def lap(phase: str) -> None:
+        timings[phase] = round(time.perf_counter() - started_at - sum(timings.values()), 3)
 
     try:
+        # Deferred: only the polling process needs the Application machinery
+        from telegram.ext import Application, CommandHandler, MessageHandler, filters
+
+        lap("import_ext")
         config = Config()
+        lap("config")
+
+        manager = get_bot_instance().batch_manager
+        manager.configure(config)
+        if config.queue_path is None:
+            # Check once at boot that this process can actually download
+            problems = manager.backend.readiness_problems()
+            if problems:
+                raise RuntimeError("; ".join(problems))
+        lap("readiness")
+
+        if config.queue_path is not None:
+            # Downloads run in worker.py processes claiming from the shared queue
+            manager.task_queue = SQLiteTaskQueue(path=config.queue_path)
+        elif config.executor_process:
+            # Downloads run in a child process; this one only handles Telegram updates
+            executor = ExecutorClient()
+            executor.start(run_executor)
+            manager.executor = executor
+
+        async def report_ready(application: Application) -> None:
+            manager.start_monitoring()
+            lap("initialize")
+            logfire.info(
+                "Bot ready to handle updates",
+                import_seconds=round(import_seconds, 3),
+                startup_seconds=round(time.perf_counter() - started_at, 3),
+                **timings,
+            )
+
+        async def shutdown(application: Application) -> None:
+            await manager.close()
 
         # Create application
-        application = Application.builder().token(config.token).build()
+        application = (
+            Application
+            .builder()
+            .token(config.token)
+            .post_init(report_ready)
+            .post_shutdown(shutdown)
+            .build()
+        )
+        manager.bot = application.bot
 
         # Add handlers
         application.add_handler(CommandHandler("start", start))
         application.add_handler(CommandHandler("status", status))
+        application.add_handler(CommandHandler("stats", stats))
+        application.add_handler(CommandHandler("find", find))
+        application.add_handler(CommandHandler("cancel", cancel))
+        admin_ids = [int(i) for i in config.admin_ids.split(",") if i.strip()]
+        if admin_ids:
+            # Only admins get a reply; non-blocking so a CPU profile never holds up updates
+            admins = filters.User(user_id=admin_ids)
+            application.add_handler(CommandHandler("debug", debug, filters=admins, block=False))
+            application.add_handler(CommandHandler("tune", tune, filters=admins))
+            # Pausing interrupts every user's downloads
+            application.add_handler(CommandHandler("pause", pause, filters=admins))
+            application.add_handler(CommandHandler("resume", resume, filters=admins))
         application.add_handler(MessageHandler(filters.ALL, handle_message))
 
         # Add error handler
         application.add_error_handler(error_handler)
+        lap("build")
 
-        logfire.info("Starting Telegram bot with batch download (20 files, 3s timeout)")
+        logfire.info(
+            "Starting Telegram bot with batch download",
+            batch_size=manager.batch_size,
+            batch_timeout=manager.batch_timeout,
+        )
 
         # Run the bot
         application.run_polling(
@@ -763,4 +2229,6 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    if sys.argv[1:] == ["--check"]:
+        sys.exit(check())
     main()
@@ -0,0 +1,151 @@
+import sys
+import time
+from typing import TextIO
+import asyncio
+from pathlib import Path
+
+from bot import TELEGRAM_URL_PATTERN, TelegramBot, DownloadTask
+import logfire
+from pydantic import Field, BaseModel, PrivateAttr
+from pydantic_settings import CliApp
+
+from src.utils.config import Config
+from src.utils.progress import ProgressLog
+
+
+class BulkImporter(BaseModel):
+    """Feed a file (or stdin) of Telegram URLs straight into the batch download pipeline.
+
+    URLs go through the same ``extract_url_info`` normalization and
+    ``BatchDownloadManager`` scheduling as the bot, without any Telegram replies.
+    Completed URLs are appended to a state file so an interrupted import resumes
+    where it stopped.
+
+    Examples:
+        ```bash
+        python ./bulk_import.py --source ./links.txt
+        cat ./links.txt | python ./bulk_import.py
+        ```
+    """
+
+    source: str = Field(
+        default="-", description="Path to a text file of URLs, or '-' to read from stdin"
+    )
+    state_file: Path | None = Field(
+        default=None,
+        description="File recording completed URLs; defaults to `<source>.done` or ./data/bulk_import.done for stdin",
+    )
+    max_pending: int = Field(
+        default=200, description="Max queued tasks before reading more input (backpressure)"
+    )
+    report_interval: float = Field(default=10.0, description="Seconds between progress reports")
+
+    _submitted: int = PrivateAttr(default=0)
+    _completed: int = PrivateAttr(default=0)
+    _failed: int = PrivateAttr(default=0)
+    _skipped: int = PrivateAttr(default=0)
+    _invalid: int = PrivateAttr(default=0)
+    _started_at: float = PrivateAttr(default_factory=time.monotonic)
+    _last_report: float = PrivateAttr(default_factory=time.monotonic)
+    _bot: TelegramBot = PrivateAttr(default_factory=TelegramBot)
+    _done: set[str] = PrivateAttr(default_factory=set)
+    _progress: ProgressLog | None = PrivateAttr(default=None)
+    _group_finished: asyncio.Event = PrivateAttr(default_factory=asyncio.Event)
+
+    @property
+    def progress(self) -> ProgressLog:
+        """The resumable progress log for this import."""
+        if self.state_file is not None:
+            return ProgressLog(path=self.state_file)
+        if self.source == "-":
+            return ProgressLog(path=Path("./data/bulk_import.done"))
+        return ProgressLog(path=Path(f"{self.source}.done"))
+
+    def _report(self, final: bool = False) -> None:
+        elapsed = max(time.monotonic() - self._started_at, 1e-6)
+        logfire.info(
+            "Bulk import finished" if final else "Bulk import progress",
+            submitted=self._submitted,
+            completed=self._completed,
+            failed=self._failed,
+            skipped=self._skipped,
+            invalid=self._invalid,
+            elapsed_seconds=round(elapsed, 1),
+            urls_per_second=round(self._completed / elapsed, 2),
+        )
+        self._last_report = time.monotonic()
+
+    async def _submit(self, url: str) -> None:
+        """Normalize one URL and queue it unless it is invalid or already done."""
+        message_info = self._bot.extract_url_info(url)
+        if message_info is None:
+            self._invalid += 1
+            return
+        if message_info.file_url in self._done:
+            self._skipped += 1
+            return
+        self._done.add(message_info.file_url)
+
+        # Backpressure: don't read further ahead of the downloader than max_pending
+        manager = self._bot.batch_manager
+        while len(manager.download_queue) >= self.max_pending:
+            self._group_finished.clear()
+            await self._group_finished.wait()
+
+        await manager.add_download_task(DownloadTask.from_message_info(message_info))
+        self._submitted += 1
+
+    async def _on_group_done(self, tasks: list[DownloadTask], success: bool) -> None:
+        urls = [url for task in tasks for url in task.urls]
+        if success:
+            self._progress.mark(urls)
+            self._completed += len(urls)
+        else:
+            self._failed += len(urls)
+        self._group_finished.set()
+
+    async def _read_lines(self, stream: TextIO) -> None:
+        """Stream URLs from the input into the batch manager, then wait for the queue."""
+        self._bot.batch_manager.on_group_done = self._on_group_done
+
+        while line := await asyncio.to_thread(stream.readline):
+            for url in TELEGRAM_URL_PATTERN.findall(line):
+                await self._submit(url)
+            if time.monotonic() - self._last_report >= self.report_interval:
+                self._report()
+
+        idle = asyncio.create_task(self._bot.batch_manager.wait_until_idle())
+        while not idle.done():
+            done, _ = await asyncio.wait({idle}, timeout=self.report_interval)
+            if not done:
+                self._report()
+
+    async def run(self) -> None:
+        """Run the import until every URL has been processed."""
+        self._progress = self.progress
+        self._done = self._progress.load()
+        # Same namespaces, backend, catalog, volumes and tunables as the bot and workers
+        manager = self._bot.batch_manager
+        manager.configure(Config())
+        problems = manager.backend.readiness_problems()
+        if problems:
+            raise RuntimeError("; ".join(problems))
+        logfire.info("Starting bulk import", source=self.source, already_done=len(self._done))
+        try:
+            if self.source == "-":
+                await self._read_lines(sys.stdin)
+            else:
+                stream = await asyncio.to_thread(Path(self.source).open, encoding="utf-8")
+                with stream:
+                    await self._read_lines(stream)
+        finally:
+            self._report(final=True)
+            await manager.close()
+
+    def cli_cmd(self) -> None:
+        """Entry point used by ``CliApp.run``."""
+        asyncio.run(self.run())
+
+
+if __name__ == "__main__":
+    CliApp.run(BulkImporter)
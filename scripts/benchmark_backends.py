@@ -0,0 +1,94 @@
+"""Compare the tdl and Telethon download backends on the same posts.
+
+Run from the repository root. Log the Telethon backend in once, then benchmark:
+
+```bash
+python -m scripts.benchmark_backends login
+python -m scripts.benchmark_backends run --urls '["https://t.me/channel/1","https://t.me/channel/2"]'
+```
+"""
+
+import time
+import asyncio
+from pathlib import Path
+import tempfile
+
+from rich.table import Table
+from rich.console import Console
+
+from src.utils.config import Config
+from src.core.accounts import AccountPool
+from src.core.backends import TDLBackend, DownloadBackend, TelethonBackend
+
+console = Console()
+
+
+def _backends(config: Config, connections: int) -> dict[str, DownloadBackend]:
+    return {
+        "tdl": TDLBackend(account_pool=AccountPool.from_namespaces(config.tdl_namespaces)),
+        "telethon": TelethonBackend(
+            api_id=config.api_id,
+            api_hash=config.api_hash,
+            session_path=config.telethon_session_path,
+            connections=connections,
+        ),
+    }
+
+
+def _folder_size(folder: Path) -> int:
+    return sum(path.stat().st_size for path in folder.rglob("*") if path.is_file())
+
+
+async def _run(urls: list[str], rounds: int, connections: int) -> None:
+    config = Config()
+    table = Table("backend", "round", "seconds", "MiB", "MiB/s", "result")
+    for name, backend in _backends(config, connections).items():
+        try:
+            for i in range(rounds):
+                with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as tmp:
+                    started = time.perf_counter()
+                    result = await backend.download(Path(tmp), urls)
+                    seconds = time.perf_counter() - started
+                    mib = _folder_size(Path(tmp)) / 2**20
+                table.add_row(
+                    name,
+                    str(i + 1),
+                    f"{seconds:.2f}",
+                    f"{mib:.1f}",
+                    f"{mib / seconds:.2f}",
+                    "ok" if result.success else result.stderr.strip()[:60],
+                )
+        finally:
+            await backend.close()
+    console.print(table)
+
+
+def run(urls: list[str], rounds: int = 3, connections: int = 4) -> None:
+    """Download the same posts with each backend into temporary folders and time it.
+
+    The first Telethon round includes connecting; later rounds reuse the connection,
+    which is the point of the in-process backend. Every tdl round pays for the spawn.
+
+    Args:
+        urls (list[str]): Post URLs to download
+        rounds (int): Downloads per backend
+        connections (int): Parallel range requests per large file for Telethon
+    """
+    asyncio.run(_run(urls, rounds, connections))
+
+
+def login() -> None:
+    """Log the Telethon backend in interactively (phone number and code)."""
+    from telethon import TelegramClient
+
+    config = Config()
+    config.telethon_session_path.parent.mkdir(parents=True, exist_ok=True)
+    # Entering the client runs start(), which prompts for the phone number and code
+    with TelegramClient(config.telethon_session_path, config.api_id, config.api_hash):
+        console.print("Logged in")
+
+
+if __name__ == "__main__":
+    import fire
+
+    fire.Fire({"run": run, "login": login})
@@ -0,0 +1,96 @@
+"""Measure how much latency logging adds to the event loop, per call.
+
+Run from the repository root:
+
+```bash
+python -m scripts.benchmark_logging run --calls 5000
+```
+
+Each case logs the same burst from a coroutine and times every call on the loop: the
+direct logfire calls the hot paths used to make, then the queued ``tdl`` loggers of
+``src.utils.log``, enabled, gated out by level and sampled. Console output goes to
+``os.devnull`` so the terminal's speed doesn't count, only formatting and writing.
+"""
+
+import os
+import time
+from typing import TextIO
+import asyncio
+import logging
+import statistics
+from collections.abc import Callable
+
+import logfire
+from rich.table import Table
+from rich.console import Console
+
+from src.utils.log import LogSettings, flush_logging, configure_logging
+
+console = Console()
+_COMMAND = ["tdl", "dl", "--dir", "./data/channel_1234", "--limit", "2", "--threads", "4"]
+_URLS = [f"https://t.me/channel/{i}" for i in range(20)]
+
+
+def _cases() -> dict[str, Callable[[], None]]:
+    log = logging.getLogger("tdl.benchmark")
+    command = [*_COMMAND, "-u", *_URLS]
+
+    return {
+        "logfire f-string": lambda: logfire.info(f"Executing command: {' '.join(command)}"),
+        "logfire URL list": lambda: logfire.info(
+            "Starting batch download", urls=_URLS, output_folder="./data/channel_1234"
+        ),
+        "queued": lambda: log.info("Executing command: %s", command),
+        "queued, below level": lambda: log.debug("Batch download URLs: %s", _URLS),
+        "queued, sampled 1%": lambda: log.info("Sampled event %s", command),
+    }
+
+
+async def _measure(case: Callable[[], None], calls: int) -> list[float]:
+    """Time each call in microseconds, yielding to the loop between calls like handlers do."""
+    durations = []
+    for _ in range(calls):
+        started = time.perf_counter_ns()
+        case()
+        durations.append((time.perf_counter_ns() - started) / 1000)
+        if len(durations) % 100 == 0:
+            await asyncio.sleep(0)
+    return durations
+
+
+async def _run(calls: int, devnull: TextIO) -> None:
+    table = Table("case", "mean us", "p50 us", "p99 us", "burst ms", "drain ms")
+    settings = LogSettings(sampling="Sampled event %s=0.01", queue_size=calls * 2)
+    for name, case in _cases().items():
+        # A fresh sink per case, so no case pays for the previous one's backlog
+        configure_logging(settings, output=devnull)
+        durations = sorted(await _measure(case, calls))
+        started = time.perf_counter()
+        flush_logging()
+        drained = time.perf_counter() - started
+        table.add_row(
+            name,
+            f"{statistics.fmean(durations):.1f}",
+            f"{durations[len(durations) // 2]:.1f}",
+            f"{durations[int(len(durations) * 0.99)]:.1f}",
+            f"{sum(durations) / 1000:.1f}",
+            f"{drained * 1000:.1f}",
+        )
+    console.print(table)
+    console.print("drain: time the sink thread still needed after the burst, off the loop")
+
+
+def run(calls: int = 5000) -> None:
+    """Log a burst of ``calls`` records per case and report the per-call latency.
+
+    Args:
+        calls (int): Records logged per case
+    """
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        asyncio.run(_run(calls, devnull))
+
+
+if __name__ == "__main__":
+    import fire
+
+    fire.Fire({"run": run})
@@ -8,16 +8,20 @@
 #     "rich",
 # ]
 # ///
+import os
 import ast
+import json
 import shutil
 from typing import Literal
 import asyncio
+import hashlib
 from pathlib import Path
 from functools import cached_property
+from concurrent.futures import ProcessPoolExecutor
 
 import anyio
 import nbformat
-from pydantic import Field, BaseModel, ConfigDict, computed_field
+from pydantic import Field, BaseModel, ConfigDict, PrivateAttr, computed_field
 from nbconvert import MarkdownExporter
 from rich.console import Console
 from rich.progress import TaskID, Progress
@@ -25,6 +29,123 @@ from nbconvert.preprocessors import ExecutePreprocessor
 
 console = Console()
 
+# Bump whenever the generated output changes for unchanged sources, to invalidate the cache
+GENERATOR_VERSION = "4"
+CACHE_FILENAME = ".gen_docs_cache.json"
+
+
+class SourceModule(BaseModel):
+    """A source file read once and parsed at most once, shared by every docs mode."""
+
+    content: bytes = Field(..., description="The raw file content.")
+    digest: str = Field(..., description="SHA-256 of the raw file content.")
+
+    _classes: list[str] | None = PrivateAttr(default=None)
+
+    def classes(self, filename: str) -> list[str]:
+        """Return the public class names, parsing the source on the first call only.
+
+        Args:
+            filename (str): The file name used in syntax error messages
+
+        Returns:
+            list[str]: The class names, possibly empty
+        """
+        if self._classes is None:
+            tree = ast.parse(source=self.content, filename=filename)
+            self._classes = [
+                node.name
+                for node in ast.walk(tree)
+                if isinstance(node, ast.ClassDef) and not node.name.startswith("_")
+            ]
+        return self._classes
+
+
+# In-process cache keyed by (path, mtime_ns, size), shared between `file` and `class` runs
+_SOURCE_CACHE: dict[tuple[str, int, int], SourceModule] = {}
+
+
+async def load_source(file: Path) -> SourceModule:
+    """Read a source file, reusing the cached copy if it has not changed on disk.
+
+    Args:
+        file (Path): The source file
+
+    Returns:
+        SourceModule: The cached or freshly read module
+    """
+    stat = await anyio.Path(file).stat()
+    key = (file.as_posix(), stat.st_mtime_ns, stat.st_size)
+    module = _SOURCE_CACHE.get(key)
+    if module is None:
+        async with await anyio.open_file(file, "rb") as f:
+            content = await f.read()
+        module = SourceModule(content=content, digest=hashlib.sha256(content).hexdigest())
+        _SOURCE_CACHE[key] = module
+    return module
+
+
+def walk_sources(root: Path, suffixes: set[str], exclude: set[str]) -> list[Path]:
+    """Collect source files in a single directory walk, pruning excluded folders early.
+
+    Args:
+        root (Path): The folder to walk
+        suffixes (set[str]): File suffixes to keep, e.g. ``{".py", ".ipynb"}``
+        exclude (set[str]): Folder or file names to skip
+
+    Returns:
+        list[Path]: The matching files
+    """
+    files: list[Path] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        # Pruning in place stops os.walk from descending into excluded folders
+        dirnames[:] = [d for d in dirnames if d not in exclude]
+        base = Path(dirpath)
+        files.extend(
+            base / name
+            for name in filenames
+            if name not in exclude and os.path.splitext(name)[1] in suffixes
+        )
+    return files
+
+
+def _render_notebook(file: str, execute: bool) -> str:
+    """Convert a notebook to markdown, executing it first if requested.
+
+    This runs inside a worker process, so it only takes and returns picklable values.
+
+    Args:
+        file (str): The notebook path
+        execute (bool): Whether to execute the notebook before converting it
+
+    Returns:
+        str: The rendered markdown
+    """
+    # 讀取 notebook 檔案
+    notebook_content = nbformat.reads(Path(file).read_text(encoding="utf-8"), as_version=4)
+
+    if execute:
+        # 執行 notebook 中的所有 code block
+        execute_preprocessor = ExecutePreprocessor(
+            timeout=600,
+            kernel_name="python3",
+            allow_errors=True,
+            store_widget_state=True,
+            record_timing=True,
+        )
+        if not isinstance(execute_preprocessor, ExecutePreprocessor):
+            raise TypeError("ExecutePreprocessor is not a valid type")
+        execute_preprocessor.preprocess(
+            notebook_content, {"metadata": {"path": Path(file).parent.as_posix()}}
+        )
+
+    # 使用執行後的 notebook 內容轉換為 markdown
+    markdown_exporter = MarkdownExporter(template_name="markdown")
+    if not isinstance(markdown_exporter, MarkdownExporter):
+        raise TypeError("TemplateExporter is not a valid type")
+    markdown_output, _ = markdown_exporter.from_notebook_node(notebook_content)
+    return markdown_output
+
 
 class DocsGenerator(BaseModel):
     """DocsGenerator is a class that generates documentation for Python files or classes within a specified source directory.
@@ -94,14 +215,15 @@ class DocsGenerator(BaseModel):
         description="Maximum number of files to process concurrently.",
         examples=[5, 10, 20],
     )
+    force: bool = Field(
+        default=False,
+        title="Force Rebuild",
+        description="Ignore the incremental build cache and regenerate every file.",
+        examples=["True", "False"],
+    )
 
-    def _get_all_files(self, suffix: str) -> list[Path]:
-        targets = [s.strip() for s in suffix.split(",")]
-        all_files: list[Path] = []
-        for target in targets:
-            filename = list(self.source_path.rglob(f"*.{target}"))
-            all_files.extend(filename)
-        return all_files
+    _cache: dict[str, dict[str, str]] = PrivateAttr(default_factory=dict)
+    _pool: ProcessPoolExecutor | None = PrivateAttr(default=None)
 
     @computed_field
     @cached_property
@@ -112,14 +234,13 @@ class DocsGenerator(BaseModel):
             Path: The source path.
         """
         if self.source_path.is_dir():
-            if self.output_path.exists():
+            if self.force and self.output_path.exists():
                 shutil.rmtree(self.output_path.absolute())
             exclude_list = [ex.strip() for ex in self.exclude.split(",")]
-            need_to_exclude = list({*exclude_list, ".venv", "__init__.py"})
-            all_files = self._get_all_files(suffix="py,ipynb")
-            all_files = [
-                file for file in all_files if not any(f in file.parts for f in need_to_exclude)
-            ]
+            need_to_exclude = {*exclude_list, ".venv", "__init__.py"}
+            all_files = walk_sources(
+                self.source_path, suffixes={".py", ".ipynb"}, exclude=need_to_exclude
+            )
         elif self.source_path.is_file():
             all_files = [self.source_path]
         else:
@@ -146,16 +267,11 @@ class DocsGenerator(BaseModel):
         if self.mode == "file":
             note_content = f"::: {file.with_suffix('').as_posix().replace('/', '.')}\n"
         elif self.mode == "class":
-            async with await anyio.open_file(file, encoding="utf-8") as f:
-                contents = await f.read()
-                tree = ast.parse(source=contents, filename=file)
-
-            note_content = ""
-            for node in ast.walk(tree):
-                if isinstance(node, ast.ClassDef):
-                    note_content += (
-                        f"::: {file.with_suffix('').as_posix().replace('/', '.')}.{node.name}\n"
-                    )
+            module = await load_source(file)
+            module_path = file.with_suffix("").as_posix().replace("/", ".")
+            note_content = "".join(
+                f"::: {module_path}.{name}\n" for name in module.classes(filename=file.as_posix())
+            )
         else:
             raise ValueError("Invalid mode")
         if not note_content:
@@ -165,38 +281,64 @@ class DocsGenerator(BaseModel):
 
     async def _gen_notebook_docs(self, file: Path) -> str:
         docs_path = await self._prepare_docs_path(file=file)
-        # 讀取 notebook 檔案
-        async with await anyio.open_file(file, encoding="utf-8") as f:
-            notebook_content = nbformat.reads(await f.read(), as_version=4)
-
-        if self.execute:
-            # 執行 notebook 中的所有 code block
-            execute_preprocessor = ExecutePreprocessor(
-                timeout=600,
-                kernel_name="python3",
-                allow_errors=True,
-                store_widget_state=True,
-                record_timing=True,
-            )
-            if not isinstance(execute_preprocessor, ExecutePreprocessor):
-                raise TypeError("ExecutePreprocessor is not a valid type")
-            execute_preprocessor.preprocess(
-                notebook_content, {"metadata": {"path": file.parent.as_posix()}}
-            )
-
-        # 使用執行後的 notebook 內容轉換為 markdown
-        markdown_exporter = MarkdownExporter(template_name="markdown")
-        if not isinstance(markdown_exporter, MarkdownExporter):
-            raise TypeError("TemplateExporter is not a valid type")
-        markdown_output, _ = markdown_exporter.from_notebook_node(notebook_content)
+        # Notebook execution is CPU-bound, so it runs in a process pool sized to the cores
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        loop = asyncio.get_running_loop()
+        markdown_output = await loop.run_in_executor(
+            self._pool, _render_notebook, file.as_posix(), self.execute
+        )
         # 寫入轉換後的 markdown 內容到檔案
         async with await anyio.open_file(docs_path, "w", encoding="utf-8") as f:
             await f.write(markdown_output)
         return docs_path.as_posix()
 
+    @property
+    def _cache_path(self) -> Path:
+        return self.output_path / CACHE_FILENAME
+
+    def _load_cache(self) -> None:
+        """Load the incremental build cache stored beside the output."""
+        if self.force or not self._cache_path.exists():
+            self._cache = {}
+            return
+        try:
+            self._cache = json.loads(self._cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._cache = {}
+
+    def _save_cache(self, files: list[Path]) -> None:
+        """Persist the cache and remove outputs whose sources no longer exist."""
+        current = {file.as_posix() for file in files}
+        for source, entry in list(self._cache.items()):
+            if source not in current:
+                if entry["output"]:
+                    Path(entry["output"]).unlink(missing_ok=True)
+                del self._cache[source]
+        self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._cache_path.write_text(json.dumps(self._cache, indent=2), encoding="utf-8")
+
+    async def _fingerprint(self, file: Path) -> str:
+        """Hash the source content together with everything that affects the output."""
+        module = await load_source(file)
+        digest = hashlib.sha256(module.digest.encode())
+        digest.update(f"{GENERATOR_VERSION}:{self.mode}:{self.execute}".encode())
+        return digest.hexdigest()
+
     async def _process_file(self, file: Path, progress: Progress, task: TaskID) -> str:
         """Process a single file and update progress."""
         try:
+            fingerprint = await self._fingerprint(file)
+            cached = self._cache.get(file.as_posix())
+            # An empty output (e.g. an unsupported file) is cached too, so it isn't redone
+            if (
+                cached
+                and cached["hash"] == fingerprint
+                and (not cached["output"] or await anyio.Path(cached["output"]).exists())
+            ):
+                progress.update(task, advance=1, description=f"[cyan]Unchanged {file.name}")
+                return cached["output"]
+
             if file.suffix == ".ipynb":
                 result = await self._gen_notebook_docs(file=file)
             elif file.suffix == ".py":
@@ -205,6 +347,8 @@ class DocsGenerator(BaseModel):
                 console.log(f"Unsupported file type: {file.suffix}")
                 result = ""
 
+            self._cache[file.as_posix()] = {"hash": fingerprint, "output": result}
+
             # Update progress
             progress.update(task, advance=1, description=f"[cyan]Processed {file.name}")
             return result
@@ -236,7 +380,14 @@ class DocsGenerator(BaseModel):
                 return
 
             # Process all files concurrently with controlled concurrency
-            results = await self._process_batch(self.source_files, progress, task)
+            self._load_cache()
+            try:
+                results = await self._process_batch(self.source_files, progress, task)
+            finally:
+                if self._pool is not None:
+                    self._pool.shutdown()
+                    self._pool = None
+            self._save_cache(self.source_files)
 
             # Summarize results
             successful = len([r for r in results if r])
@@ -0,0 +1,84 @@
+"""Measure the memory held by a queue of download tasks.
+
+Run from the repository root:
+
+```bash
+python -m scripts.measure_task_memory --count 100000
+```
+"""
+
+import gc
+from datetime import datetime
+from collections import deque
+from dataclasses import field, dataclass
+import tracemalloc
+from collections.abc import Callable
+
+from bot import MessageInfo, DownloadTask
+from rich.console import Console
+
+console = Console()
+
+
+@dataclass
+class _LegacyTask:
+    """The previous task layout: a pydantic MessageInfo, a datetime and a list, no slots."""
+
+    message_info: MessageInfo
+    chat_id: int | None = None
+    processing_msg_id: int | None = None
+    added_at: datetime = field(default_factory=datetime.now)
+    media_group_urls: list[str] = field(default_factory=list)
+
+
+def _legacy(i: int) -> _LegacyTask:
+    chat = f"channel{i % 50}"
+    info = MessageInfo(
+        post_id=str(i),
+        post_sender=chat,
+        post_chatname=f"{chat}_{i}",
+        file_url=f"https://t.me/{chat}/{i}",
+    )
+    return _LegacyTask(message_info=info, chat_id=-1000 - i % 50, processing_msg_id=i)
+
+
+def _compact(i: int) -> DownloadTask:
+    chat = f"channel{i % 50}"
+    info = MessageInfo(
+        post_id=str(i),
+        post_sender=chat,
+        post_chatname=f"{chat}_{i}",
+        file_url=f"https://t.me/{chat}/{i}",
+    )
+    return DownloadTask.from_message_info(
+        info, chat_id=-1000 - i % 50, processing_msg_id=i, user_id=42
+    )
+
+
+def _measure(build: Callable[[int], object], count: int) -> int:
+    """Bytes still allocated by a deque of ``count`` tasks once building is done."""
+    gc.collect()
+    tracemalloc.start()
+    queue = deque(build(i) for i in range(count))
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del queue
+    return current
+
+
+def measure(count: int = 100_000) -> None:
+    """Print the memory of ``count`` queued tasks in the legacy and compact layouts.
+
+    Args:
+        count (int): Number of tasks to queue
+    """
+    for name, build in (("legacy", _legacy), ("compact", _compact)):
+        size = _measure(build, count)
+        console.print(f"{name:>8}: {size / 2**20:7.1f} MiB total, {size / count:6.0f} B/task")
+
+
+if __name__ == "__main__":
+    import fire
+
+    fire.Fire(measure)
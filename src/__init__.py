@@ -1,3 +1,3 @@
-import logfire
+from src.utils.log import configure_logging
 
-logfire.configure(send_to_logfire=False)
+configure_logging()
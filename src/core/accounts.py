@@ -0,0 +1,237 @@
+import os
+import re
+import time
+import asyncio
+from pathlib import Path
+import contextlib
+from contextlib import asynccontextmanager
+from collections import deque
+from collections.abc import AsyncIterator
+
+import logfire
+from pydantic import Field, BaseModel, PrivateAttr
+
+from src.core.processor import TDLConfig, TDLResult, tdl_binary_path
+
+_FLOOD_WAIT_PATTERNS = (
+    re.compile(r"FLOOD_WAIT_(\d+)"),
+    re.compile(r"FLOOD_PREMIUM_WAIT_(\d+)"),
+    re.compile(r"A wait of (\d+) seconds", re.IGNORECASE),
+)
+
+
+def parse_flood_wait(text: str) -> int | None:
+    """Extract the FLOOD_WAIT duration reported by Telegram from tdl output.
+
+    Args:
+        text (str): The stdout/stderr of a tdl invocation
+
+    Returns:
+        int | None: Seconds to wait, or None if the output has no flood wait
+    """
+    for pattern in _FLOOD_WAIT_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+class TDLAccount(BaseModel):
+    """One tdl login (namespace) with its own bolt storage."""
+
+    namespace: str = Field(..., description="The tdl namespace (`--ns`) of the account")
+    storage_path: str = Field(
+        ..., description="Bolt storage path, separate per account so processes don't share a lock"
+    )
+    max_active: int = Field(default=1, description="Max concurrent tdl processes on the account")
+
+    _active: int = PrivateAttr(default=0)
+    _cooldown_until: float = PrivateAttr(default=0.0)
+    _flood_waits: deque[float] = PrivateAttr(default_factory=deque)
+
+    @property
+    def cooldown_remaining(self) -> float:
+        """Seconds left before the account may be used again after a FLOOD_WAIT."""
+        return max(self._cooldown_until - time.monotonic(), 0.0)
+
+    @property
+    def cooling_down(self) -> bool:
+        """Whether the account is resting after a FLOOD_WAIT."""
+        return self.cooldown_remaining > 0
+
+    @property
+    def available(self) -> bool:
+        """Whether the account can take another download now."""
+        return not self.cooling_down and self._active < self.max_active
+
+    def score(self, window: float = 600.0) -> float:
+        """Lower is better: current load plus recent flood waits.
+
+        Args:
+            window (float): Seconds during which a flood wait still counts as a penalty
+
+        Returns:
+            float: The scheduling score
+        """
+        cutoff = time.monotonic() - window
+        while self._flood_waits and self._flood_waits[0] < cutoff:
+            self._flood_waits.popleft()
+        return self._active + 2.0 * len(self._flood_waits)
+
+    def reserve(self) -> None:
+        """Count one more running tdl process on the account."""
+        self._active += 1
+
+    def release(self) -> None:
+        """Count one fewer running tdl process on the account."""
+        self._active -= 1
+
+    def cool_down(self, seconds: float) -> None:
+        """Take the account out of rotation for ``seconds``.
+
+        Args:
+            seconds (float): The FLOOD_WAIT reported by Telegram
+        """
+        self._cooldown_until = time.monotonic() + seconds
+        self._flood_waits.append(time.monotonic())
+
+    def tdl_config(self, base: TDLConfig) -> TDLConfig:
+        """Derive the tdl configuration for this account.
+
+        Args:
+            base (TDLConfig): The shared configuration
+
+        Returns:
+            TDLConfig: A copy using this account's namespace and storage
+        """
+        return base.model_copy(
+            update={
+                "namespace": self.namespace,
+                "storage": {"type": "bolt", "path": self.storage_path},
+            }
+        )
+
+
+class AccountPool(BaseModel):
+    """Shards tdl downloads across several accounts and cools down rate-limited ones."""
+
+    accounts: list[TDLAccount] = Field(..., description="The accounts to spread downloads over")
+    base_config: TDLConfig = Field(
+        default_factory=TDLConfig, description="Shared tdl options applied to every account"
+    )
+
+    _changed: asyncio.Condition | None = PrivateAttr(default=None)
+
+    @classmethod
+    def from_namespaces(cls, namespaces: str | list[str]) -> "AccountPool":
+        """Build a pool from namespace names.
+
+        The ``default`` namespace keeps tdl's standard storage path; every other
+        namespace gets its own folder under ``~/.tdl/accounts``.
+
+        Args:
+            namespaces (str | list[str]): Namespaces, as a list or comma separated
+
+        Returns:
+            AccountPool: The pool
+        """
+        if isinstance(namespaces, str):
+            namespaces = [ns.strip() for ns in namespaces.split(",") if ns.strip()]
+        tdl_home = Path.home() / ".tdl"
+        accounts = [
+            TDLAccount(
+                namespace=ns,
+                storage_path=(
+                    tdl_home / "data" if ns == "default" else tdl_home / "accounts" / ns
+                ).as_posix(),
+            )
+            for ns in namespaces or ["default"]
+        ]
+        return cls(accounts=accounts)
+
+    @property
+    def capacity(self) -> int:
+        """Total number of tdl processes the pool runs at once."""
+        return sum(account.max_active for account in self.accounts)
+
+    @property
+    def changed(self) -> asyncio.Condition:
+        """Condition notified whenever an account is released or cools down."""
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    def readiness_problems(self) -> list[str]:
+        """Check that tdl can run and every account is logged in, without spawning tdl.
+
+        Returns:
+            list[str]: Human readable problems; empty when the pool is ready
+        """
+        problems = []
+        binary = tdl_binary_path()
+        if not binary.is_file():
+            problems.append(f"tdl binary not found at {binary}")
+        elif not os.access(binary, os.X_OK):
+            problems.append(f"tdl binary at {binary} is not executable")
+        for account in self.accounts:
+            if not Path(account.storage_path).exists():
+                problems.append(
+                    f"No tdl login for namespace {account.namespace!r} at "
+                    f"{account.storage_path}; run `tdl login` first"
+                )
+        return problems
+
+    def _pick(self) -> TDLAccount | None:
+        candidates = [account for account in self.accounts if account.available]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda account: account.score())
+
+    def _next_wakeup(self) -> float | None:
+        """Seconds until the earliest cooldown ends, or None if no account is cooling down."""
+        remaining = [a.cooldown_remaining for a in self.accounts if a.cooling_down]
+        return min(remaining) if remaining else None
+
+    async def _wait_for_change(self) -> None:
+        """Wait for a release, or for the earliest cooldown to end."""
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self.changed.wait(), timeout=self._next_wakeup())
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[TDLAccount]:
+        """Reserve the least loaded, non rate-limited account for one tdl invocation.
+
+        Yields:
+            TDLAccount: The reserved account
+        """
+        async with self.changed:
+            while (account := self._pick()) is None:
+                await self._wait_for_change()
+            account.reserve()
+        try:
+            yield account
+        finally:
+            async with self.changed:
+                account.release()
+                self.changed.notify_all()
+
+    def report(self, account: TDLAccount, result: TDLResult) -> int | None:
+        """Record the outcome of a tdl invocation and cool the account down on FLOOD_WAIT.
+
+        Args:
+            account (TDLAccount): The account that ran the invocation
+            result (TDLResult): Its result
+
+        Returns:
+            int | None: The flood wait in seconds, if the account was rate limited
+        """
+        if result.success:
+            return None
+        wait = parse_flood_wait(f"{result.stdout}\n{result.stderr}")
+        if wait is None:
+            return None
+        account.cool_down(wait)
+        logfire.warning(
+            "Account rate limited, cooling down", namespace=account.namespace, seconds=wait
+        )
+        return wait
@@ -0,0 +1,89 @@
+from typing import Literal
+
+from pydantic import Field, BaseModel, PrivateAttr
+
+Decision = Literal["accept", "defer", "reject"]
+
+
+class AdmissionPolicy(BaseModel):
+    """High-water marks that keep the backlog within what can be served in reasonable time.
+
+    Below ``soft_limit`` every task is queued. Past it, a user who already has
+    ``user_share`` tasks queued gets the next ones deferred to a second lane, drained
+    only when the queue is back under the soft limit, so one flood doesn't push
+    everyone else's links back. At ``hard_limit`` new tasks are turned away.
+    """
+
+    soft_limit: int = Field(default=200, ge=1, description="Queued tasks before deferring")
+    hard_limit: int = Field(default=1000, ge=1, description="Queued tasks before rejecting")
+    user_share: int = Field(
+        default=20, ge=1, description="Tasks a user keeps in the queue past the soft limit"
+    )
+
+    def decide(self, queued: int, deferred: int, user_queued: int, user_deferred: int) -> Decision:
+        """Choose what happens to a new task.
+
+        Args:
+            queued (int): Tasks in the queue
+            deferred (int): Tasks in the deferred lane
+            user_queued (int): Tasks of the same user in the queue
+            user_deferred (int): Tasks of the same user in the deferred lane
+
+        Returns:
+            Decision: ``accept``, ``defer`` or ``reject``
+        """
+        if queued + deferred >= self.hard_limit:
+            return "reject"
+        # Once a user has deferred tasks, later ones follow them to keep their order
+        if user_deferred or (queued >= self.soft_limit and user_queued >= self.user_share):
+            return "defer"
+        return "accept"
+
+
+class EtaEstimator(BaseModel):
+    """Predicts when queued URLs start and finish from the recent download rate.
+
+    Each finished download contributes its seconds per URL to a moving average;
+    queued URLs are assumed to be served by every slot in parallel.
+    """
+
+    default_seconds: float = Field(
+        default=15.0, gt=0, description="Seconds per URL assumed until a download finished"
+    )
+    alpha: float = Field(default=0.2, gt=0, le=1, description="Weight of the newest sample")
+
+    _seconds_per_url: float | None = PrivateAttr(default=None)
+
+    @property
+    def seconds_per_url(self) -> float:
+        """Smoothed wall time one download process spends per URL."""
+        return self._seconds_per_url or self.default_seconds
+
+    def record(self, urls: int, seconds: float) -> None:
+        """Fold a finished download into the average.
+
+        Args:
+            urls (int): URLs the download covered
+            seconds (float): Its wall time
+        """
+        if urls <= 0 or seconds <= 0:
+            return
+        sample = seconds / urls
+        previous = self._seconds_per_url
+        self._seconds_per_url = (
+            sample if previous is None else self.alpha * sample + (1 - self.alpha) * previous
+        )
+
+    def estimate(self, ahead: float, own: int, slots: int) -> tuple[float, float]:
+        """Seconds until a task starts and until it finishes.
+
+        Args:
+            ahead (float): URLs to be served before the task
+            own (int): URLs of the task
+            slots (int): Downloads running in parallel
+
+        Returns:
+            tuple[float, float]: Seconds to the start and to the finish
+        """
+        start = ahead * self.seconds_per_url / max(slots, 1)
+        return start, start + own * self.seconds_per_url
@@ -0,0 +1,351 @@
+import os
+from abc import ABC, abstractmethod
+import math
+import time
+from typing import TYPE_CHECKING, TypeVar
+import asyncio
+from pathlib import Path
+from collections.abc import Iterable, Coroutine
+
+import logfire
+from pydantic import Field, BaseModel, ConfigDict, PrivateAttr
+
+from src.core.stats import files_written_since
+from src.core.proxies import ProxyPool
+from src.core.accounts import AccountPool
+from src.core.processor import TDLConfig, TDLResult, TelegramDownloader
+
+if TYPE_CHECKING:
+    from telethon import TelegramClient
+    from telethon.tl.patched import Message
+
+_T = TypeVar("_T")
+
+
+async def _gather_or_cancel(coros: Iterable[Coroutine[object, object, _T]]) -> list[_T]:
+    """Run coroutines concurrently; on the first failure cancel the rest and wait for them.
+
+    Unlike a bare ``asyncio.gather``, no coroutine is left writing after the call
+    returns or raises, which ``asyncio.TaskGroup`` only provides from Python 3.11.
+    """
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class DownloadBackend(ABC, BaseModel):
+    """Downloads the media of Telegram post URLs into a folder.
+
+    Backends report through ``TDLResult`` so the batch manager handles every backend
+    the same way; a rate limit is reported as ``FLOOD_WAIT_<seconds>`` in ``stderr``.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @property
+    @abstractmethod
+    def capacity(self) -> int:
+        """How many groups may download concurrently."""
+
+    @abstractmethod
+    async def download(self, output_folder: Path, urls: list[str]) -> TDLResult:
+        """Download the media of ``urls`` into ``output_folder``.
+
+        Args:
+            output_folder (Path): Directory to download files to
+            urls (list[str]): Post URLs
+
+        Returns:
+            TDLResult: The outcome of the download
+        """
+
+    def readiness_problems(self) -> list[str]:
+        """Check, without downloading, that the backend can run.
+
+        Returns:
+            list[str]: Human readable problems, empty when ready
+        """
+        return []
+
+    async def close(self) -> None:
+        """Release connections held by the backend."""
+
+
+class TDLBackend(DownloadBackend):
+    """Runs one tdl process per download, failing over between the pool's accounts."""
+
+    account_pool: AccountPool = Field(
+        default_factory=lambda: AccountPool.from_namespaces("default"),
+        description="tdl accounts the downloads are sharded over",
+    )
+    proxy_pool: ProxyPool | None = Field(
+        default=None, description="Proxies tdl egresses through; unset connects directly"
+    )
+
+    @property
+    def capacity(self) -> int:
+        """One tdl process per free account slot."""
+        return self.account_pool.capacity
+
+    def readiness_problems(self) -> list[str]:
+        """The tdl binary must be executable and every account logged in."""
+        return self.account_pool.readiness_problems()
+
+    async def _run(
+        self, output_folder: Path, urls: list[str], config: TDLConfig, namespace: str
+    ) -> TDLResult:
+        """Run one tdl download, through the best proxy of the pool if there is one."""
+        if self.proxy_pool is None:
+            td = TelegramDownloader(output_folder=output_folder, config=config)
+            return await td.download(urls=urls)
+        async with self.proxy_pool.acquire(namespace) as proxy:
+            td = TelegramDownloader(
+                output_folder=output_folder, config=config.model_copy(update={"proxy": proxy.url})
+            )
+            started_at = time.time()
+            result = await td.download(urls=urls)
+            seconds = time.time() - started_at
+            size = 0
+            if result.success:
+                written = await asyncio.to_thread(files_written_since, output_folder, started_at)
+                size = sum(written.values())
+            await self.proxy_pool.report(proxy, result, size, seconds)
+        return result
+
+    async def download(self, output_folder: Path, urls: list[str]) -> TDLResult:
+        """Run tdl, retrying on another account when one is rate limited."""
+        pool = self.account_pool
+        for _ in pool.accounts:
+            async with pool.acquire() as account:
+                result = await self._run(
+                    output_folder, urls, account.tdl_config(pool.base_config), account.namespace
+                )
+            if pool.report(account, result) is None:
+                break
+            logfire.info("Retrying download on another account", namespace=account.namespace)
+        return result
+
+    async def close(self) -> None:
+        """Stop probing the proxies."""
+        if self.proxy_pool is not None:
+            await self.proxy_pool.close()
+
+
+class TelethonBackend(DownloadBackend):
+    """Downloads in-process over one persistent Telethon connection.
+
+    Unlike tdl, nothing is spawned and the login is loaded once. Large documents are
+    split into ranges fetched by parallel ``iter_download`` streams, each writing its
+    chunks at their offset of a preallocated file, so nothing is buffered in memory.
+    Files are written under a ``.tmp`` name and renamed when complete, like tdl does.
+    """
+
+    api_id: int = Field(..., description="API ID from https://my.telegram.org/auth")
+    api_hash: str = Field(..., description="API hash from https://my.telegram.org/auth")
+    session_path: Path = Field(
+        default=Path("./data/downloader.session"),
+        description="Telethon login file; must not be in use by another process",
+    )
+    connections: int = Field(default=4, description="Parallel range requests per large file")
+    part_size: int = Field(
+        default=512 * 1024, description="Bytes per request; Telegram allows at most 512 KiB"
+    )
+    parallel_threshold: int = Field(
+        default=8 * 1024 * 1024, description="Files smaller than this use a single stream"
+    )
+    max_groups: int = Field(default=2, description="Groups downloaded concurrently")
+    max_files: int = Field(default=4, description="Files of one group downloaded concurrently")
+
+    _client: "TelegramClient | None" = PrivateAttr(default=None)
+    _connecting: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+    _media_dcs: dict[str, int] = PrivateAttr(default_factory=dict)
+
+    @property
+    def capacity(self) -> int:
+        """The configured number of concurrent groups."""
+        return self.max_groups
+
+    def readiness_problems(self) -> list[str]:
+        """The login file must exist; it is authorized by ``scripts.benchmark_backends``."""
+        if not self.session_path.is_file():
+            # Logfire redacts values mentioning sessions, so the path is left out
+            return ["The telethon backend has no login, run `scripts.benchmark_backends login`"]
+        return []
+
+    async def client(self) -> "TelegramClient":
+        """The connected client, created on first use.
+
+        Raises:
+            RuntimeError: If the login file is not authorized
+        """
+        async with self._connecting:
+            if self._client is None:
+                from telethon import TelegramClient
+
+                self.session_path.parent.mkdir(parents=True, exist_ok=True)
+                client = TelegramClient(self.session_path, self.api_id, self.api_hash)
+                await client.connect()
+                if not await client.is_user_authorized():
+                    await client.disconnect()
+                    raise RuntimeError(
+                        "The telethon backend is not logged in, "
+                        "run `python -m scripts.benchmark_backends login` first"
+                    )
+                self._client = client
+                logfire.info("Telethon backend connected")
+            return self._client
+
+    async def close(self) -> None:
+        """Disconnect the client."""
+        if self._client is not None:
+            await self._client.disconnect()
+            self._client = None
+
+    async def _messages(self, urls: list[str]) -> list["Message"]:
+        """Fetch the posts of ``urls``, one request per chat."""
+        from telethon.tl.types import PeerChannel
+
+        from src.core.catalog import parse_post_url
+
+        client = await self.client()
+        by_chat: dict[str, list[int]] = {}
+        peers: dict[str, object] = {}
+        for url in urls:
+            post = parse_post_url(url)
+            if post is None:
+                raise ValueError(f"Not a Telegram post URL: {url}")
+            chat, message_id = post
+            if chat not in peers:
+                peers[chat] = PeerChannel(int(chat[2:])) if chat.startswith("c/") else chat
+            by_chat.setdefault(chat, []).append(message_id)
+        messages = []
+        for chat, ids in by_chat.items():
+            entity = await client.get_entity(peers[chat])
+            fetched = [m for m in await client.get_messages(entity, ids=ids) if m]
+            for message in fetched:
+                # Where the media actually is, which the entity's photo only approximates
+                dc = getattr(message.document or message.photo, "dc_id", None)
+                if dc is not None:
+                    self._media_dcs[chat] = dc
+            messages.extend(fetched)
+        return messages
+
+    async def datacenters(self, chats: list[str]) -> dict[str, int]:
+        """Find the datacenter of chats, as keyed by ``catalog.parse_post_url``.
+
+        Chats whose media were downloaded before use the media's datacenter; others
+        are resolved and located by their profile photo, which lives on their
+        datacenter. Chats without a photo are left out.
+
+        Args:
+            chats (list[str]): Usernames or ``c/<id>`` keys
+
+        Returns:
+            dict[str, int]: The chats found, with their datacenter
+        """
+        from telethon.tl.types import PeerChannel
+
+        client = await self.client()
+        found: dict[str, int] = {}
+        for chat in chats:
+            if chat in self._media_dcs:
+                found[chat] = self._media_dcs[chat]
+                continue
+            peer = PeerChannel(int(chat[2:])) if chat.startswith("c/") else chat
+            try:
+                entity = await client.get_entity(peer)
+            except ValueError:
+                continue
+            dc = getattr(getattr(entity, "photo", None), "dc_id", None)
+            if dc is not None:
+                found[chat] = dc
+        return found
+
+    @staticmethod
+    def _file_name(message: "Message") -> str:
+        """Name the file like tdl does: ``{dialog}_{message}_{name}``."""
+        name = message.file.name or f"{message.id}{message.file.ext or ''}"
+        return f"{message.chat_id}_{message.id}_{name.replace('/', '_')}"
+
+    async def _download_ranges(self, message: "Message", path: Path, size: int) -> None:
+        """Fetch a document as parallel ranges written straight to their offsets."""
+        client = await self.client()
+        parts = math.ceil(size / self.part_size)
+        parts_per_stream = math.ceil(parts / min(self.connections, parts))
+
+        def preallocate() -> int:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            os.ftruncate(fd, size)
+            return fd
+
+        fd = await asyncio.to_thread(preallocate)
+        try:
+
+            async def fetch(first_part: int) -> None:
+                position = first_part * self.part_size
+                async for chunk in client.iter_download(
+                    message.media,
+                    offset=position,
+                    limit=parts_per_stream,
+                    request_size=self.part_size,
+                    file_size=size,
+                ):
+                    await asyncio.to_thread(os.pwrite, fd, chunk, position)
+                    position += len(chunk)
+
+            await _gather_or_cancel(fetch(p) for p in range(0, parts, parts_per_stream))
+        finally:
+            # Every stream has stopped by now, so none can write to a closed or reused fd
+            os.close(fd)
+
+    async def _download_message(self, message: "Message", output_folder: Path) -> int:
+        """Download the media of one post, returning its size."""
+        path = output_folder / self._file_name(message)
+        partial = path.with_name(f"{path.name}.tmp")
+        size = message.file.size or 0
+        try:
+            if message.document is not None and size >= self.parallel_threshold:
+                await self._download_ranges(message, partial, size)
+            else:
+                client = await self.client()
+                await client.download_media(message, file=partial)
+        except BaseException:
+            await asyncio.to_thread(partial.unlink, missing_ok=True)
+            raise
+        await asyncio.to_thread(partial.replace, path)
+        return size
+
+    async def download(self, output_folder: Path, urls: list[str]) -> TDLResult:
+        """Download the media of the posts over the shared connection."""
+        from telethon.errors import FloodWaitError
+
+        command = ["telethon", *urls]
+        slots = asyncio.Semaphore(self.max_files)
+
+        async def download_one(message: "Message") -> int:
+            async with slots:
+                return await self._download_message(message, output_folder)
+
+        try:
+            await asyncio.to_thread(output_folder.mkdir, parents=True, exist_ok=True)
+            messages = [m for m in await self._messages(urls) if m.file is not None]
+            # A failed file stops the others, so nothing writes into the folder after we return
+            sizes = await _gather_or_cancel(download_one(m) for m in messages)
+        except FloodWaitError as e:
+            return TDLResult(
+                success=False, return_code=1, stderr=f"FLOOD_WAIT_{e.seconds}", command=command
+            )
+        except Exception as e:
+            logfire.error("Telethon download failed", error=str(e), urls=urls)
+            return TDLResult(success=False, return_code=1, stderr=str(e), command=command)
+        return TDLResult(
+            success=True,
+            return_code=0,
+            stdout=f"{len(messages)} files, {sum(sizes)} bytes",
+            command=command,
+        )
@@ -0,0 +1,208 @@
+import re
+import json
+import time
+from typing import TypeVar
+import asyncio
+from pathlib import Path
+import sqlite3
+from datetime import datetime
+import contextlib
+from collections.abc import Callable, Iterator
+
+from pydantic import Field, BaseModel, PrivateAttr, model_validator
+
+_T = TypeVar("_T")
+
+# t.me/<username>/<id> and t.me/c/<internal id>/<id>, with an optional topic id in between
+_POST_URL = re.compile(r"https?://t\.me/(?:(c)/)?([\w-]+)/(?:\d+/)?(\d+)")
+
+
+class CatalogEntry(BaseModel):
+    """One URL known to be downloaded."""
+
+    url: str = Field(..., description="The post URL")
+    folder: str = Field(..., description="Folder the post was downloaded to")
+    files: list[str] = Field(default_factory=list, description="Files of the post in the folder")
+    size: int = Field(default=0, description="Total size of the files in bytes")
+    completed_at: datetime = Field(..., description="When the download finished")
+
+    def files_exist(self) -> bool:
+        """Whether the post has recorded files and all of them are still on disk (blocking)."""
+        return bool(self.files) and all(
+            (Path(self.folder) / name).is_file() for name in self.files
+        )
+
+
+def parse_post_url(url: str) -> tuple[str, int] | None:
+    """Split a post URL into its chat and message id.
+
+    Args:
+        url (str): The post URL
+
+    Returns:
+        tuple[str, int] | None: The chat (its username, or ``c/<id>`` for private chats)
+            and the message id, or None if the URL is not a post link
+    """
+    match = _POST_URL.match(url)
+    if match is None:
+        return None
+    private, chat, message_id = match.groups()
+    return f"c/{chat}" if private else chat, int(message_id)
+
+
+def files_of_post(url: str, files: dict[str, int]) -> dict[str, int]:
+    """Pick the files of one post among the files written by a group download.
+
+    tdl names files ``{dialog}_{message}_{name}`` by default, so a post's files are
+    those whose second field is its message id; the id appearing elsewhere in a name
+    (``chan_5_clip_12_a.mp4`` for message 12) doesn't count.
+
+    Args:
+        url (str): The post URL, ending with the message id
+        files (dict[str, int]): File names and sizes written by the download
+
+    Returns:
+        dict[str, int]: The post's files and sizes
+    """
+    post = parse_post_url(url)
+    if post is None:
+        return {}
+    message_id = str(post[1])
+    return {
+        name: size
+        for name, size in files.items()
+        if len(fields := name.split("_", 2)) == 3 and fields[1] == message_id
+    }
+
+
+class DownloadCatalog(BaseModel):
+    """Persistent SQLite index of downloaded URLs, so repeated links skip tdl entirely."""
+
+    path: Path = Field(..., description="The SQLite database file")
+
+    _lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+
+    @model_validator(mode="after")
+    def _setup(self) -> "DownloadCatalog":
+        """Create the database and the downloads table."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS downloads (
+                    url TEXT PRIMARY KEY,
+                    folder TEXT NOT NULL,
+                    files TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    completed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS downloads_completed ON downloads (completed_at)"
+            )
+        return self
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open an autocommit connection that is closed when the block exits."""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    async def _run(self, func: Callable[..., _T], *args: object) -> _T:
+        """Run a blocking SQLite operation off the event loop."""
+        async with self._lock:
+            return await asyncio.to_thread(func, *args)
+
+    @staticmethod
+    def _entry(row: tuple) -> CatalogEntry:
+        url, folder, files, size, completed_at = row
+        return CatalogEntry(
+            url=url,
+            folder=folder,
+            files=json.loads(files),
+            size=size,
+            completed_at=datetime.fromtimestamp(completed_at),
+        )
+
+    def _lookup(self, urls: list[str]) -> dict[str, CatalogEntry]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT url, folder, files, size, completed_at FROM downloads "  # noqa: S608
+                f"WHERE url IN ({','.join('?' * len(urls))})",
+                urls,
+            ).fetchall()
+        return {row[0]: self._entry(row) for row in rows}
+
+    def _record(self, folder: str, posts: dict[str, dict[str, int]]) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO downloads VALUES (?, ?, ?, ?, ?)",
+                [
+                    (url, folder, json.dumps(sorted(files)), sum(files.values()), now)
+                    for url, files in posts.items()
+                ],
+            )
+
+    def _find(self, query: str, limit: int) -> list[CatalogEntry]:
+        pattern = f"%{query}%"
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT url, folder, files, size, completed_at FROM downloads
+                WHERE url LIKE ? OR folder LIKE ? OR files LIKE ?
+                ORDER BY completed_at DESC LIMIT ?
+                """,
+                (pattern, pattern, pattern, limit),
+            ).fetchall()
+        return [self._entry(row) for row in rows]
+
+    async def lookup(self, urls: list[str]) -> dict[str, CatalogEntry]:
+        """Find which URLs were already downloaded and whose files are still on disk.
+
+        Args:
+            urls (list[str]): URLs about to be downloaded
+
+        Returns:
+            dict[str, CatalogEntry]: The known URLs and their entries
+        """
+        if not urls:
+            return {}
+        entries = await self._run(self._lookup, urls)
+
+        def present() -> dict[str, CatalogEntry]:
+            # Deleted files must be downloaded again
+            return {url: entry for url, entry in entries.items() if entry.files_exist()}
+
+        return await asyncio.to_thread(present)
+
+    async def record(self, folder: str, posts: dict[str, dict[str, int]]) -> None:
+        """Record a successful group download.
+
+        URLs none of whose files were found (a text-only post, a renamed file) are left
+        out, so the next request for them runs tdl instead of claiming it's done.
+
+        Args:
+            folder (str): The folder the group was downloaded to
+            posts (dict[str, dict[str, int]]): Each URL with its file names and sizes
+        """
+        posts = {url: files for url, files in posts.items() if files}
+        if posts:
+            await self._run(self._record, folder, posts)
+
+    async def find(self, query: str, limit: int = 10) -> list[CatalogEntry]:
+        """Search downloads by URL, folder or file name.
+
+        Args:
+            query (str): Substring to search for
+            limit (int): Max number of entries, most recent first
+
+        Returns:
+            list[CatalogEntry]: The matching entries
+        """
+        return await self._run(self._find, query, limit)
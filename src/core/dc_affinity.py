@@ -0,0 +1,171 @@
+import json
+import math
+import asyncio
+from pathlib import Path
+import tempfile
+from collections.abc import Callable, Awaitable
+
+import logfire
+from pydantic import Field, BaseModel, PrivateAttr
+
+from src.core.stats import files_written_since
+from src.core.catalog import files_of_post, parse_post_url
+
+
+def make_staging(root: Path) -> Path:
+    """Create a hidden, uniquely named staging folder for a merged download under ``root``."""
+    root.mkdir(parents=True, exist_ok=True)
+    return Path(tempfile.mkdtemp(prefix=".staging-", dir=root))
+
+
+def distribute(staging: Path, groups: dict[str, list[str]]) -> int:
+    """Move the files of a merged download from its staging folder to their folders.
+
+    Each post's files are found by message id, which the planner keeps unique within
+    one merged download.
+
+    Args:
+        staging (Path): Where the merged download wrote its files
+        groups (dict[str, list[str]]): Output folders and the URLs going into each
+
+    Returns:
+        int: Number of files moved
+    """
+    files = files_written_since(staging, 0)
+    moved = 0
+    for output_dir, urls in groups.items():
+        folder = Path(output_dir)
+        for url in urls:
+            for name in files_of_post(url, files):
+                # Moved files are forgotten, so none is claimed by a second post
+                del files[name]
+                folder.mkdir(parents=True, exist_ok=True)
+                (staging / name).replace(folder / name)
+                moved += 1
+    if files:
+        logfire.warning("Dropping unmatched staged files", files=len(files))
+    return moved
+
+
+class DCMap(BaseModel):
+    """Persistent JSON map of chats to the Telegram datacenter holding their media."""
+
+    path: Path = Field(..., description="The JSON file")
+
+    _dcs: dict[str, int] | None = PrivateAttr(default=None)
+
+    def _load(self) -> dict[str, int]:
+        if self._dcs is None:
+            try:
+                self._dcs = json.loads(self.path.read_text(encoding="utf-8") or "{}")
+            except FileNotFoundError:
+                self._dcs = {}
+            except ValueError as e:
+                logfire.warning("Ignoring invalid DC map", path=self.path.as_posix(), error=str(e))
+                self._dcs = {}
+        return self._dcs
+
+    def get(self, chat: str) -> int | None:
+        """The datacenter of a chat, None when not known yet."""
+        return self._load().get(chat)
+
+    def update(self, dcs: dict[str, int]) -> None:
+        """Record datacenters, rewriting the file atomically when anything changed.
+
+        Args:
+            dcs (dict[str, int]): Chats and their datacenter
+        """
+        known = self._load()
+        changed = {chat: dc for chat, dc in dcs.items() if known.get(chat) != dc}
+        if not changed:
+            return
+        known.update(changed)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        partial = self.path.with_name(f"{self.path.name}.tmp")
+        partial.write_text(json.dumps(known, indent=2, sort_keys=True), encoding="utf-8")
+        partial.replace(self.path)
+        logfire.info("Learned chat datacenters", dcs=changed)
+
+
+class BatchPlanner(BaseModel):
+    """Merges the output folders of a batch into tdl invocations by datacenter.
+
+    Each tdl process opens its own connections, one pool per datacenter it touches,
+    and throws them away when it exits. Posts on the same datacenter are therefore
+    downloaded by one process, so its connections stay warm across them instead of
+    every folder paying for a cold start. A chat whose datacenter is unknown is kept
+    on its own, since all of its media live together.
+    """
+
+    dc_map: DCMap = Field(..., description="Known chat datacenters")
+    probe: Callable[[list[str]], Awaitable[dict[str, int]]] | None = Field(
+        default=None, description="Looks up the datacenters of unknown chats, if possible"
+    )
+    probe_timeout: float = Field(
+        default=10.0, description="Seconds a batch waits for probes before planning without"
+    )
+    max_urls: int = Field(default=50, ge=1, description="Max URLs given to one tdl process")
+
+    def _key(self, chat: str | None) -> str:
+        """What folders are clustered by: the datacenter when known, else the chat."""
+        if chat is None:
+            return "?"
+        dc = self.dc_map.get(chat)
+        return f"dc{dc}" if dc is not None else f"@{chat}"
+
+    async def _probe_unknown(self, chats: set[str]) -> None:
+        unknown = sorted(chat for chat in chats if self.dc_map.get(chat) is None)
+        if not unknown or self.probe is None:
+            return
+        try:
+            found = await asyncio.wait_for(self.probe(unknown), timeout=self.probe_timeout)
+        except Exception as e:
+            logfire.warning("Datacenter probe failed", chats=len(unknown), error=str(e))
+            return
+        if found:
+            await asyncio.to_thread(self.dc_map.update, found)
+
+    async def plan(self, groups: dict[str, list[str]], slots: int) -> list[list[str]]:
+        """Split the output folders of a batch into tdl invocations.
+
+        Folders sharing a datacenter go to the same invocation, up to an even share of
+        the batch per slot so that clustering never leaves a slot idle. Two folders
+        with the same message id are never merged, as downloaded files are told apart
+        by it.
+
+        Args:
+            groups (dict[str, list[str]]): Output folders and the URLs going into each
+            slots (int): How many invocations can run at once
+
+        Returns:
+            list[list[str]]: Output folders per invocation, same datacenter adjacent
+        """
+        posts = {url: parse_post_url(url) for urls in groups.values() for url in urls}
+        chats = {
+            folder: post[0] if (post := posts[urls[0]]) is not None else None
+            for folder, urls in groups.items()
+        }
+        await self._probe_unknown({chat for chat in chats.values() if chat is not None})
+        clusters: dict[str, list[str]] = {}
+        for folder, chat in chats.items():
+            clusters.setdefault(self._key(chat), []).append(folder)
+
+        total = sum(len(urls) for urls in groups.values())
+        share = min(self.max_urls, max(1, math.ceil(total / max(slots, 1))))
+        plan: list[list[str]] = []
+        for folders in clusters.values():
+            current: list[str] = []
+            size = 0
+            message_ids: set[int | str] = set()
+            for folder in folders:
+                # A URL that is not a post link can't collide with anything
+                ids = {post[1] if (post := posts[url]) else url for url in groups[folder]}
+                if current and (size + len(groups[folder]) > share or ids & message_ids):
+                    plan.append(current)
+                    current, size, message_ids = [], 0, set()
+                current.append(folder)
+                size += len(groups[folder])
+                message_ids |= ids
+            if current:
+                plan.append(current)
+        return plan
@@ -0,0 +1,275 @@
+import re
+import time
+from typing import TypeVar
+import asyncio
+from pathlib import Path
+import sqlite3
+import contextlib
+from collections.abc import Callable, Iterator
+
+import logfire
+from pydantic import Field, BaseModel, PrivateAttr, model_validator
+from telethon import TelegramClient, utils
+from telethon.tl.types import (
+    Chat,
+    User,
+    Channel,
+    InputPeerChat,
+    InputPeerUser,
+    TypeInputPeer,
+    InputPeerChannel,
+)
+
+_T = TypeVar("_T")
+_COLUMNS = "id, kind, access_hash, username, title, updated_at"
+_JOINED_COLUMNS = ", ".join(f"e.{column}" for column in _COLUMNS.split(", "))
+# Usernames, t.me links and numeric ids can be resolved directly; anything else is a title
+_ADDRESS = re.compile(r"(?:@|https?://t\.me/)?\w{4,}|-?\d+")
+
+
+class CachedEntity(BaseModel):
+    """What is needed to address a chat or user without asking Telegram again."""
+
+    id: int = Field(..., description="Bare id, without the -100 channel prefix")
+    kind: str = Field(..., description="channel, chat or user")
+    access_hash: int | None = Field(default=None, description="Access hash; basic chats have none")
+    username: str | None = Field(default=None, description="Public username, if any")
+    title: str = Field(default="", description="Display name")
+    updated_at: float = Field(..., description="``time.time()`` when it was last resolved")
+
+    @classmethod
+    def from_entity(cls, entity: Channel | Chat | User) -> "CachedEntity":
+        """Keep the addressing fields of a Telethon entity.
+
+        Args:
+            entity (Channel | Chat | User): The entity
+
+        Returns:
+            CachedEntity: The cache record
+        """
+        kind = "channel" if isinstance(entity, Channel) else "chat"
+        if isinstance(entity, User):
+            kind = "user"
+        return cls(
+            id=entity.id,
+            kind=kind,
+            access_hash=getattr(entity, "access_hash", None),
+            username=getattr(entity, "username", None),
+            title=utils.get_display_name(entity),
+            updated_at=time.time(),
+        )
+
+    @property
+    def input_peer(self) -> TypeInputPeer:
+        """The input peer Telethon accepts in place of the entity."""
+        if self.kind == "channel":
+            return InputPeerChannel(self.id, self.access_hash or 0)
+        if self.kind == "user":
+            return InputPeerUser(self.id, self.access_hash or 0)
+        return InputPeerChat(self.id)
+
+    @property
+    def peer_id(self) -> int:
+        """The marked id (``-100…`` for channels), as ``Dialog.id`` reports it."""
+        return utils.get_peer_id(self.input_peer)
+
+
+class CachedDialog(BaseModel):
+    """One dialog of the account, as last listed."""
+
+    entity: CachedEntity = Field(..., description="The chat or user of the dialog")
+    top_message: int = Field(..., description="Id of the newest message when listed")
+    pinned: bool = Field(default=False, description="Whether the dialog is pinned")
+
+
+class EntityCache(BaseModel):
+    """Persistent SQLite cache of resolved entities and of the dialog list.
+
+    Entities resolved by name are served from the cache until ``entity_ttl``; the
+    dialog list is refreshed incrementally, reading dialogs newest first only until
+    one is unchanged, and in full after ``dialog_ttl`` to drop dialogs that were left.
+    """
+
+    path: Path = Field(..., description="The SQLite database file")
+    entity_ttl: float = Field(
+        default=7 * 86400, description="Seconds before a cached entity is resolved again"
+    )
+    dialog_ttl: float = Field(
+        default=86400, description="Seconds between full listings of the dialogs"
+    )
+
+    _lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+
+    @model_validator(mode="after")
+    def _setup(self) -> "EntityCache":
+        """Create the database and its tables."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entities (
+                    id INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    access_hash INTEGER,
+                    username TEXT COLLATE NOCASE,
+                    title TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (kind, id)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entities_username ON entities (username)")
+            conn.execute("CREATE INDEX IF NOT EXISTS entities_title ON entities (title)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS dialogs (
+                    kind TEXT NOT NULL,
+                    id INTEGER NOT NULL,
+                    top_message INTEGER NOT NULL,
+                    pinned INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    PRIMARY KEY (kind, id)
+                )
+                """
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL)")
+        return self
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open an autocommit connection that is closed when the block exits."""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    async def _run(self, func: Callable[..., _T], *args: object) -> _T:
+        """Run a blocking SQLite operation off the event loop."""
+        async with self._lock:
+            return await asyncio.to_thread(func, *args)
+
+    @staticmethod
+    def _entity(row: tuple) -> CachedEntity:
+        id_, kind, access_hash, username, title, updated_at = row
+        return CachedEntity(
+            id=id_,
+            kind=kind,
+            access_hash=access_hash,
+            username=username,
+            title=title,
+            updated_at=updated_at,
+        )
+
+    def _lookup(self, name: str) -> CachedEntity | None:
+        username = name.removeprefix("@").rsplit("/", 1)[-1]
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {_COLUMNS} FROM entities "  # noqa: S608
+                "WHERE username = ? OR title = ? OR CAST(id AS TEXT) = ? "
+                "ORDER BY updated_at DESC LIMIT 1",
+                (username, name, name.removeprefix("-100")),
+            ).fetchone()
+        return self._entity(row) if row else None
+
+    def _store(self, entities: list[CachedEntity]) -> None:
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO entities ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",  # noqa: S608
+                [
+                    (e.id, e.kind, e.access_hash, e.username, e.title, e.updated_at)
+                    for e in entities
+                ],
+            )
+
+    async def resolve(self, client: TelegramClient, name: str) -> CachedEntity:
+        """Find a chat or user by username, link, id or display name.
+
+        Args:
+            client (TelegramClient): Used only when the cache has no fresh entry
+            name (str): How the chat is referred to
+
+        Returns:
+            CachedEntity: The entity
+        """
+        cached = await self._run(self._lookup, name)
+        if cached is not None and time.time() - cached.updated_at < self.entity_ttl:
+            return cached
+        # A display name is only resolvable through the dialogs, which also fills the cache
+        if cached is None and not _ADDRESS.fullmatch(name):
+            await self.dialogs(client)
+            cached = await self._run(self._lookup, name)
+            if cached is not None:
+                return cached
+        target = cached.input_peer if cached is not None else name
+        entity = CachedEntity.from_entity(await client.get_entity(target))
+        await self._run(self._store, [entity])
+        logfire.info("Resolved entity", name=name, id=entity.id)
+        return entity
+
+    def _load_dialogs(self) -> tuple[list[CachedDialog], float]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT d.top_message, d.pinned, {_JOINED_COLUMNS} "  # noqa: S608
+                "FROM dialogs d JOIN entities e ON e.kind = d.kind AND e.id = d.id "
+                "ORDER BY d.position"
+            ).fetchall()
+            synced = conn.execute(
+                "SELECT value FROM meta WHERE key = 'dialogs_synced_at'"
+            ).fetchone()
+        dialogs = [
+            CachedDialog(entity=self._entity(row[2:]), top_message=row[0], pinned=bool(row[1]))
+            for row in rows
+        ]
+        return dialogs, synced[0] if synced else 0.0
+
+    def _save_dialogs(self, dialogs: list[CachedDialog], full: bool) -> None:
+        self._store([dialog.entity for dialog in dialogs])
+        with self._connect() as conn:
+            conn.execute("BEGIN")
+            if full:
+                conn.execute("DELETE FROM dialogs")
+            conn.executemany(
+                "INSERT OR REPLACE INTO dialogs VALUES (?, ?, ?, ?, ?)",
+                [
+                    (d.entity.kind, d.entity.id, d.top_message, d.pinned, position)
+                    for position, d in enumerate(dialogs)
+                ],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('dialogs_synced_at', ?)", (time.time(),)
+            )
+            conn.execute("COMMIT")
+
+    async def dialogs(self, client: TelegramClient) -> list[CachedDialog]:
+        """List the account's dialogs, newest first, with as little traffic as possible.
+
+        Args:
+            client (TelegramClient): Used to list dialogs changed since the last call
+
+        Returns:
+            list[CachedDialog]: Every dialog
+        """
+        cached, synced_at = await self._run(self._load_dialogs)
+        full = not cached or time.time() - synced_at >= self.dialog_ttl
+        known = {(d.entity.kind, d.entity.id): d.top_message for d in cached}
+        fetched: list[CachedDialog] = []
+        async for dialog in client.iter_dialogs():
+            entry = CachedDialog(
+                entity=CachedEntity.from_entity(dialog.entity),
+                top_message=dialog.message.id if dialog.message else 0,
+                pinned=dialog.pinned,
+            )
+            key = (entry.entity.kind, entry.entity.id)
+            # Dialogs come newest first; past pinned ones, the first unchanged dialog
+            # means every older one is unchanged too
+            if not full and not dialog.pinned and known.get(key) == entry.top_message:
+                break
+            fetched.append(entry)
+        if not full:
+            seen = {(d.entity.kind, d.entity.id) for d in fetched}
+            fetched += [d for d in cached if (d.entity.kind, d.entity.id) not in seen]
+        await self._run(self._save_dialogs, fetched, full)
+        logfire.info("Listed dialogs", total=len(fetched), full=full)
+        return fetched
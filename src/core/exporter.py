@@ -0,0 +1,136 @@
+import re
+from enum import Enum
+import json
+from typing import Any
+from pathlib import Path
+from datetime import datetime
+from collections.abc import Iterator
+
+from pydantic import Field, BaseModel
+
+
+class MediaKind(str, Enum):
+    """Media categories derived from the exported file name."""
+
+    PHOTO = "photo"
+    VIDEO = "video"
+    AUDIO = "audio"
+    DOCUMENT = "document"
+
+
+_MEDIA_EXTENSIONS: dict[MediaKind, frozenset[str]] = {
+    MediaKind.PHOTO: frozenset({".jpg", ".jpeg", ".png", ".webp", ".gif", ".heic"}),
+    MediaKind.VIDEO: frozenset({".mp4", ".mkv", ".mov", ".webm", ".avi", ".m4v"}),
+    MediaKind.AUDIO: frozenset({".mp3", ".ogg", ".oga", ".m4a", ".flac", ".wav", ".opus"}),
+}
+
+_CHAT_ID_PATTERN = re.compile(r'"id"\s*:\s*(-?\d+)')
+_SEPARATOR_PATTERN = re.compile(r"[\s,]*")
+_MESSAGES_KEY = '"messages"'
+
+
+def media_kind(file_name: str) -> MediaKind:
+    """Classify an exported file name into a media kind.
+
+    Args:
+        file_name (str): The ``file`` field of an exported message
+
+    Returns:
+        MediaKind: The media kind, ``DOCUMENT`` when the extension is unknown
+    """
+    suffix = Path(file_name).suffix.lower()
+    for kind, extensions in _MEDIA_EXTENSIONS.items():
+        if suffix in extensions:
+            return kind
+    return MediaKind.DOCUMENT
+
+
+class ExportFilter(BaseModel):
+    """Filters applied to messages of a ``tdl chat export`` JSON file."""
+
+    media_types: list[MediaKind] | None = Field(
+        default=None, description="Only keep these media kinds; None keeps everything"
+    )
+    since: datetime | None = Field(default=None, description="Only keep messages sent after")
+    until: datetime | None = Field(default=None, description="Only keep messages sent before")
+    min_id: int | None = Field(default=None, description="Smallest message id to keep")
+    max_id: int | None = Field(default=None, description="Largest message id to keep")
+
+    def matches(self, message: dict[str, Any]) -> bool:
+        """Check whether an exported message passes the filter.
+
+        Args:
+            message (dict[str, Any]): One entry of the export's ``messages`` array
+
+        Returns:
+            bool: True if the message should be downloaded
+        """
+        message_id = int(message.get("id", 0))
+        if self.min_id is not None and message_id < self.min_id:
+            return False
+        if self.max_id is not None and message_id > self.max_id:
+            return False
+
+        date = message.get("date")
+        if date is not None:
+            if self.since is not None and date < self.since.timestamp():
+                return False
+            if self.until is not None and date > self.until.timestamp():
+                return False
+
+        if self.media_types is not None:
+            return media_kind(message.get("file", "")) in self.media_types
+        return True
+
+
+def iter_export_messages(
+    path: Path, chunk_size: int = 1 << 16
+) -> Iterator[tuple[int | None, dict[str, Any]]]:
+    """Stream the messages of a ``tdl chat export`` JSON file without loading it whole.
+
+    The file is read in ``chunk_size`` blocks and each element of the ``messages``
+    array is decoded on its own with ``JSONDecoder.raw_decode``, so memory stays
+    bounded by the largest single message.
+
+    Args:
+        path (Path): The exported JSON file
+        chunk_size (int): Number of characters read per block
+
+    Yields:
+        tuple[int | None, dict[str, Any]]: The chat id of the export and one message
+    """
+    decoder = json.JSONDecoder()
+    with path.open(encoding="utf-8") as f:
+        buffer = ""
+        # Read the header up to the opening bracket of the messages array
+        while True:
+            start = buffer.find(_MESSAGES_KEY)
+            bracket = buffer.find("[", start) if start != -1 else -1
+            if bracket != -1:
+                break
+            block = f.read(chunk_size)
+            if not block:
+                return
+            buffer += block
+
+        chat_match = _CHAT_ID_PATTERN.search(buffer, 0, start)
+        chat_id = int(chat_match.group(1)) if chat_match else None
+        buffer = buffer[bracket + 1 :]
+
+        pos, eof = 0, False
+        while True:
+            pos = _SEPARATOR_PATTERN.match(buffer, pos).end()  # type: ignore[union-attr]
+            if buffer.startswith("]", pos):
+                return
+            try:
+                message, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Incomplete element: keep the tail and read more unless the file is exhausted
+                if eof:
+                    raise
+                buffer, pos = buffer[pos:], 0
+                block = f.read(chunk_size)
+                eof = not block
+                buffer += block
+                continue
+            yield chat_id, message
@@ -0,0 +1,265 @@
+import sys
+import time
+import bisect
+import asyncio
+from weakref import WeakKeyDictionary
+import threading
+import contextlib
+from collections import Counter, deque
+import tracemalloc
+from collections.abc import Coroutine
+
+from pydantic import Field, BaseModel, PrivateAttr
+
+from src.core.processor import running_processes
+
+# Upper bounds (milliseconds) of the loop lag histogram; the last bucket is open ended
+LAG_BOUNDS_MS: tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, float("inf"))
+SECTIONS = ("tasks", "lag", "memory", "cpu", "procs")
+
+
+class Introspector(BaseModel):
+    """Runtime views of a process for admins: tasks, loop lag, memory, CPU and tdl children.
+
+    ``start`` must run inside the event loop: it installs a task factory recording
+    when each task was created and a monitor measuring how late the loop wakes up.
+    Every report is plain text, so it crosses the executor process boundary as is.
+    """
+
+    lag_interval: float = Field(default=0.25, description="Seconds between loop lag samples")
+    recent_lag_samples: int = Field(
+        default=240, description="Lag samples kept for the recent percentiles"
+    )
+    sample_interval: float = Field(
+        default=0.005, description="Seconds between stack samples of the CPU profile"
+    )
+
+    _created: WeakKeyDictionary = PrivateAttr(default_factory=WeakKeyDictionary)
+    _lag_counts: list[int] = PrivateAttr(default_factory=lambda: [0] * len(LAG_BOUNDS_MS))
+    _recent_lag: deque[float] = PrivateAttr(default_factory=deque)
+    _max_lag: float = PrivateAttr(default=0.0)
+    _monitor: asyncio.Task | None = PrivateAttr(default=None)
+    _memory_baseline: tracemalloc.Snapshot | None = PrivateAttr(default=None)
+    _loop_thread: int | None = PrivateAttr(default=None)
+
+    def start(self) -> None:
+        """Start recording task ages and loop lag in the running loop."""
+        if self._monitor is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        previous = loop.get_task_factory()
+
+        def factory(
+            loop: asyncio.AbstractEventLoop, coro: Coroutine, **kwargs: object
+        ) -> asyncio.Task:
+            if previous is not None:
+                task = previous(loop, coro, **kwargs)
+            else:
+                task = asyncio.Task(coro, loop=loop, **kwargs)
+            self._created[task] = time.monotonic()
+            return task
+
+        loop.set_task_factory(factory)
+        self._monitor = asyncio.create_task(self._measure_lag())
+
+    async def close(self) -> None:
+        """Stop the lag monitor."""
+        if self._monitor is not None:
+            self._monitor.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._monitor
+            self._monitor = None
+
+    async def _measure_lag(self) -> None:
+        recent = self._recent_lag
+        while True:
+            expected = time.monotonic() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            lag_ms = max(time.monotonic() - expected, 0.0) * 1000
+            self._lag_counts[bisect.bisect_left(LAG_BOUNDS_MS, lag_ms)] += 1
+            self._max_lag = max(self._max_lag, lag_ms)
+            recent.append(lag_ms)
+            if len(recent) > self.recent_lag_samples:
+                recent.popleft()
+
+    def tasks(self, limit: int = 30) -> str:
+        """List the pending asyncio tasks, oldest first, with what they are waiting in.
+
+        Args:
+            limit (int): Max number of tasks listed
+
+        Returns:
+            str: The report
+        """
+        now = time.monotonic()
+        pending = sorted(asyncio.all_tasks(), key=lambda task: self._created.get(task, now))
+        lines = [f"{len(pending)} tasks"]
+        for task in pending[:limit]:
+            created = self._created.get(task)
+            age = f"{now - created:8.1f}s" if created is not None else "       ?"
+            frames = task.get_stack(limit=1)
+            where = (
+                f"{frames[0].f_code.co_filename.rsplit('/', 1)[-1]}:{frames[0].f_lineno}"
+                if frames
+                else "-"
+            )
+            lines.append(f"{age}  {task.get_name()}  {task.get_coro().__qualname__}  @ {where}")
+        if len(pending) > limit:
+            lines.append(f"... {len(pending) - limit} more")
+        return "\n".join(lines)
+
+    def lag(self) -> str:
+        """Summarize how late the event loop wakes up, as a histogram and percentiles.
+
+        Returns:
+            str: The report
+        """
+        total = sum(self._lag_counts)
+        if not total:
+            return "No lag samples yet"
+        recent = sorted(self._recent_lag)
+        p50 = recent[len(recent) // 2]
+        p99 = recent[min(int(len(recent) * 0.99), len(recent) - 1)]
+        lines = [
+            f"{total} samples every {self.lag_interval:g}s, max {self._max_lag:.1f}ms",
+            f"recent p50 {p50:.1f}ms, p99 {p99:.1f}ms",
+        ]
+        lower = 0.0
+        for bound, count in zip(LAG_BOUNDS_MS, self._lag_counts, strict=True):
+            if count:
+                bar = "#" * max(1, round(40 * count / total))
+                lines.append(f"{lower:>5g}-{bound:<5g}ms {count:>7} {bar}")
+            lower = bound
+        return "\n".join(lines)
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        """A snapshot without tracemalloc's own allocations."""
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__),
+        ))
+
+    def memory(self, top: int = 15) -> str:
+        """Compare allocations with the previous call, by source line.
+
+        The first call starts tracemalloc, which slows allocations down, and takes the
+        baseline; later calls show the top growth since the call before.
+
+        Args:
+            top (int): Number of source lines shown
+
+        Returns:
+            str: The report
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._memory_baseline = self._take_snapshot()
+            return "tracemalloc started; run again to see the growth since now"
+        snapshot = self._take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"traced {current / 2**20:.1f} MiB, peak {peak / 2**20:.1f} MiB"]
+        if self._memory_baseline is not None:
+            for stat in snapshot.compare_to(self._memory_baseline, "lineno")[:top]:
+                frame = stat.traceback[0]
+                lines.append(
+                    f"{stat.size_diff / 1024:+9.1f} KiB {stat.count_diff:+7} blocks  "
+                    f"{frame.filename.rsplit('/', 1)[-1]}:{frame.lineno}"
+                )
+        self._memory_baseline = snapshot
+        return "\n".join(lines)
+
+    async def cpu(self, seconds: float = 5.0, top: int = 15) -> str:
+        """Sample the event loop thread's stack for ``seconds`` and rank functions.
+
+        A background thread reads the loop thread's current frame, so the loop runs
+        unmodified while it is observed.
+
+        Args:
+            seconds (float): How long to sample
+            top (int): Number of functions shown
+
+        Returns:
+            str: The report, by self samples (on top of the stack) and total samples
+        """
+        target = self._loop_thread or threading.main_thread().ident
+        own: Counter[str] = Counter()
+        total: Counter[str] = Counter()
+        samples = 0
+        stop = threading.Event()
+
+        def sample() -> None:
+            nonlocal samples
+            while not stop.wait(self.sample_interval):
+                frame = sys._current_frames().get(target)  # noqa: SLF001
+                seen = set()
+                leaf = True
+                while frame is not None:
+                    code = frame.f_code
+                    filename = code.co_filename.rsplit("/", 1)[-1]
+                    name = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+                    if leaf:
+                        own[name] += 1
+                        leaf = False
+                    if name not in seen:
+                        total[name] += 1
+                        seen.add(name)
+                    frame = frame.f_back
+                samples += 1
+
+        sampler = threading.Thread(target=sample, name="cpu-profile", daemon=True)
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            stop.set()
+            await asyncio.to_thread(sampler.join)
+        if not samples:
+            return "No samples"
+        lines = [f"{samples} samples in {seconds:g}s", "", "self:"]
+        lines += [f"{count / samples:6.1%}  {name}" for name, count in own.most_common(top)]
+        lines += ["", "total:"]
+        lines += [f"{count / samples:6.1%}  {name}" for name, count in total.most_common(top)]
+        return "\n".join(lines)
+
+    @staticmethod
+    def processes() -> str:
+        """List the running tdl children with their runtime.
+
+        Returns:
+            str: The report
+        """
+        running = running_processes()
+        if not running:
+            return "No tdl process running"
+        lines = [f"{len(running)} tdl processes"]
+        for process in running:
+            args = " ".join(process.command)
+            lines.append(f"{process.pid:>7} {process.runtime:8.1f}s  {args[:200]}")
+        return "\n".join(lines)
+
+    async def report(self, section: str, seconds: float = 5.0, top: int = 15) -> str:
+        """Build one of the reports by name.
+
+        Args:
+            section (str): One of ``SECTIONS``
+            seconds (float): Sampling time of the CPU profile
+            top (int): Number of lines in ranked reports
+
+        Returns:
+            str: The report
+
+        Raises:
+            ValueError: If the section is unknown
+        """
+        if section == "tasks":
+            return self.tasks(limit=top * 2)
+        if section == "lag":
+            return self.lag()
+        if section == "memory":
+            return self.memory(top=top)
+        if section == "cpu":
+            return await self.cpu(seconds=seconds, top=top)
+        if section == "procs":
+            return self.processes()
+        raise ValueError(f"Unknown section {section!r}, choose from {list(SECTIONS)}")
@@ -0,0 +1,222 @@
+import queue
+from typing import Any
+import asyncio
+import itertools
+from collections.abc import Callable
+import multiprocessing
+from multiprocessing.process import BaseProcess
+
+import logfire
+from pydantic import Field, BaseModel, PrivateAttr, model_validator
+
+_SPAWN = multiprocessing.get_context("spawn")
+
+
+class ExecutorCommand(BaseModel):
+    """A control request sent from the ingest process to the download executor."""
+
+    request_id: int = Field(..., description="Matches the reply to the request")
+    name: str = Field(..., description="The manager operation, e.g. cancel, pause, resume")
+    kwargs: dict[str, Any] = Field(default_factory=dict, description="Operation arguments")
+
+
+class ExecutorReply(BaseModel):
+    """The executor's answer to an ``ExecutorCommand``."""
+
+    request_id: int = Field(..., description="The request being answered")
+    result: Any = Field(default=None, description="The operation's return value")
+    error: str | None = Field(default=None, description="Set if the operation raised")
+
+
+class ExecutorChannel(BaseModel):
+    """Queues connecting the Telegram ingest process to the download executor process.
+
+    Download tasks travel over a bounded queue: when the executor falls behind, the
+    queue fills up and ``submit`` blocks the ingest side, which stops reading updates
+    and leaves them buffered on Telegram's side. Control commands and replies use
+    separate unbounded queues so /cancel and /pause are never stuck behind tasks.
+
+    The channel is passed to the executor process when it starts; the ``submit`` and
+    ``call`` methods are used by the ingest side, the ``next_*`` and ``reply`` methods
+    by the executor.
+    """
+
+    max_pending: int = Field(
+        default=100, description="Tasks buffered between the processes before ingest blocks"
+    )
+    poll_interval: float = Field(
+        default=0.5, description="Seconds between liveness checks while waiting on a queue"
+    )
+
+    _tasks: Any = PrivateAttr(default=None)
+    _commands: Any = PrivateAttr(default=None)
+    _replies: Any = PrivateAttr(default=None)
+
+    @model_validator(mode="after")
+    def _setup(self) -> "ExecutorChannel":
+        """Create the inter-process queues."""
+        self._tasks = _SPAWN.Queue(maxsize=self.max_pending)
+        self._commands = _SPAWN.Queue()
+        self._replies = _SPAWN.Queue()
+        return self
+
+    @staticmethod
+    def _get(source: Any, timeout: float) -> Any:  # noqa: ANN401
+        """Blocking get that returns None instead of raising on timeout."""
+        try:
+            return source.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def pending(self) -> int:
+        """Approximate number of tasks waiting for the executor."""
+        try:
+            return self._tasks.qsize()
+        except NotImplementedError:  # macOS has no sem_getvalue
+            return 0
+
+    # Ingest side
+
+    async def submit(self, payload: dict[str, Any], is_alive: Callable[[], bool]) -> None:
+        """Send a serialized task, waiting while the executor's buffer is full.
+
+        Args:
+            payload (dict[str, Any]): The serialized DownloadTask
+            is_alive (Callable[[], bool]): Reports whether the executor is still running
+
+        Raises:
+            RuntimeError: If the executor process exited
+        """
+
+        def put() -> bool:
+            try:
+                self._tasks.put(payload, timeout=self.poll_interval)
+            except queue.Full:
+                return False
+            return True
+
+        while not await asyncio.to_thread(put):
+            if not is_alive():
+                raise RuntimeError("Download executor process is not running")
+
+    async def call(
+        self, command: ExecutorCommand, is_alive: Callable[[], bool], timeout: float
+    ) -> Any:  # noqa: ANN401
+        """Send a command and wait for its reply.
+
+        Args:
+            command (ExecutorCommand): The command
+            is_alive (Callable[[], bool]): Reports whether the executor is still running
+            timeout (float): Seconds to wait for the reply
+
+        Returns:
+            Any: The result of the operation in the executor
+
+        Raises:
+            RuntimeError: If the executor exited, timed out or the operation failed
+        """
+        self._commands.put(command)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            reply = await asyncio.to_thread(self._get, self._replies, self.poll_interval)
+            if reply is not None and reply.request_id == command.request_id:
+                if reply.error is not None:
+                    raise RuntimeError(reply.error)
+                return reply.result
+            if not is_alive():
+                raise RuntimeError("Download executor process is not running")
+        raise RuntimeError(f"Download executor did not answer {command.name!r} in time")
+
+    def close(self) -> None:
+        """Tell the executor to stop once the tasks already submitted are downloaded."""
+        self._commands.put(ExecutorCommand(request_id=-1, name="stop"))
+
+    # Executor side
+
+    async def next_task(self) -> dict[str, Any] | None:
+        """Wait up to ``poll_interval`` for a task."""
+        return await asyncio.to_thread(self._get, self._tasks, self.poll_interval)
+
+    async def next_command(self) -> ExecutorCommand | None:
+        """Wait up to ``poll_interval`` for a command; a ``stop`` command ends the executor."""
+        return await asyncio.to_thread(self._get, self._commands, self.poll_interval)
+
+    def reply(self, reply: ExecutorReply) -> None:
+        """Send the answer to a command back to the ingest process."""
+        self._replies.put(reply)
+
+
+class ExecutorClient(BaseModel):
+    """Ingest-side handle on a download executor running in its own OS process.
+
+    The executor gets its own interpreter, event loop and core, so subprocess pipe
+    handling and message rendering for downloads never delay replies to new updates.
+    """
+
+    channel: ExecutorChannel = Field(
+        default_factory=ExecutorChannel, description="Queues shared with the executor"
+    )
+    call_timeout: float = Field(default=30.0, description="Seconds to wait for command replies")
+    stop_timeout: float = Field(
+        default=300.0,
+        description="Seconds the executor may spend finishing submitted tasks when stopped",
+    )
+
+    _process: BaseProcess | None = PrivateAttr(default=None)
+    _request_ids: Any = PrivateAttr(default_factory=itertools.count)
+    _lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+
+    def start(self, target: Callable[..., None], *args: object) -> None:
+        """Spawn the executor process.
+
+        Args:
+            target (Callable[..., None]): Importable function running the executor; it
+                receives the channel followed by ``args``
+            *args (object): Extra picklable arguments for ``target``
+        """
+        self._process = _SPAWN.Process(
+            target=target, args=(self.channel, *args), name="tdl-executor", daemon=True
+        )
+        self._process.start()
+        logfire.info("Started download executor process", pid=self._process.pid)
+
+    def is_alive(self) -> bool:
+        """Whether the executor process is running."""
+        return self._process is not None and self._process.is_alive()
+
+    async def submit(self, payload: dict[str, Any]) -> None:
+        """Hand a serialized task to the executor, blocking while its buffer is full."""
+        await self.channel.submit(payload, self.is_alive)
+
+    async def call(self, name: str, **kwargs: object) -> Any:  # noqa: ANN401
+        """Run a manager operation in the executor and return its result.
+
+        Args:
+            name (str): The operation, e.g. ``cancel``, ``pause``, ``resume`` or ``snapshot``
+            **kwargs (object): Its arguments
+
+        Returns:
+            Any: The operation's return value
+        """
+        async with self._lock:
+            command = ExecutorCommand(request_id=next(self._request_ids), name=name, kwargs=kwargs)
+            return await self.channel.call(command, self.is_alive, self.call_timeout)
+
+    async def stop(self, timeout: float | None = None) -> None:
+        """Ask the executor to exit and wait for it, killing it if it does not.
+
+        Args:
+            timeout (float | None): Seconds to wait for a clean exit, ``stop_timeout``
+                when None; tasks still queued when it runs out are lost
+        """
+        if self._process is None:
+            return
+        self.channel.close()
+        await asyncio.to_thread(
+            self._process.join, self.stop_timeout if timeout is None else timeout
+        )
+        if self._process.is_alive():
+            self._process.kill()
+            await asyncio.to_thread(self._process.join)
+        logfire.info("Download executor stopped", exitcode=self._process.exitcode)
@@ -0,0 +1,151 @@
+import time
+import shutil
+from typing import TypeVar
+import asyncio
+from pathlib import Path
+import sqlite3
+import contextlib
+from collections.abc import Callable, Iterator
+
+import logfire
+from pydantic import Field, BaseModel, PrivateAttr, model_validator
+
+_T = TypeVar("_T")
+
+
+class VolumePlacer(BaseModel):
+    """Spreads download folders over several root directories, one per disk.
+
+    A new folder goes to the root with the most free space per download already
+    writing to it, so parallel downloads use the bandwidth of every disk and the
+    fullest disk gets the fewest new folders. Each placement is stored in SQLite and
+    kept, so a folder downloaded again (a retry, another post of the same forwarded
+    chat) lands on the same volume and its path can be looked up later.
+    """
+
+    roots: list[Path] = Field(..., min_length=1, description="Root directories, one per volume")
+    path: Path = Field(..., description="The SQLite database of placements")
+    min_free_bytes: int = Field(
+        default=1024**3, description="Roots with less free space get no new folders"
+    )
+
+    _lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+    _active: dict[Path, int] = PrivateAttr(default_factory=dict)
+
+    @model_validator(mode="after")
+    def _setup(self) -> "VolumePlacer":
+        """Create the roots, the database and the placements table."""
+        for root in self.roots:
+            root.mkdir(parents=True, exist_ok=True)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS placements (
+                    folder TEXT PRIMARY KEY,
+                    root TEXT NOT NULL,
+                    placed_at REAL NOT NULL
+                )
+                """
+            )
+        return self
+
+    @classmethod
+    def from_roots(cls, roots: str, path: Path) -> "VolumePlacer | None":
+        """Build a placer from comma separated root directories.
+
+        Args:
+            roots (str): Root directories, comma separated
+            path (Path): The SQLite database of placements
+
+        Returns:
+            VolumePlacer | None: The placer, or None when no root is given
+        """
+        paths = [Path(root.strip()) for root in roots.split(",") if root.strip()]
+        return cls(roots=paths, path=path) if paths else None
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open an autocommit connection that is closed when the block exits."""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    async def _run(self, func: Callable[..., _T], *args: object) -> _T:
+        """Run a blocking SQLite operation off the event loop."""
+        async with self._lock:
+            return await asyncio.to_thread(func, *args)
+
+    def _root_of(self, path: Path) -> Path | None:
+        """The root a path is under, if any."""
+        for root in self.roots:
+            if path == root or root in path.parents:
+                return root
+        return None
+
+    def _place(self, folders: list[str]) -> dict[str, Path]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT folder, root FROM placements "  # noqa: S608
+                f"WHERE folder IN ({','.join('?' * len(folders))})",
+                folders,
+            ).fetchall()
+            placed = {folder: Path(root) for folder, root in rows}
+            new = [folder for folder in dict.fromkeys(folders) if folder not in placed]
+            if not new:
+                return placed
+            free = {root: shutil.disk_usage(root).free for root in self.roots}
+            # Folders placed in this call count as load too, or they'd all go to one root
+            load = {root: self._active.get(root, 0) for root in self.roots}
+            roomy = [root for root in self.roots if free[root] >= self.min_free_bytes]
+            if not roomy:
+                logfire.warning("Every volume is low on space", min_free=self.min_free_bytes)
+            candidates = roomy or self.roots
+            now = time.time()
+            for folder in new:
+                root = min(candidates, key=lambda r: (load[r] + 1) / max(free[r], 1))
+                load[root] += 1
+                placed[folder] = root
+            conn.executemany(
+                "INSERT OR IGNORE INTO placements VALUES (?, ?, ?)",
+                [(folder, placed[folder].as_posix(), now) for folder in new],
+            )
+        logfire.info(
+            "Placed folders",
+            roots={root.as_posix(): load[root] - self._active.get(root, 0) for root in self.roots},
+        )
+        return placed
+
+    async def place(self, folders: list[str]) -> dict[str, Path]:
+        """Find or choose the volume of each folder.
+
+        A folder placed before resolves to the same volume, even if that volume has
+        since filled up or been removed from the roots.
+
+        Args:
+            folders (list[str]): Folder names, relative to a root
+
+        Returns:
+            dict[str, Path]: Each folder's full path
+        """
+        roots = await self._run(self._place, folders)
+        return {folder: roots[folder] / folder for folder in folders}
+
+    @contextlib.contextmanager
+    def writing(self, path: Path) -> Iterator[None]:
+        """Count a download writing under ``path`` towards its volume's load.
+
+        Args:
+            path (Path): The download's folder
+        """
+        root = self._root_of(path)
+        if root is not None:
+            self._active[root] = self._active.get(root, 0) + 1
+        try:
+            yield
+        finally:
+            if root is not None:
+                self._active[root] -= 1
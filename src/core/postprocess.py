@@ -0,0 +1,365 @@
+from abc import ABC, abstractmethod
+import json
+import time
+import shutil
+from typing import Any
+import asyncio
+import hashlib
+from pathlib import Path
+import contextlib
+import subprocess
+from collections.abc import AsyncIterator
+import multiprocessing
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+
+import logfire
+from pydantic import Field, BaseModel, PrivateAttr
+
+from src.core.stats import THUMBNAIL_SUFFIX, is_download
+from src.core.exporter import MediaKind, media_kind
+
+MANIFEST_NAME = ".postprocess.jsonl"
+_MAGIC_NUMBERS: dict[str, tuple[bytes, ...]] = {
+    ".jpg": (b"\xff\xd8\xff",),
+    ".jpeg": (b"\xff\xd8\xff",),
+    ".png": (b"\x89PNG\r\n\x1a\n",),
+    ".gif": (b"GIF87a", b"GIF89a"),
+    ".webp": (b"RIFF",),
+    ".mp4": (b"ftyp",),
+    ".mov": (b"ftyp",),
+    ".m4v": (b"ftyp",),
+    ".mkv": (b"\x1a\x45\xdf\xa3",),
+    ".webm": (b"\x1a\x45\xdf\xa3",),
+}
+
+
+class PostProcessStep(ABC, BaseModel):
+    """One step run on every downloaded file, inside the post-processing pool.
+
+    Steps run off the event loop, possibly in another process, so they must be
+    picklable and ``run`` must be synchronous.
+    """
+
+    name: str = Field(..., description="Key of the step's result in the manifest")
+
+    @abstractmethod
+    def run(self, path: Path) -> dict[str, Any]:
+        """Process one file.
+
+        Args:
+            path (Path): The downloaded file
+
+        Returns:
+            dict[str, Any]: JSON-compatible results for the manifest
+        """
+
+
+class IntegrityCheck(PostProcessStep):
+    """Reject empty files and files whose header doesn't match their extension."""
+
+    name: str = "integrity"
+
+    def run(self, path: Path) -> dict[str, Any]:
+        """Check the size and magic number of a file."""
+        size = path.stat().st_size
+        if size == 0:
+            raise ValueError("file is empty")
+        expected = _MAGIC_NUMBERS.get(path.suffix.lower())
+        if expected:
+            with path.open("rb") as f:
+                header = f.read(12)
+            # ISO media files carry "ftyp" at offset 4
+            if not any(header.startswith(m) or header[4:].startswith(m) for m in expected):
+                raise ValueError(f"header {header[:8].hex()} does not match {path.suffix}")
+        return {"size": size}
+
+
+class HashStep(PostProcessStep):
+    """Hash the file in blocks, for deduplication and later verification."""
+
+    name: str = "hash"
+    algorithm: str = Field(default="sha256", description="Any hashlib algorithm")
+    block_size: int = Field(default=1 << 20, description="Bytes read per block")
+
+    def run(self, path: Path) -> dict[str, Any]:
+        """Hash one file."""
+        digest = hashlib.new(self.algorithm)
+        with path.open("rb") as f:
+            while block := f.read(self.block_size):
+                digest.update(block)
+        return {"algorithm": self.algorithm, "digest": digest.hexdigest()}
+
+
+class MediaProbe(PostProcessStep):
+    """Read duration, resolution and codecs of audio and video files with ffprobe."""
+
+    name: str = "probe"
+    timeout: float = Field(default=60.0, description="Seconds ffprobe may take per file")
+
+    def run(self, path: Path) -> dict[str, Any]:
+        """Probe one media file; other files are skipped."""
+        ffprobe = shutil.which("ffprobe")
+        if ffprobe is None or media_kind(path.name) not in {MediaKind.VIDEO, MediaKind.AUDIO}:
+            return {}
+        output = subprocess.run(  # noqa: S603
+            [
+                ffprobe,
+                "-v",
+                "error",
+                "-show_entries",
+                "format=duration:stream=codec_type,codec_name,width,height",
+                "-of",
+                "json",
+                path.as_posix(),
+            ],
+            capture_output=True,
+            check=True,
+            timeout=self.timeout,
+        ).stdout
+        probe = json.loads(output)
+        return {
+            "duration": float(probe.get("format", {}).get("duration", 0) or 0),
+            "streams": probe.get("streams", []),
+        }
+
+
+class ThumbnailStep(PostProcessStep):
+    """Extract a JPEG thumbnail next to each video with ffmpeg."""
+
+    name: str = "thumbnail"
+    width: int = Field(default=320, description="Thumbnail width; height keeps the ratio")
+    timeout: float = Field(default=60.0, description="Seconds ffmpeg may take per file")
+
+    def run(self, path: Path) -> dict[str, Any]:
+        """Write ``<file>.thumb.jpg`` for a video; other files are skipped."""
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None or media_kind(path.name) is not MediaKind.VIDEO:
+            return {}
+        thumbnail = path.with_name(f"{path.name}{THUMBNAIL_SUFFIX}")
+        subprocess.run(  # noqa: S603
+            [
+                ffmpeg,
+                "-v",
+                "error",
+                "-y",
+                "-i",
+                path.as_posix(),
+                "-frames:v",
+                "1",
+                "-vf",
+                f"thumbnail,scale={self.width}:-1",
+                thumbnail.as_posix(),
+            ],
+            capture_output=True,
+            check=True,
+            timeout=self.timeout,
+        )
+        return {"path": thumbnail.as_posix()}
+
+
+STEPS: dict[str, type[PostProcessStep]] = {
+    "integrity": IntegrityCheck,
+    "hash": HashStep,
+    "probe": MediaProbe,
+    "thumbnail": ThumbnailStep,
+}
+
+
+class FileResult(BaseModel):
+    """Outcome of every step for one file."""
+
+    path: str = Field(..., description="The processed file")
+    results: dict[str, dict[str, Any]] = Field(
+        default_factory=dict, description="Result of each successful step"
+    )
+    errors: dict[str, str] = Field(default_factory=dict, description="Error of each failed step")
+    seconds: float = Field(default=0.0, description="Time spent in the pool")
+
+
+def _run_steps(steps: list[PostProcessStep], path: Path) -> FileResult:
+    """Run the steps on one file; executed inside the pool.
+
+    A failing step is recorded and the remaining steps still run, except after a
+    failed integrity check, where processing the file further is pointless.
+    """
+    started = time.perf_counter()
+    result = FileResult(path=path.as_posix())
+    for step in steps:
+        try:
+            result.results[step.name] = step.run(path)
+        except Exception as e:  # noqa: PERF203
+            result.errors[step.name] = str(e)
+            if isinstance(step, IntegrityCheck):
+                break
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+async def watch_new_files(
+    folder: Path, since: float, done: asyncio.Event, interval: float = 1.0
+) -> AsyncIterator[Path]:
+    """Yield files that appear complete in ``folder`` while a download runs.
+
+    tdl writes each file under a temporary name and renames it when it is done, so a
+    file with its final name and a recent mtime is finished. The folder is rescanned
+    every ``interval`` until ``done`` is set, then once more.
+
+    Args:
+        folder (Path): The download folder
+        since (float): ``time.time()`` when the download started
+        done (asyncio.Event): Set when tdl exits
+        interval (float): Seconds between scans
+
+    Yields:
+        Path: Each new file, once
+    """
+
+    def scan() -> list[Path]:
+        if not folder.is_dir():
+            return []
+        return [
+            path
+            for path in folder.iterdir()
+            if is_download(path.name) and path.is_file() and path.stat().st_mtime >= since
+        ]
+
+    seen: set[Path] = set()
+    while True:
+        finished = done.is_set()
+        for path in await asyncio.to_thread(scan):
+            if path not in seen:
+                seen.add(path)
+                yield path
+        if finished:
+            return
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(done.wait(), timeout=interval)
+
+
+class PostProcessor(BaseModel):
+    """Runs post-processing steps on downloaded files in a bounded worker pool.
+
+    Files are handed over one by one as tdl finishes them; results are appended to
+    ``MANIFEST_NAME`` in the file's folder. The event loop only waits for pool
+    slots, so hashing or probing large files never delays other users.
+    """
+
+    steps: list[PostProcessStep] = Field(..., description="Steps run on every file, in order")
+    max_workers: int = Field(default=2, description="Size of the worker pool")
+    use_processes: bool = Field(
+        default=False,
+        description="Use a process pool for CPU-bound Python steps; threads suit hashing and "
+        "ffmpeg, which release the GIL",
+    )
+    max_pending: int = Field(
+        default=16, description="Files queued for the pool before submitters wait"
+    )
+
+    _executor: Executor | None = PrivateAttr(default=None)
+    _slots: asyncio.Semaphore | None = PrivateAttr(default=None)
+    _background: set[asyncio.Task] = PrivateAttr(default_factory=set)
+
+    @classmethod
+    def from_names(cls, names: str, **kwargs: int | bool) -> "PostProcessor | None":
+        """Build a processor from comma separated step names.
+
+        Args:
+            names (str): Step names, e.g. ``integrity,hash,probe,thumbnail``
+            **kwargs (int | bool): Other processor options
+
+        Returns:
+            PostProcessor | None: The processor, or None when no step is named
+
+        Raises:
+            ValueError: If a step name is unknown
+        """
+        steps = []
+        for name in filter(None, (n.strip() for n in names.split(","))):
+            if name not in STEPS:
+                raise ValueError(
+                    f"Unknown post-processing step {name!r}, choose from {list(STEPS)}"
+                )
+            steps.append(STEPS[name]())
+        return cls(steps=steps, **kwargs) if steps else None
+
+    @property
+    def executor(self) -> Executor:
+        """The worker pool, created on first use."""
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(
+                    self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(self.max_workers, "postprocess")
+        return self._executor
+
+    async def process(self, path: Path) -> FileResult:
+        """Run every step on one file in the pool and record the result.
+
+        Args:
+            path (Path): The downloaded file
+
+        Returns:
+            FileResult: The outcome of every step
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, _run_steps, self.steps, path)
+        await asyncio.to_thread(self._append_manifest, path.parent, result)
+        if result.errors:
+            logfire.warning("Post-processing failed", path=result.path, errors=result.errors)
+        else:
+            logfire.info("Post-processed file", path=result.path, seconds=round(result.seconds, 3))
+        return result
+
+    @staticmethod
+    def _append_manifest(folder: Path, result: FileResult) -> None:
+        with (folder / MANIFEST_NAME).open("a", encoding="utf-8") as f:
+            f.write(result.model_dump_json() + "\n")
+
+    async def stream(
+        self, folder: Path, since: float, done: asyncio.Event, interval: float = 1.0
+    ) -> list[FileResult]:
+        """Process files as a running download finishes them.
+
+        Args:
+            folder (Path): The download folder
+            since (float): ``time.time()`` when the download started
+            done (asyncio.Event): Set when the download exits
+            interval (float): Seconds between folder scans
+
+        Returns:
+            list[FileResult]: The results, once the download and every file are done
+        """
+        pending = [
+            asyncio.create_task(self.process(path))
+            async for path in watch_new_files(folder, since, done, interval)
+        ]
+        return list(await asyncio.gather(*pending))
+
+    def start_stream(self, folder: Path, since: float, done: asyncio.Event) -> asyncio.Task:
+        """Run ``stream`` in the background, keeping a reference until it finishes.
+
+        Args:
+            folder (Path): The download folder
+            since (float): ``time.time()`` when the download started
+            done (asyncio.Event): Set when the download exits
+
+        Returns:
+            asyncio.Task: The streaming task
+        """
+        task = asyncio.create_task(self.stream(folder, since, done))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    async def close(self) -> None:
+        """Wait for files in flight, then shut the pool down."""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown)
+            self._executor = None
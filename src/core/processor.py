@@ -1,13 +1,51 @@
 from enum import Enum
+import time
 import asyncio
+import logging
 from pathlib import Path
 from datetime import timedelta
 import platform
 
-import logfire
 from pydantic import Field, BaseModel, computed_field, model_validator
 
-logfire.configure(send_to_logfire=False)
+# Queued and level-gated by src.utils.log when configured; the command is formatted there
+log = logging.getLogger("tdl.processor")
+
+
+def tdl_binary_path() -> Path:
+    """Path of the bundled tdl binary for the current platform.
+
+    Returns:
+        Path: The absolute path of the binary
+    """
+    binary_name = "tdl.exe" if platform.system() == "Windows" else "tdl"
+    return (Path(__file__).parent / "binaries" / binary_name).absolute()
+
+
+class RunningProcess(BaseModel):
+    """A tdl child that has not exited yet."""
+
+    pid: int = Field(..., description="Process id")
+    command: list[str] = Field(..., description="The tdl arguments, without the binary path")
+    started_at: float = Field(..., description="``time.monotonic()`` when it was spawned")
+
+    @property
+    def runtime(self) -> float:
+        """Seconds since the process was spawned."""
+        return time.monotonic() - self.started_at
+
+
+# Every tdl child of this process, for the admin introspection commands
+_running: dict[int, RunningProcess] = {}
+
+
+def running_processes() -> list[RunningProcess]:
+    """The tdl children currently running in this process, oldest first.
+
+    Returns:
+        list[RunningProcess]: The running children
+    """
+    return sorted(_running.values(), key=lambda process: process.started_at)
 
 
 class StorageDriver(str, Enum):
@@ -69,6 +107,10 @@ class TDLConfig(BaseModel):
         description="Storage options",
     )
     threads: int = Field(default=4, description="Max threads for transfer one item")
+    terminate_grace: timedelta = Field(
+        default=timedelta(seconds=5),
+        description="Time tdl gets to exit after SIGTERM before it is killed on timeout or cancel",
+    )
 
 
 class TelegramDownloader(BaseModel):
@@ -87,9 +129,7 @@ class TelegramDownloader(BaseModel):
     @property
     def tdl_binary(self) -> str:
         """Get the path to TDL binary based on platform."""
-        binary_name = "tdl.exe" if platform.system() == "Windows" else "tdl"
-        tdl_path = Path(__file__).parent / "binaries" / binary_name
-        return tdl_path.absolute().as_posix()
+        return tdl_binary_path().as_posix()
 
     def _build_base_command(self) -> list[str]:
         """Build the base command with global flags."""
@@ -125,17 +165,48 @@ class TelegramDownloader(BaseModel):
 
         return command
 
+    async def _terminate(self, process: asyncio.subprocess.Process) -> None:
+        """Terminate a tdl child, kill it after the grace period, and reap it."""
+        if process.returncode is not None:
+            return
+        try:
+            process.terminate()
+            try:
+                await asyncio.wait_for(
+                    process.wait(), timeout=self.config.terminate_grace.total_seconds()
+                )
+            except asyncio.TimeoutError:
+                log.warning(
+                    "tdl did not exit after SIGTERM, killing it", extra={"pid": process.pid}
+                )
+                process.kill()
+                await process.wait()
+        except ProcessLookupError:
+            # The process exited between the returncode check and the signal
+            await process.wait()
+
     async def _execute_command(
         self, command: list[str], timeout: float | None = None
     ) -> TDLResult:
-        """Execute TDL command asynchronously."""
+        """Execute TDL command asynchronously.
+
+        The child is terminated (then killed and reaped) when the command times out or the
+        calling task is cancelled, so it never outlives the request that started it.
+        """
         try:
-            logfire.info(f"Executing command: {' '.join(command)}")
+            log.info("Executing command: %s", command)
 
             process = await asyncio.create_subprocess_exec(
                 *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
             )
+        except Exception as e:
+            log.exception("Command execution failed: %s", e)
+            return TDLResult(success=False, return_code=-1, stderr=str(e), command=command)
 
+        _running[process.pid] = RunningProcess(
+            pid=process.pid, command=command[1:], started_at=time.monotonic()
+        )
+        try:
             stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
 
             return TDLResult(
@@ -147,13 +218,21 @@ class TelegramDownloader(BaseModel):
             )
 
         except asyncio.TimeoutError:
-            logfire.error(f"Command timed out: {' '.join(command)}")
+            log.error("Command timed out: %s", command)
+            await asyncio.shield(self._terminate(process))
             return TDLResult(
                 success=False, return_code=-1, stderr="Command timed out", command=command
             )
+        except asyncio.CancelledError:
+            log.warning("Command cancelled, stopping tdl", extra={"pid": process.pid})
+            await asyncio.shield(self._terminate(process))
+            raise
         except Exception as e:
-            logfire.error(f"Command execution failed: {e}", exc_info=True)
+            log.exception("Command execution failed: %s", e)
+            await asyncio.shield(self._terminate(process))
             return TDLResult(success=False, return_code=-1, stderr=str(e), command=command)
+        finally:
+            _running.pop(process.pid, None)
 
     # Account related methods
     async def login(self) -> TDLResult:
@@ -193,8 +272,13 @@ class TelegramDownloader(BaseModel):
         exclude: list[str] | None = None,
         restart: bool = False,
         skip_same: bool = False,
+        files: list[str] | None = None,
     ) -> TDLResult:
-        """Download anything from Telegram (protected) chat."""
+        """Download anything from Telegram (protected) chat.
+
+        ``files`` are JSON files exported by ``chat_export``; they can be combined with
+        or used instead of ``urls``.
+        """
         if isinstance(urls, list):
             urls = ",".join(urls)
 
@@ -203,10 +287,14 @@ class TelegramDownloader(BaseModel):
             TDLCommand.DOWNLOAD,
             "--dir",
             self.output_folder.as_posix(),
-            "--url",
-            urls,
         ]
 
+        if urls:
+            command.extend(["--url", urls])
+
+        for file in files or []:
+            command.extend(["--file", file])
+
         if include:
             command.extend(["--include", ",".join(include)])
 
@@ -254,13 +342,29 @@ class TelegramDownloader(BaseModel):
         command = [*self._build_base_command(), TDLCommand.CHAT, "ls"]
         return await self._execute_command(command)
 
-    async def chat_export(self, chat: str, output: str | None = None) -> TDLResult:
-        """Export chat messages."""
+    async def chat_export(
+        self,
+        chat: str,
+        output: str | None = None,
+        export_type: str | None = None,
+        input_range: list[int] | None = None,
+    ) -> TDLResult:
+        """Export chat messages.
+
+        ``export_type`` is one of ``time``, ``id`` or ``last`` and ``input_range`` holds
+        the matching bounds, so tdl only exports the requested slice of the chat.
+        """
         command = [*self._build_base_command(), TDLCommand.CHAT, "export", "--chat", chat]
 
         if output:
             command.extend(["--output", output])
 
+        if export_type:
+            command.extend(["--type", export_type])
+
+        if input_range:
+            command.extend(["--input", ",".join(str(i) for i in input_range)])
+
         return await self._execute_command(command, timeout=3600)  # 1 hour timeout
 
     # Extension management
@@ -5,8 +5,6 @@ import subprocess
 import logfire
 from pydantic import Field, BaseModel, computed_field, model_validator
 
-logfire.configure(send_to_logfire=False)
-
 
 class TelegramDownloader(BaseModel):
     output_folder: Path = Field(
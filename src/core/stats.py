@@ -0,0 +1,242 @@
+import os
+import math
+import time
+import bisect
+from pathlib import Path
+from collections import deque
+
+from pydantic import Field, BaseModel, PrivateAttr
+
+# Suffixes of files tdl is still writing, and of thumbnails written by post-processing
+PARTIAL_SUFFIXES = frozenset({".tmp", ".part"})
+THUMBNAIL_SUFFIX = ".thumb.jpg"
+
+# Upper bounds (seconds) of the latency histogram; the last bucket is open ended
+LATENCY_BOUNDS: tuple[float, ...] = (1, 2, 5, 10, 20, 30, 60, 120, 300, 600, 1800, math.inf)
+
+
+class _Counts:
+    """Additive counters for one second, or for the sum of a window of seconds."""
+
+    __slots__ = ("bytes", "completed", "failed", "latencies")
+
+    def __init__(self) -> None:
+        self.completed = 0
+        self.failed = 0
+        self.bytes = 0
+        self.latencies = [0] * len(LATENCY_BOUNDS)
+
+    def add(self, other: "_Counts", sign: int = 1) -> None:
+        self.completed += sign * other.completed
+        self.failed += sign * other.failed
+        self.bytes += sign * other.bytes
+        for i, count in enumerate(other.latencies):
+            self.latencies[i] += sign * count
+
+    def percentile(self, q: float) -> float | None:
+        """Upper bound of the histogram bucket holding the ``q`` quantile."""
+        total = sum(self.latencies)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for bound, count in zip(LATENCY_BOUNDS, self.latencies, strict=True):
+            seen += count
+            if seen >= rank:
+                return bound
+        return LATENCY_BOUNDS[-1]
+
+
+class _Window:
+    """Running sum over the last ``seconds``, kept up to date as buckets expire."""
+
+    __slots__ = ("buckets", "seconds", "totals")
+
+    def __init__(self, seconds: int) -> None:
+        self.seconds = seconds
+        self.totals = _Counts()
+        self.buckets: deque[tuple[int, _Counts]] = deque()
+
+    def expire(self, now: int) -> None:
+        while self.buckets and self.buckets[0][0] <= now - self.seconds:
+            _, bucket = self.buckets.popleft()
+            self.totals.add(bucket, sign=-1)
+
+
+class WindowStats(BaseModel):
+    """Aggregates of one rolling window, as shown by /stats."""
+
+    minutes: int = Field(..., description="Length of the window")
+    completed: int = Field(..., description="URLs downloaded successfully")
+    failed: int = Field(..., description="URLs whose download failed")
+    bytes: int = Field(..., description="Bytes written by successful downloads")
+    urls_per_minute: float = Field(..., description="Completed URLs per minute")
+    bytes_per_second: float = Field(..., description="Download throughput")
+    failure_rate: float = Field(..., description="Failed / (completed + failed)")
+    p50_latency: float | None = Field(
+        default=None, description="Median seconds from enqueue to completion (bucket bound)"
+    )
+    p95_latency: float | None = Field(
+        default=None, description="95th percentile seconds from enqueue to completion"
+    )
+
+
+class StatsSnapshot(BaseModel):
+    """Lifetime counters plus every rolling window."""
+
+    uptime: float = Field(..., description="Seconds since the statistics were created")
+    active_processes: int = Field(..., description="tdl processes running right now")
+    total_completed: int = Field(..., description="URLs downloaded since start")
+    total_failed: int = Field(..., description="URLs failed since start")
+    total_bytes: int = Field(..., description="Bytes downloaded since start")
+    windows: list[WindowStats] = Field(..., description="Rolling windows, shortest first")
+
+
+class DownloadStats(BaseModel):
+    """Download counters maintained incrementally in O(1) per event.
+
+    Events land in per-second buckets. Each rolling window keeps a running total and
+    subtracts buckets as they fall out of it, so reading any window never scans the
+    queue or the history.
+    """
+
+    window_minutes: list[int] = Field(
+        default_factory=lambda: [1, 15, 60], description="Rolling windows reported by /stats"
+    )
+
+    _started_at: float = PrivateAttr(default_factory=time.monotonic)
+    _lifetime: _Counts = PrivateAttr(default_factory=_Counts)
+    _windows: list[_Window] | None = PrivateAttr(default=None)
+    _current: tuple[int, _Counts] | None = PrivateAttr(default=None)
+    _active_processes: int = PrivateAttr(default=0)
+
+    def _bucket(self) -> _Counts:
+        """The bucket of the current second, after expiring old ones."""
+        now = int(time.monotonic())
+        if self._windows is None:
+            self._windows = [_Window(minutes * 60) for minutes in self.window_minutes]
+        if self._current is None or self._current[0] != now:
+            self._current = (now, _Counts())
+            for window in self._windows:
+                window.buckets.append(self._current)
+        for window in self._windows:
+            window.expire(now)
+        return self._current[1]
+
+    def _record(self, delta: _Counts) -> None:
+        self._bucket().add(delta)
+        self._lifetime.add(delta)
+        for window in self._windows or []:
+            window.totals.add(delta)
+
+    def record_success(self, latencies: list[float], size: int) -> None:
+        """Record URLs downloaded successfully.
+
+        Args:
+            latencies (list[float]): Seconds from enqueue to completion, one per URL
+            size (int): Bytes written by the download
+        """
+        delta = _Counts()
+        delta.completed = len(latencies)
+        delta.bytes = size
+        for latency in latencies:
+            delta.latencies[bisect.bisect_left(LATENCY_BOUNDS, latency)] += 1
+        self._record(delta)
+
+    def record_failure(self, count: int) -> None:
+        """Record URLs whose download failed.
+
+        Args:
+            count (int): Number of failed URLs
+        """
+        delta = _Counts()
+        delta.failed = count
+        self._record(delta)
+
+    def process_started(self) -> None:
+        """Count a tdl process that just started."""
+        self._active_processes += 1
+
+    def process_finished(self) -> None:
+        """Count a tdl process that just exited."""
+        self._active_processes -= 1
+
+    def snapshot(self) -> StatsSnapshot:
+        """Read the lifetime counters and every window.
+
+        Returns:
+            StatsSnapshot: The current statistics
+        """
+        self._bucket()
+        uptime = time.monotonic() - self._started_at
+        windows = []
+        for window in self._windows or []:
+            totals = window.totals
+            # A window longer than the uptime only covers the uptime
+            seconds = max(min(window.seconds, uptime), 1.0)
+            attempted = totals.completed + totals.failed
+            windows.append(
+                WindowStats(
+                    minutes=window.seconds // 60,
+                    completed=totals.completed,
+                    failed=totals.failed,
+                    bytes=totals.bytes,
+                    urls_per_minute=totals.completed * 60 / seconds,
+                    bytes_per_second=totals.bytes / seconds,
+                    failure_rate=totals.failed / attempted if attempted else 0.0,
+                    p50_latency=totals.percentile(0.5),
+                    p95_latency=totals.percentile(0.95),
+                )
+            )
+        return StatsSnapshot(
+            uptime=uptime,
+            active_processes=self._active_processes,
+            total_completed=self._lifetime.completed,
+            total_failed=self._lifetime.failed,
+            total_bytes=self._lifetime.bytes,
+            windows=windows,
+        )
+
+
+def is_download(name: str) -> bool:
+    """Whether a file name in a download folder is a finished download.
+
+    Hidden files (e.g. the post-processing manifest), files tdl is still writing and
+    thumbnails written by post-processing are not.
+
+    Args:
+        name (str): The file name
+
+    Returns:
+        bool: True for a downloaded file
+    """
+    return not (
+        name.startswith(".")
+        or os.path.splitext(name)[1] in PARTIAL_SUFFIXES
+        or name.endswith(THUMBNAIL_SUFFIX)
+    )
+
+
+def files_written_since(folder: Path, since: float) -> dict[str, int]:
+    """Downloaded files in ``folder`` modified at or after ``since``, with their sizes.
+
+    Args:
+        folder (Path): The download folder
+        since (float): A ``time.time()`` timestamp
+
+    Returns:
+        dict[str, int]: File names and sizes in bytes
+    """
+    files: dict[str, int] = {}
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if not is_download(entry.name):
+                    continue
+                if entry.is_file():
+                    stat = entry.stat()
+                    if stat.st_mtime >= since:
+                        files[entry.name] = stat.st_size
+    except FileNotFoundError:
+        return {}
+    return files
@@ -0,0 +1,253 @@
+from abc import ABC, abstractmethod
+import json
+import time
+from typing import Any, TypeVar
+import asyncio
+from pathlib import Path
+import sqlite3
+import contextlib
+from collections.abc import Callable, Iterator
+
+from pydantic import Field, BaseModel, ConfigDict, PrivateAttr, model_validator
+
+_T = TypeVar("_T")
+
+
+class QueuedJob(BaseModel):
+    """A job claimed from a shared task queue."""
+
+    job_id: int = Field(..., description="The backend's id of the job")
+    payload: dict[str, Any] = Field(..., description="The serialized DownloadTask")
+    attempts: int = Field(..., description="How many times the job has been claimed")
+
+
+class TaskQueueBackend(ABC, BaseModel):
+    """A durable queue shared by the bot front end and download workers.
+
+    Workers claim jobs under a lease: a claimed job stays invisible to other workers
+    for ``visibility_timeout`` seconds, renewed by ``heartbeat``. Jobs whose lease runs
+    out (e.g. because the worker died) become claimable again.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    max_attempts: int = Field(
+        default=5, description="Claims after which a job that keeps failing is given up"
+    )
+
+    @abstractmethod
+    async def publish(self, payloads: list[dict[str, Any]]) -> None:
+        """Add jobs to the queue."""
+
+    @abstractmethod
+    async def claim(
+        self, worker_id: str, limit: int, visibility_timeout: float
+    ) -> list[QueuedJob]:
+        """Lease up to ``limit`` pending or expired jobs to a worker."""
+
+    @abstractmethod
+    async def heartbeat(
+        self, worker_id: str, job_ids: list[int], visibility_timeout: float
+    ) -> None:
+        """Extend the lease of jobs still being worked on."""
+
+    @abstractmethod
+    async def ack(self, worker_id: str, job_ids: list[int]) -> None:
+        """Mark jobs as done."""
+
+    @abstractmethod
+    async def nack(self, worker_id: str, job_ids: list[int]) -> None:
+        """Release jobs for a retry, or give them up after ``max_attempts``."""
+
+    @abstractmethod
+    async def pending_count(self) -> int:
+        """Number of jobs waiting to be claimed or in flight."""
+
+    @abstractmethod
+    async def cancel(self, url: str | None, chat_id: int | None) -> list[dict[str, Any]]:
+        """Delete unclaimed jobs; claimed ones are already downloading on a worker.
+
+        Args:
+            url (str | None): Only jobs covering this URL; None matches every job
+            chat_id (int | None): Only jobs requested from this chat
+
+        Returns:
+            list[dict[str, Any]]: The payloads of the deleted jobs
+        """
+
+
+class SQLiteTaskQueue(TaskQueueBackend):
+    """SQLite implementation of the task queue.
+
+    Suitable for tests and for workers sharing a host or a filesystem with reliable
+    locking; other backends can implement ``TaskQueueBackend`` for multi-host setups.
+    """
+
+    path: Path = Field(..., description="The SQLite database file")
+
+    _lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+
+    @model_validator(mode="after")
+    def _setup(self) -> "SQLiteTaskQueue":
+        """Create the database and the jobs table."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    lease_owner TEXT,
+                    lease_expires REAL NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, lease_expires)")
+        return self
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open an autocommit connection that is closed when the block exits."""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    async def _run(self, func: Callable[..., _T], *args: object) -> _T:
+        """Run a blocking SQLite operation off the event loop."""
+        async with self._lock:
+            return await asyncio.to_thread(func, *args)
+
+    def _publish(self, payloads: list[dict[str, Any]]) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO jobs (payload, created_at) VALUES (?, ?)",
+                [(json.dumps(payload), now) for payload in payloads],
+            )
+
+    def _claim(self, worker_id: str, limit: int, visibility_timeout: float) -> list[QueuedJob]:
+        now = time.time()
+        with self._connect() as conn:
+            # BEGIN IMMEDIATE takes the write lock up front, so two workers never claim a job twice
+            conn.execute("BEGIN IMMEDIATE")
+            # A worker that died on the last attempt leaves a lease nobody may retry
+            conn.execute(
+                """
+                UPDATE jobs SET status = 'failed', lease_owner = NULL, lease_expires = 0
+                WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?
+                """,
+                (now, self.max_attempts),
+            )
+            rows = conn.execute(
+                """
+                SELECT id, payload, attempts FROM jobs
+                WHERE status = 'pending'
+                    OR (status = 'leased' AND lease_expires < ? AND attempts < ?)
+                ORDER BY id LIMIT ?
+                """,
+                (now, self.max_attempts, limit),
+            ).fetchall()
+            conn.executemany(
+                """
+                UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?,
+                    attempts = attempts + 1
+                WHERE id = ?
+                """,
+                [(worker_id, now + visibility_timeout, row[0]) for row in rows],
+            )
+            conn.execute("COMMIT")
+        return [
+            QueuedJob(job_id=row[0], payload=json.loads(row[1]), attempts=row[2] + 1)
+            for row in rows
+        ]
+
+    def _cancel(self, url: str | None, chat_id: int | None) -> list[dict[str, Any]]:
+        def matches(payload: dict[str, Any]) -> bool:
+            if chat_id is not None and payload.get("chat_id") != chat_id:
+                return False
+            return url is None or url in (payload["url"], *payload.get("media_group_urls", ()))
+
+        with self._connect() as conn:
+            # The write lock keeps a worker from claiming a job between the match and the delete
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute("SELECT id, payload FROM jobs WHERE status = 'pending'").fetchall()
+            cancelled = {
+                job_id: payload for job_id, text in rows if matches(payload := json.loads(text))
+            }
+            conn.executemany("DELETE FROM jobs WHERE id = ?", [(i,) for i in cancelled])
+            conn.execute("COMMIT")
+        return list(cancelled.values())
+
+    def _update_owned(self, sql: str, params: tuple, worker_id: str, job_ids: list[int]) -> None:
+        with self._connect() as conn:
+            conn.executemany(
+                f"{sql} WHERE id = ? AND lease_owner = ?",
+                [(*params, job_id, worker_id) for job_id in job_ids],
+            )
+
+    async def publish(self, payloads: list[dict[str, Any]]) -> None:
+        """Add jobs to the queue."""
+        await self._run(self._publish, payloads)
+
+    async def claim(
+        self, worker_id: str, limit: int, visibility_timeout: float
+    ) -> list[QueuedJob]:
+        """Lease up to ``limit`` pending or expired jobs to a worker."""
+        return await self._run(self._claim, worker_id, limit, visibility_timeout)
+
+    async def heartbeat(
+        self, worker_id: str, job_ids: list[int], visibility_timeout: float
+    ) -> None:
+        """Extend the lease of jobs still being worked on."""
+        await self._run(
+            self._update_owned,
+            "UPDATE jobs SET lease_expires = ?",
+            (time.time() + visibility_timeout,),
+            worker_id,
+            job_ids,
+        )
+
+    async def ack(self, worker_id: str, job_ids: list[int]) -> None:
+        """Mark jobs as done."""
+        await self._run(
+            self._update_owned,
+            "UPDATE jobs SET status = 'done', lease_owner = NULL",
+            (),
+            worker_id,
+            job_ids,
+        )
+
+    async def nack(self, worker_id: str, job_ids: list[int]) -> None:
+        """Release jobs for a retry, or give them up after ``max_attempts``."""
+        await self._run(
+            self._update_owned,
+            """
+            UPDATE jobs SET lease_owner = NULL, lease_expires = 0,
+                status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END
+            """,
+            (self.max_attempts,),
+            worker_id,
+            job_ids,
+        )
+
+    async def pending_count(self) -> int:
+        """Number of jobs waiting to be claimed or in flight."""
+
+        def count() -> int:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'leased')"
+                ).fetchone()
+            return int(row[0])
+
+        return await self._run(count)
+
+    async def cancel(self, url: str | None, chat_id: int | None) -> list[dict[str, Any]]:
+        """Delete unclaimed jobs; claimed ones are already downloading on a worker."""
+        return await self._run(self._cancel, url, chat_id)
@@ -0,0 +1,165 @@
+import json
+from typing import Any
+import asyncio
+from pathlib import Path
+from datetime import timedelta
+from collections.abc import Callable
+
+import logfire
+from pydantic import Field, BaseModel
+
+from src.core.admission import AdmissionPolicy
+from src.core.processor import TDLConfig
+
+
+class Tunables(BaseModel):
+    """Scheduler and tdl parameters that can change while the bot runs.
+
+    Changes apply from the next batch on; downloads already running keep the
+    values they started with.
+    """
+
+    batch_size: int = Field(default=20, ge=1, description="Max tasks collected into one batch")
+    batch_timeout: float = Field(default=3.0, gt=0, description="Seconds spent collecting a batch")
+    tdl_limit: int = Field(
+        default=2, ge=1, description="tdl --limit: concurrent tasks per process"
+    )
+    tdl_threads: int = Field(default=4, ge=1, description="tdl --threads: threads per item")
+    tdl_pool: int = Field(default=8, ge=0, description="tdl --pool: DC pool size, 0 is unlimited")
+    tdl_delay: float = Field(
+        default=0.0, ge=0, description="tdl --delay: seconds between tasks, 0 disables"
+    )
+    queue_soft_limit: int = Field(
+        default=200, ge=1, description="Queued tasks past which heavy users are deferred"
+    )
+    queue_hard_limit: int = Field(
+        default=1000, ge=1, description="Queued tasks past which new ones are rejected"
+    )
+    queue_user_share: int = Field(
+        default=20, ge=1, description="Tasks a user keeps in the queue past the soft limit"
+    )
+
+    def tdl_config(self, base: TDLConfig) -> TDLConfig:
+        """Apply the tdl parameters to a configuration.
+
+        Args:
+            base (TDLConfig): The configuration to start from
+
+        Returns:
+            TDLConfig: A copy with the tuned values
+        """
+        return base.model_copy(
+            update={
+                "limit": self.tdl_limit,
+                "threads": self.tdl_threads,
+                "pool": self.tdl_pool,
+                "delay": timedelta(seconds=self.tdl_delay) if self.tdl_delay else None,
+            }
+        )
+
+    def admission(self) -> AdmissionPolicy:
+        """The admission policy of the queue limits."""
+        return AdmissionPolicy(
+            soft_limit=self.queue_soft_limit,
+            hard_limit=self.queue_hard_limit,
+            user_share=self.queue_user_share,
+        )
+
+    def changes(self, other: "Tunables") -> dict[str, tuple[Any, Any]]:
+        """Fields whose value differs in ``other``.
+
+        Args:
+            other (Tunables): The new values
+
+        Returns:
+            dict[str, tuple[Any, Any]]: Each changed field with its old and new value
+        """
+        new = other.model_dump()
+        return {
+            name: (old, new[name]) for name, old in self.model_dump().items() if old != new[name]
+        }
+
+
+class TuningFile(BaseModel):
+    """JSON file of overrides on top of the settings, edited by hand or by /tune.
+
+    Every process (bot, executor, workers) watches the same file, so one change
+    reaches all of them.
+    """
+
+    path: Path = Field(..., description="The JSON overrides file")
+    defaults: Tunables = Field(
+        default_factory=Tunables, description="Values from the environment, before overrides"
+    )
+
+    def _overrides(self) -> dict[str, Any]:
+        if not self.path.is_file():
+            return {}
+        return json.loads(self.path.read_text(encoding="utf-8") or "{}")
+
+    def load(self) -> Tunables:
+        """Read the effective values: the defaults with the file's overrides.
+
+        Returns:
+            Tunables: The validated values
+
+        Raises:
+            ValueError: If the file is not valid JSON or a value is out of range
+        """
+        return Tunables.model_validate({**self.defaults.model_dump(), **self._overrides()})
+
+    def save(self, values: dict[str, Any]) -> Tunables:
+        """Validate and merge new overrides into the file, atomically.
+
+        Args:
+            values (dict[str, Any]): Field names and new values
+
+        Returns:
+            Tunables: The effective values after the change
+
+        Raises:
+            ValueError: If a field is unknown or a value is out of range
+        """
+        unknown = set(values) - set(Tunables.model_fields)
+        if unknown:
+            raise ValueError(f"Unknown parameters {sorted(unknown)}")
+        overrides = {**self._overrides(), **values}
+        tunables = Tunables.model_validate({**self.defaults.model_dump(), **overrides})
+        # Store the validated (typed) values, not the raw strings
+        overrides = {name: getattr(tunables, name) for name in overrides}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        partial = self.path.with_name(f"{self.path.name}.tmp")
+        partial.write_text(json.dumps(overrides, indent=2), encoding="utf-8")
+        partial.replace(self.path)
+        return tunables
+
+    def _mtime(self) -> int | None:
+        try:
+            return self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    async def watch(self, on_change: Callable[[Tunables], None], interval: float = 2.0) -> None:
+        """Poll the file and call ``on_change`` with the new values whenever it changes.
+
+        An invalid file is logged and ignored until it is fixed.
+
+        Args:
+            on_change (Callable[[Tunables], None]): Receives the effective values
+            interval (float): Seconds between polls
+        """
+        seen = await asyncio.to_thread(self._mtime)
+        while True:
+            await asyncio.sleep(interval)
+            mtime = await asyncio.to_thread(self._mtime)
+            if mtime == seen:
+                continue
+            seen = mtime
+            try:
+                tunables = await asyncio.to_thread(self.load)
+            except ValueError as e:
+                logfire.warning(
+                    "Ignoring invalid tuning file", path=self.path.as_posix(), error=str(e)
+                )
+                continue
+            on_change(tunables)
@@ -1,16 +1,21 @@
 from typing import Any
+import asyncio
 from pathlib import Path
+from collections import defaultdict
+from collections.abc import Callable, Awaitable
 
 import logfire
-from pydantic import Field, BaseModel, ConfigDict, model_validator
-from telethon import TelegramClient
+from pydantic import Field, BaseModel, ConfigDict, PrivateAttr, model_validator
+from telethon import TelegramClient, events
 from telethon.tl.types import User
 from telethon.tl.patched import Message
-from telethon.tl.custom.dialog import Dialog
 
+from utils.log import configure_logging
 from utils.config import Config
+from core.processor import TelegramDownloader
+from core.entity_cache import EntityCache
 
-logfire.configure(send_to_logfire=False)
+configure_logging()
 
 
 class TelegramDialog(BaseModel):
@@ -20,7 +25,8 @@ class TelegramDialog(BaseModel):
 
 class TelegramMessage(BaseModel):
     url: str
-    text: str | None | Any
+    text: str | Any | None
+    chat_id: int | None = None
 
 
 class TelegramManager(BaseModel):
@@ -31,6 +37,9 @@ class TelegramManager(BaseModel):
         description="Telethon client for interacting with Telegram API, it will be initialized after the model is created.",
     )
 
+    # Persistent cache of resolved channels and of the dialog list, created with the client
+    _cache: EntityCache = PrivateAttr()
+
     @model_validator(mode="after")
     def _setup_client(self) -> "TelegramManager":
         config = Config()
@@ -39,6 +48,7 @@ class TelegramManager(BaseModel):
         self.client = TelegramClient(
             session=session_path, api_id=config.api_id, api_hash=config.api_hash
         )
+        self._cache = EntityCache(path=session_path.with_name("entities.db"))
         return self
 
     async def get_personal_info(self) -> User:
@@ -48,23 +58,115 @@ class TelegramManager(BaseModel):
         return me
 
     async def get_channel_names(self) -> list[TelegramDialog]:
-        result = []
-        async for dialog in self.client.iter_dialogs():
-            if isinstance(dialog, Dialog):
-                telegram_dialog = TelegramDialog(channel_name=dialog.name, channel_id=dialog.id)
-                result.append(telegram_dialog)
-        return result
+        # Only dialogs with new messages since the last run are fetched from Telegram
+        dialogs = await self._cache.dialogs(self.client)
+        return [
+            TelegramDialog(channel_name=dialog.entity.title, channel_id=dialog.entity.peer_id)
+            for dialog in dialogs
+        ]
 
     async def get_channel_messages(self, channel_name: str) -> list[TelegramMessage]:
-        channel = await self.client.get_entity(channel_name)
+        channel = await self._cache.resolve(self.client, channel_name)
         result = []
-        async for message in self.client.iter_messages(channel):
+        async for message in self.client.iter_messages(channel.input_peer):
             if isinstance(message, Message) and (message.photo or message.video):
                 url = f"https://t.me/c/{channel.id}/{message.id}"
                 logfire.info("Found media message", url=url)
                 result.append(TelegramMessage(url=url, text=message.text))
         return result
 
+    def _media_url(self, message: Message) -> str | None:
+        if not isinstance(message, Message) or not (message.photo or message.video):
+            return None
+        # Same private-link form as get_channel_messages; tdl resolves it for members
+        chat_id = str(message.chat_id).removeprefix("-100")
+        return f"https://t.me/c/{chat_id}/{message.id}"
+
+    async def _collect_batch(
+        self, queue: asyncio.Queue[TelegramMessage], batch_size: int, batch_window: float
+    ) -> list[TelegramMessage]:
+        """Wait for one new post, then gather more for up to ``batch_window`` seconds."""
+        batch = [await queue.get()]
+        deadline = asyncio.get_running_loop().time() + batch_window
+        while len(batch) < batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def watch_channels(
+        self,
+        channels: list[str],
+        on_batch: Callable[[list[TelegramMessage]], Awaitable[None]],
+        batch_size: int = 20,
+        batch_window: float = 2.0,
+    ) -> None:
+        """Subscribe to new posts of ``channels`` and hand media posts over in micro-batches.
+
+        New messages arrive as Telethon ``NewMessage`` updates on the existing session,
+        so nothing is polled and history is never re-scanned. A batch is flushed once it
+        holds ``batch_size`` posts or ``batch_window`` seconds after its first post.
+
+        Args:
+            channels (list[str]): Usernames, links or ids of the channels to watch
+            on_batch (Callable): Awaited with each batch of new media posts
+            batch_size (int): Max posts per batch
+            batch_window (float): Seconds to wait for more posts after the first one
+        """
+        entities = [
+            (await self._cache.resolve(self.client, channel)).input_peer for channel in channels
+        ]
+        queue: asyncio.Queue[TelegramMessage] = asyncio.Queue()
+
+        async def on_new_message(event: events.NewMessage.Event) -> None:
+            url = self._media_url(event.message)
+            if url is not None:
+                queue.put_nowait(
+                    TelegramMessage(url=url, text=event.message.text, chat_id=event.chat_id)
+                )
+
+        self.client.add_event_handler(on_new_message, events.NewMessage(chats=entities))
+        logfire.info("Watching channels for new media", channels=channels)
+
+        async def dispatch() -> None:
+            while True:
+                batch = await self._collect_batch(queue, batch_size, batch_window)
+                logfire.info("New media batch", size=len(batch))
+                try:
+                    await on_batch(batch)
+                except Exception as e:
+                    logfire.error("Failed to process new media batch", error=str(e))
+
+        dispatcher = asyncio.create_task(dispatch())
+        try:
+            await self.client.run_until_disconnected()
+        finally:
+            dispatcher.cancel()
+            self.client.remove_event_handler(on_new_message)
+
+    async def download_batch(self, batch: list[TelegramMessage]) -> None:
+        """Download a batch of new posts with one tdl run per channel."""
+        by_chat: dict[int | None, list[str]] = defaultdict(list)
+        for message in batch:
+            by_chat[message.chat_id].append(message.url)
+        for chat_id, urls in by_chat.items():
+            downloader = TelegramDownloader(output_folder=Path(f"./data/watch_{chat_id}"))
+            result = await downloader.download(urls=urls)
+            if result.success:
+                logfire.info("Downloaded new posts", chat_id=chat_id, count=len(urls))
+            else:
+                logfire.error("Failed to download new posts", chat_id=chat_id, error=result.stderr)
+
+    async def watch(self, channels: list[str]) -> None:
+        await self.client.start()
+        me = await self.get_personal_info()
+        logfire.info("Logged in as", phone=me.phone)
+        await self.watch_channels(channels, on_batch=self.download_batch)
+
     async def get_all_messages(self) -> None:
         await self.client.start()
         me = await self.get_personal_info()
@@ -80,6 +182,11 @@ class TelegramManager(BaseModel):
 
 
 if __name__ == "__main__":
+    config = Config()
     telegram = TelegramManager()
     with telegram.client:
-        telegram.client.loop.run_until_complete(telegram.get_all_messages())
+        if config.watch_channels:
+            watched = [channel.strip() for channel in config.watch_channels.split(",")]
+            telegram.client.loop.run_until_complete(telegram.watch(watched))
+        else:
+            telegram.client.loop.run_until_complete(telegram.get_all_messages())
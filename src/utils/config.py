@@ -1,11 +1,19 @@
-import dotenv
-from pydantic import Field
-from pydantic_settings import BaseSettings
+from typing import Literal
+from pathlib import Path
 
-dotenv.load_dotenv()
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Config(BaseSettings):
+    # Read .env when the settings are built rather than exporting it into os.environ at import.
+    # The repository's .env is found even from src/ (fetch_msg.py); ./.env takes precedence
+    model_config = SettingsConfigDict(
+        env_file=(Path(__file__).parents[2] / ".env", ".env"),
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
     token: str = Field(
         ...,
         validation_alias="TELEGRAM_TOKEN",
@@ -21,3 +29,127 @@ class Config(BaseSettings):
         validation_alias="TELEGRAM_API_HASH",
         description="API Hash for Telegram, get this from https://my.telegram.org/auth",
     )
+    tdl_namespaces: str = Field(
+        default="default",
+        validation_alias="TDL_NAMESPACES",
+        description="Comma separated tdl namespaces (logged-in accounts) to shard downloads over",
+    )
+    download_backend: Literal["tdl", "telethon"] = Field(
+        default="tdl",
+        validation_alias="DOWNLOAD_BACKEND",
+        description="tdl spawns the bundled binary per group; telethon downloads in-process",
+    )
+    telethon_session_path: Path = Field(
+        default=Path("./data/downloader.session"),
+        validation_alias="TELETHON_SESSION_PATH",
+        description="Login file of the telethon backend, separate from fetch_msg.py's",
+    )
+    telethon_connections: int = Field(
+        default=4,
+        validation_alias="TELETHON_CONNECTIONS",
+        description="Parallel range requests per large file in the telethon backend",
+    )
+    proxies: str = Field(
+        default="",
+        validation_alias="TDL_PROXIES",
+        description="Comma separated proxies tdl is spread over, by health and throughput",
+    )
+    proxy_per_account: bool = Field(
+        default=False,
+        validation_alias="TDL_PROXY_PER_ACCOUNT",
+        description="Keep each tdl account on one proxy instead of picking one per invocation",
+    )
+    data_roots: str = Field(
+        default="",
+        validation_alias="DATA_ROOTS",
+        description="Comma separated download roots, one per disk; unset downloads to ./data",
+    )
+    placement_path: Path = Field(
+        default=Path("./data/placement.db"),
+        validation_alias="PLACEMENT_PATH",
+        description="SQLite map of download folders to the root they were placed on",
+    )
+    dc_map_path: Path | None = Field(
+        default=Path("./data/dc_map.json"),
+        validation_alias="DC_MAP_PATH",
+        description="Learned chat datacenters; a batch's posts on one DC share a tdl process",
+    )
+    batch_size: int = Field(
+        default=20, validation_alias="BATCH_SIZE", description="Max tasks collected into one batch"
+    )
+    batch_timeout: float = Field(
+        default=3.0,
+        validation_alias="BATCH_TIMEOUT",
+        description="Seconds spent collecting one batch",
+    )
+    tdl_limit: int = Field(
+        default=2, validation_alias="TDL_LIMIT", description="tdl --limit: concurrent tasks"
+    )
+    tdl_threads: int = Field(
+        default=4, validation_alias="TDL_THREADS", description="tdl --threads: threads per item"
+    )
+    tdl_pool: int = Field(
+        default=8,
+        validation_alias="TDL_POOL",
+        description="tdl --pool: DC pool size, 0 is unlimited",
+    )
+    tdl_delay: float = Field(
+        default=0.0,
+        validation_alias="TDL_DELAY",
+        description="tdl --delay: seconds between tasks, 0 disables",
+    )
+    queue_soft_limit: int = Field(
+        default=200,
+        validation_alias="QUEUE_SOFT_LIMIT",
+        description="Queued tasks past which users with many queued tasks are deferred",
+    )
+    queue_hard_limit: int = Field(
+        default=1000,
+        validation_alias="QUEUE_HARD_LIMIT",
+        description="Queued tasks past which new links are rejected",
+    )
+    queue_user_share: int = Field(
+        default=20,
+        validation_alias="QUEUE_USER_SHARE",
+        description="Tasks a user keeps in the queue past the soft limit before deferral",
+    )
+    tuning_path: Path = Field(
+        default=Path("./data/tuning.json"),
+        validation_alias="TUNING_PATH",
+        description="JSON overrides of the tuning values above, watched and applied live",
+    )
+    admin_ids: str = Field(
+        default="",
+        validation_alias="ADMIN_IDS",
+        description="Comma separated Telegram user ids allowed to use /debug, /tune, /pause, /resume",
+    )
+    queue_path: Path | None = Field(
+        default=None,
+        validation_alias="TDL_QUEUE_PATH",
+        description="SQLite task queue shared with worker.py processes; unset downloads in-process",
+    )
+    executor_process: bool = Field(
+        default=False,
+        validation_alias="EXECUTOR_PROCESS",
+        description="Run downloads in a separate executor process instead of the bot's event loop",
+    )
+    catalog_path: Path | None = Field(
+        default=Path("./data/catalog.db"),
+        validation_alias="TDL_CATALOG_PATH",
+        description="SQLite catalog of finished downloads, checked before running tdl",
+    )
+    watch_channels: str = Field(
+        default="",
+        validation_alias="WATCH_CHANNELS",
+        description="Comma separated channels fetch_msg.py watches for new media in real time",
+    )
+    postprocess_steps: str = Field(
+        default="",
+        validation_alias="POSTPROCESS_STEPS",
+        description="Comma separated steps run on downloaded files: integrity, hash, probe, thumbnail",
+    )
+    postprocess_workers: int = Field(
+        default=2,
+        validation_alias="POSTPROCESS_WORKERS",
+        description="Size of the post-processing worker pool",
+    )
@@ -0,0 +1,210 @@
+import queue
+import atexit
+from typing import TextIO
+import logging
+from pathlib import Path
+import threading
+from collections.abc import Callable
+from logging.handlers import QueueHandler, QueueListener
+
+import logfire
+from pydantic import Field, model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from logfire.integrations.logging import LogfireLoggingHandler
+
+# Hot paths log through stdlib loggers under this name, e.g. ``logging.getLogger("tdl.bot")``;
+# modules that must not import ``src`` (fetch_msg.py's imports) can log the same way
+ROOT_LOGGER = "tdl"
+
+_listener: QueueListener | None = None
+
+
+class LogSettings(BaseSettings):
+    """Logging settings, read from the environment and ``.env`` like ``Config``."""
+
+    model_config = SettingsConfigDict(
+        env_file=(Path(__file__).parents[2] / ".env", ".env"),
+        env_file_encoding="utf-8",
+        extra="ignore",
+        populate_by_name=True,
+    )
+
+    level: str = Field(
+        default="INFO", validation_alias="LOG_LEVEL", description="Level of every component"
+    )
+    levels: str = Field(
+        default="",
+        validation_alias="LOG_LEVELS",
+        description="Comma separated component=level overrides, e.g. processor=WARNING",
+    )
+    sampling: str = Field(
+        default="",
+        validation_alias="LOG_SAMPLING",
+        description="Comma separated message=rate, e.g. 'Added download task to queue=0.1'",
+    )
+    queue_size: int = Field(
+        default=10_000,
+        validation_alias="LOG_QUEUE_SIZE",
+        description="Records buffered for the sink thread; more are dropped and counted",
+    )
+
+    @model_validator(mode="after")
+    def _check_levels(self) -> "LogSettings":
+        """Reject unknown level names, which ``logging`` would only fail on at setLevel."""
+        named = {"LOG_LEVEL": self.level.upper()}
+        named.update({
+            f"LOG_LEVELS {name}": level for name, level in self.component_levels().items()
+        })
+        for where, level in named.items():
+            # getLevelName maps known names to their number and anything else to "Level X"
+            if not isinstance(logging.getLevelName(level), int):
+                raise ValueError(
+                    f"Unknown log level {level!r} in {where}, "
+                    "choose from DEBUG, INFO, WARNING, ERROR, CRITICAL"
+                )
+        return self
+
+    @staticmethod
+    def _pairs(text: str) -> dict[str, str]:
+        pairs = (item.rsplit("=", 1) for item in text.split(",") if "=" in item)
+        return {key.strip(): value.strip() for key, value in pairs}
+
+    def component_levels(self) -> dict[str, str]:
+        """Level overrides by component."""
+        return {name: level.upper() for name, level in self._pairs(self.levels).items()}
+
+    def sample_rates(self) -> dict[str, float]:
+        """Fraction of records kept, by message template."""
+        return {msg: float(rate) for msg, rate in self._pairs(self.sampling).items()}
+
+
+class Lazy:
+    """A log argument computed only when a record is actually written, in the sink thread."""
+
+    __slots__ = ("args", "func")
+
+    def __init__(self, func: Callable[..., object], *args: object) -> None:
+        self.func = func
+        self.args = args
+
+    def __str__(self) -> str:
+        """Compute the value and format it."""
+        return str(self.func(*self.args))
+
+
+class _Sampler(logging.Filter):
+    """Keeps a fixed fraction of the records of each template; warnings are always kept.
+
+    Counting instead of drawing random numbers keeps the fraction exact and the first
+    record of every template.
+    """
+
+    def __init__(self, rates: dict[str, float]) -> None:
+        super().__init__()
+        self.rates = rates
+        self.counts: dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.msg)
+        if rate is None or rate >= 1 or record.levelno >= logging.WARNING:
+            return True
+        seen = self.counts.get(record.msg, 0)
+        self.counts[record.msg] = seen + 1
+        if int((seen + 1) * rate) == int(seen * rate) and seen:
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the sink thread untouched; never blocks, drops when full.
+
+    The stock handler formats each record before enqueueing it, which is the cost
+    this handler exists to move off the caller.
+    """
+
+    def __init__(self, records: queue.Queue) -> None:
+        super().__init__(records)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        with self._lock:
+            if self.dropped:
+                record.dropped_before = self.dropped
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+                return
+            self.dropped = 0
+
+
+class _LogfireSink(LogfireLoggingHandler):
+    """Writes records to logfire from the sink thread, resolving lazy arguments first."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if isinstance(record.args, tuple):
+            record.args = tuple(str(a) if isinstance(a, Lazy) else a for a in record.args)
+        for key, value in list(record.__dict__.items()):
+            if isinstance(value, Lazy):
+                record.__dict__[key] = str(value)
+        super().emit(record)
+
+
+def configure_logging(settings: LogSettings | None = None, output: TextIO | None = None) -> None:
+    """Configure logfire and the ``tdl`` loggers once per process.
+
+    Records of the ``tdl`` loggers are level-gated per component, sampled per template
+    and queued; a background thread formats and writes them, so a burst of logging
+    costs the event loop a level check and an enqueue per record.
+
+    Args:
+        settings (LogSettings | None): The settings; read from the environment when None
+        output (TextIO | None): Where the console output goes; stdout when None
+    """
+    global _listener
+    settings = settings or LogSettings()
+    levels = settings.component_levels()
+    lowest = min(
+        (logging.getLevelName(level) for level in [settings.level.upper(), *levels.values()]),
+        default=logging.INFO,
+    )
+    logfire.configure(
+        send_to_logfire=False,
+        # Source inspection of f-string messages is slow and nothing here relies on it
+        inspect_arguments=False,
+        console=logfire.ConsoleOptions(
+            min_log_level=logging.getLevelName(lowest).lower(), output=output
+        ),
+    )
+
+    if _listener is not None:
+        _listener.stop()
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers.clear()
+    root.propagate = False
+    root.setLevel(settings.level.upper())
+    for component, level in levels.items():
+        logging.getLogger(f"{ROOT_LOGGER}.{component}").setLevel(level)
+
+    records: queue.Queue = queue.Queue(maxsize=settings.queue_size)
+    handler = _NonBlockingQueueHandler(records)
+    handler.addFilter(_Sampler(settings.sample_rates()))
+    root.addHandler(handler)
+    _listener = QueueListener(records, _LogfireSink())
+    _listener.start()
+    # Exit handlers run last registered first: flush before logfire shuts down
+    atexit.unregister(flush_logging)
+    atexit.register(flush_logging)
+
+
+def flush_logging() -> None:
+    """Write every queued record and stop the sink thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
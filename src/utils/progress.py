@@ -0,0 +1,41 @@
+from pathlib import Path
+
+from pydantic import Field, BaseModel, model_validator
+
+
+class ProgressLog(BaseModel):
+    """Append-only log of completed work items, used to resume interrupted runs.
+
+    Each completed key (e.g. a URL or a chunk name) is written on its own line and
+    flushed immediately, so a crash loses at most the item in flight.
+    """
+
+    path: Path = Field(..., description="The file storing one completed key per line")
+
+    @model_validator(mode="after")
+    def _setup(self) -> "ProgressLog":
+        """Create the parent folder of the progress file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        return self
+
+    def load(self) -> set[str]:
+        """Load the keys completed by previous runs.
+
+        Returns:
+            set[str]: The completed keys
+        """
+        if not self.path.exists():
+            return set()
+        with self.path.open(encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def mark(self, keys: list[str]) -> None:
+        """Record keys as completed.
+
+        Args:
+            keys (list[str]): The keys to record
+        """
+        if not keys:
+            return
+        with self.path.open("a", encoding="utf-8") as f:
+            f.writelines(f"{key}\n" for key in keys)
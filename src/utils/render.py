@@ -0,0 +1,134 @@
+from collections.abc import Iterable
+
+# Telegram's limit, counted in UTF-16 code units after entities are parsed
+MESSAGE_LIMIT = 4096
+
+# Every character MarkdownV2 reserves, escaped in a single translate pass
+_MARKDOWN_V2_ESCAPES = str.maketrans({char: f"\\{char}" for char in "\\_*[]()~`>#+-=|{}.!"})
+
+# Status message templates; placeholders are filled with escaped values by ``render``
+SUCCESS_SINGLE = "✅ *下載完成\\!*\n\n📁 *資料夾*: `{folder}`\n\n🔗 *來源*: {url}"
+SUCCESS_BATCH = (
+    "✅ *批量下載完成\\!*\n\n📁 *資料夾*: `{folder}`\n\n🔗 *來源* \\({count} 個檔案\\):"
+)
+REMAINING_GROUPS = "\n\n📋 *剩餘批次*: {remaining} 組待處理"
+ALL_GROUPS_DONE = "\n\n🎉 *狀態*: 全部下載完成"
+MERGED_DONE = "✅ 已合併完成\n🔗 來源: {url}"
+ALL_BATCHES_DONE = "🎉 *全部批次處理完成\\!*\n\n✅ 所有下載任務已完成"
+MORE_ITEMS = "• … 及其他 {count} 個"
+
+
+def escape_markdown(text: str) -> str:
+    """Escape MarkdownV2 special characters.
+
+    Args:
+        text (str): Text to escape
+
+    Returns:
+        str: Text safe to embed in a MarkdownV2 message
+    """
+    return text.translate(_MARKDOWN_V2_ESCAPES)
+
+
+def render(template: str, **values: object) -> str:
+    """Fill a MarkdownV2 template, escaping every value.
+
+    Args:
+        template (str): A template with ``{name}`` placeholders
+        **values (object): The values, converted with ``str``
+
+    Returns:
+        str: The message
+    """
+    return template.format_map({name: escape_markdown(str(v)) for name, v in values.items()})
+
+
+def message_length(text: str) -> int:
+    """Length of a message as Telegram counts it, in UTF-16 code units."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def fit_lines(
+    head: str,
+    lines: Iterable[str],
+    tail: str = "",
+    more: str = MORE_ITEMS,
+    limit: int = MESSAGE_LIMIT,
+) -> str:
+    """Join ``head``, as many ``lines`` as fit, and ``tail`` into one message.
+
+    Lines that don't fit are replaced by ``more``, so the message always goes
+    through in a single send or edit.
+
+    Args:
+        head (str): Text before the lines
+        lines (Iterable[str]): One line per item, already escaped when MarkdownV2 is used
+        tail (str): Text after the lines
+        more (str): Template of the line standing for the omitted items
+        limit (int): Max message length
+
+    Returns:
+        str: The message
+    """
+    lines = list(lines)
+    # Reserve room for the "more" line as soon as anything could be left out
+    budget = limit - message_length(head) - message_length(tail)
+    budget -= message_length(render(more, count=len(lines))) + 1
+    kept = []
+    for line in lines:
+        cost = message_length(line) + 1
+        if cost > budget:
+            break
+        kept.append(line)
+        budget -= cost
+    if len(kept) < len(lines):
+        kept.append(render(more, count=len(lines) - len(kept)))
+    return "\n".join([head, *kept]) + tail
+
+
+def truncate(text: str, limit: int = MESSAGE_LIMIT) -> str:
+    """Cut a plain text message to the limit, marking the cut.
+
+    Args:
+        text (str): The message
+        limit (int): Max message length
+
+    Returns:
+        str: The message, unchanged when it fits
+    """
+    if message_length(text) <= limit:
+        return text
+    used = 0
+    for i, char in enumerate(text):
+        # Characters outside the BMP (most emoji) take two code units
+        used += 2 if ord(char) > 0xFFFF else 1
+        if used > limit - 1:
+            return text[:i] + "…"
+    return text
+
+
+def split_message(text: str, limit: int = MESSAGE_LIMIT) -> list[str]:
+    """Split a plain text message into messages under the limit, at line breaks.
+
+    Args:
+        text (str): The message
+        limit (int): Max length of each part
+
+    Returns:
+        list[str]: The parts, in order
+    """
+    parts: list[str] = []
+    current: list[str] = []
+    size = 0
+    for raw in text.split("\n"):
+        line = truncate(raw, limit)
+        cost = message_length(line) + (1 if current else 0)
+        if current and size + cost > limit:
+            parts.append("\n".join(current))
+            current, size = [], 0
+            cost = message_length(line)
+        current.append(line)
+        size += cost
+    if current:
+        parts.append("\n".join(current))
+    return parts
@@ -0,0 +1,119 @@
+import os
+import socket
+import asyncio
+from pathlib import Path
+import contextlib
+
+from bot import DownloadTask, BatchDownloadManager
+import logfire
+from pydantic import Field, BaseModel, PrivateAttr
+from telegram import Bot
+from pydantic_settings import CliApp
+
+from src.utils.config import Config
+from src.core.task_queue import QueuedJob, SQLiteTaskQueue
+
+
+class DownloadWorker(BaseModel):
+    """Claim download batches from the shared task queue and run them with tdl.
+
+    Any number of workers, on this or other machines, can share one queue. Claimed
+    jobs are leased: the worker renews the lease with heartbeats while it downloads,
+    and jobs of a worker that dies become claimable again after the visibility timeout.
+
+    Examples:
+        ```bash
+        TDL_QUEUE_PATH=./data/queue.db python ./worker.py
+        python ./worker.py --queue-path /mnt/shared/queue.db --batch-size 10
+        ```
+    """
+
+    queue_path: Path | None = Field(
+        default=None, description="SQLite task queue; defaults to TDL_QUEUE_PATH"
+    )
+    worker_id: str = Field(
+        default_factory=lambda: f"{socket.gethostname()}-{os.getpid()}",
+        description="Identifies this worker's leases",
+    )
+    batch_size: int = Field(default=20, description="Max jobs claimed per batch")
+    visibility_timeout: float = Field(
+        default=120.0, description="Seconds a claimed job stays invisible without a heartbeat"
+    )
+    poll_interval: float = Field(
+        default=2.0, description="Seconds to wait when the queue is empty"
+    )
+
+    _queue: SQLiteTaskQueue | None = PrivateAttr(default=None)
+    _job_ids: dict[int, int] = PrivateAttr(default_factory=dict)
+
+    async def _heartbeat(self, job_ids: list[int]) -> None:
+        """Renew the leases of the current batch until it is cancelled.
+
+        A failed renewal (e.g. a locked database) is logged and retried on the next beat;
+        the lease only lapses if renewals keep failing for the whole visibility timeout.
+        """
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            try:
+                await self._queue.heartbeat(self.worker_id, job_ids, self.visibility_timeout)
+            except Exception as e:
+                logfire.warning("Lease heartbeat failed", worker_id=self.worker_id, error=str(e))
+
+    async def _on_group_done(self, tasks: list[DownloadTask], success: bool) -> None:
+        job_ids = list({
+            self._job_ids.pop(id(task)) for task in tasks if id(task) in self._job_ids
+        })
+        if success:
+            await self._queue.ack(self.worker_id, job_ids)
+        else:
+            await self._queue.nack(self.worker_id, job_ids)
+
+    async def _run_batch(self, manager: BatchDownloadManager, jobs: list[QueuedJob]) -> None:
+        tasks = [DownloadTask.from_payload(job.payload) for job in jobs]
+        self._job_ids = {id(task): job.job_id for task, job in zip(tasks, jobs, strict=True)}
+        logfire.info("Claimed batch", worker_id=self.worker_id, jobs=len(jobs))
+
+        heartbeat = asyncio.create_task(self._heartbeat([job.job_id for job in jobs]))
+        try:
+            await manager.process_batch(tasks)
+        finally:
+            heartbeat.cancel()
+            # Failures were logged in _heartbeat; none may cost the result of the batch
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await heartbeat
+            # Anything not reported (e.g. requeued by a pause) goes back to the queue
+            if self._job_ids:
+                await self._queue.nack(self.worker_id, list(set(self._job_ids.values())))
+                self._job_ids = {}
+
+    async def run(self) -> None:
+        """Claim and process batches until interrupted."""
+        config = Config()
+        queue_path = self.queue_path or config.queue_path
+        if queue_path is None:
+            raise ValueError("Set --queue-path or TDL_QUEUE_PATH to the shared task queue")
+        self._queue = SQLiteTaskQueue(path=queue_path)
+
+        manager = BatchDownloadManager(on_group_done=self._on_group_done)
+        manager.configure(config)
+
+        async with Bot(config.token) as bot:
+            manager.bot = bot
+            manager.watch_tuning()
+            logfire.info("Worker started", worker_id=self.worker_id, queue=queue_path.as_posix())
+            while True:
+                jobs = await self._queue.claim(
+                    self.worker_id, self.batch_size, self.visibility_timeout
+                )
+                if not jobs:
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                await self._run_batch(manager, jobs)
+
+    def cli_cmd(self) -> None:
+        """Entry point used by ``CliApp.run``."""
+        asyncio.run(self.run())
+
+
+if __name__ == "__main__":
+    CliApp.run(DownloadWorker)